@@ -11,7 +11,8 @@ from scania.model.prediction_from_model import Prediction
 from scania.model.training_model import Train_Model
 from scania.validation_insertion.prediction_validation_insertion import Pred_Validation
 from scania.validation_insertion.train_validation_insertion import Train_Validation
-from utils.main_utils import upload_logs
+from utils.logger import App_Logger
+from utils.main_utils import preload_control_files, upload_logs
 from utils.read_params import read_params
 
 app = FastAPI()
@@ -31,6 +32,12 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def preloadControlFiles():
+    if config["control_file_cache"]["preload"] is True:
+        preload_control_files(config["control_file_cache"]["preload_log"])
+
+
 @app.get("/")
 async def index(request: Request):
     return templates.TemplateResponse(
@@ -40,8 +47,12 @@ async def index(request: Request):
 
 @app.get("/train")
 async def trainRouteClient():
+    log_writer = App_Logger()
+
+    log_writer.begin_run("train")
+
     try:
-        train_val = Train_Validation(config["s3_bucket"]["scania_raw_data"])
+        train_val = Train_Validation(config["s3_bucket"]["scania_raw_data_bucket"])
 
         train_val.training_validation()
 
@@ -53,18 +64,26 @@ async def trainRouteClient():
 
         load_prod_model.load_production_model()
 
-        upload_logs("logs", config["s3_bucket"]["input_files"])
+        log_writer.end_run(config["train_db_log"]["train_main"])
+
+        upload_logs("logs", config["s3_bucket"]["input_files_bucket"])
 
         return Response("Training successfull!!")
 
     except Exception as e:
+        log_writer.end_run(config["train_db_log"]["train_main"])
+
         return Response(f"Error Occurred! {e}")
 
 
 @app.get("/predict")
 async def predictRouteClient():
+    log_writer = App_Logger()
+
+    log_writer.begin_run("pred")
+
     try:
-        pred_val = Pred_Validation(config["s3_bucket"]["scania_raw_data"])
+        pred_val = Pred_Validation(config["s3_bucket"]["scania_raw_data_bucket"])
 
         pred_val.prediction_validation()
 
@@ -72,11 +91,15 @@ async def predictRouteClient():
 
         bucket, filename, json_predictions = pred.predict_from_model()
 
+        log_writer.end_run(config["pred_db_log"]["pred_main"])
+
         return Response(
             f"prediction file created in {bucket} bucket with filename as {filename}, and few of the predictions are {str(json.loads(json_predictions))}"
         )
 
     except Exception as e:
+        log_writer.end_run(config["pred_db_log"]["pred_main"])
+
         return Response(f"Error Occurred! {e}")
 
 
@@ -18,7 +18,7 @@ class Data_Getter_Pred:
 
         self.prediction_file = self.config["export_csv_file"]["pred"]
 
-        self.input_files_bucket = self.config["s3_bucket"]["input_files"]
+        self.input_files_bucket = self.config["s3_bucket"]["input_files_bucket"]
 
         self.s3 = S3_Operation()
 
@@ -26,10 +26,11 @@ class Data_Getter_Pred:
 
         self.class_name = self.__class__.__name__
 
-    def get_data(self):
+    def get_data(self, columns=None):
         """
         Method Name :   get_data
         Description :   This method reads the data from the input files s3 bucket where the prediction file is present
+                        in the storage format of params.yaml, only the given columns are read if columns is given
         Output      :   A pandas dataframe
         
         On Failure  :   Write an exception log and then raise an exception
@@ -44,8 +45,11 @@ class Data_Getter_Pred:
         )
 
         try:
-            df = self.s3.read_csv(
-                self.prediction_file, self.input_files_bucket, self.log_file,
+            df = self.s3.read_df(
+                self.prediction_file,
+                self.input_files_bucket,
+                self.log_file,
+                columns=columns,
             )
 
             self.log_writer.start_log(
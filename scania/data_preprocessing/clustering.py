@@ -19,9 +19,9 @@ class KMeans_Clustering:
 
         self.config = read_params()
 
-        self.input_files_bucket = self.config["s3_bucket"]["input_files"]
+        self.input_files_bucket = self.config["s3_bucket"]["input_files_bucket"]
 
-        self.model_bucket = self.config["s3_bucket"]["scania_model"]
+        self.model_bucket = self.config["s3_bucket"]["scania_model_bucket"]
 
         self.random_state = self.config["base"]["random_state"]
 
@@ -33,7 +33,7 @@ class KMeans_Clustering:
 
         self.kmeans_direction = self.config["kmeans_cluster"]["knee"]["direction"]
 
-        self.trained_model_dir = self.config["model_dir"]["trained"]
+        self.trained_model_dir = self.config["models_dir"]["trained"]
 
         self.s3 = S3_Operation()
 
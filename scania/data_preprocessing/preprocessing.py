@@ -28,7 +28,7 @@ class Preprocessor:
 
         self.n_components = self.config["pca_model"]["n_components"]
 
-        self.input_files_bucket = self.config["s3_bucket"]["input_files"]
+        self.input_files_bucket = self.config["s3_bucket"]["input_files_bucket"]
 
         self.model_utils = Model_Utils()
 
@@ -59,7 +59,7 @@ class Preprocessor:
             self.useful_data = self.data.drop(labels=self.columns, axis=1)
 
             self.log_writer.log(
-                self.log_file, f"Dropped {columns} from {data}",
+                self.log_file, "Dropped {} from {}", columns, data,
             )
 
             self.log_writer.start_log(
@@ -96,7 +96,7 @@ class Preprocessor:
             self.Y = data[label_column_name]
 
             self.log_writer.log(
-                self.log_file, f"Separated {label_column_name} from {data}",
+                self.log_file, "Separated {} from {}", label_column_name, data,
             )
 
             self.log_writer.start_log(
@@ -171,11 +171,15 @@ class Preprocessor:
             self.null_counts = data.isna().sum()
 
             self.log_writer.log(
-                self.log_file, f"Null values count is : {self.null_counts}",
+                self.log_file,
+                "Null values count is : {}",
+                self.null_counts[self.null_counts > 0],
+                columns=len(cols),
+                columns_with_nulls=int((self.null_counts > 0).sum()),
             )
 
             for i in range(len(self.null_counts)):
-                if self.null_counts[i] > 0:
+                if self.null_counts.iloc[i] > 0:
                     null_present = True
 
                     cols_with_missing_values.append(cols[i])
@@ -205,8 +209,8 @@ class Preprocessor:
                 self.s3.upload_df_as_csv(
                     self.dataframe_with_null,
                     self.null_values_file,
-                    self.input_files_bucket,
                     self.null_values_file,
+                    self.input_files_bucket,
                     self.log_file,
                 )
 
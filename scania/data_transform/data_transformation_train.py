@@ -15,22 +15,23 @@ class Data_Transform_Train:
     def __init__(self):
         self.config = read_params()
 
-        self.train_data_bucket = self.config["s3_bucket"]["scania_train_data"]
+        self.train_data_bucket = self.config["s3_bucket"]["scania_train_data_bucket"]
 
         self.s3 = S3_Operation()
 
         self.log_writer = App_Logger()
 
-        self.good_train_data_dir = self.config["data"]["train"]["good"]
+        self.good_train_data_dir = self.config["data"]["train"]["good_data_dir"]
 
         self.class_name = self.__class__.__name__
 
         self.train_data_transform_log = self.config["train_db_log"]["data_transform"]
 
-    def add_quotes_to_string(self):
+    def add_quotes_to_string(self, fnames=None):
         """
         Method Name :   add_quotes_to_string
-        Description :   This method addes the quotes to the string data present in columns
+        Description :   This method addes the quotes to the string data present in columns. With fnames, only the
+                        good files with those names are transformed
         
         Output      :   A csv file where all the string values have quotes inserted
         On Failure  :   Write an exception log and then raise an exception
@@ -45,20 +46,14 @@ class Data_Transform_Train:
         )
 
         try:
-            lst = self.s3.read_csv(
-                self.train_data_bucket,
+            lst = self.s3.iter_csv_from_folder(
                 self.good_train_data_dir,
+                self.train_data_bucket,
                 self.train_data_transform_log,
-                folder=True,
+                fnames=fnames,
             )
 
-            for idx, t_pdf in enumerate(lst):
-                df = t_pdf[idx][1]
-
-                file = t_pdf[idx][2]
-
-                abs_f = t_pdf[idx][3]
-
+            for df, file, abs_f in lst:
                 df["class"] = df["class"].apply(lambda x: "'" + str(x) + "'")
 
                 for column in df.columns:
@@ -74,8 +69,8 @@ class Data_Transform_Train:
                 self.s3.upload_df_as_csv(
                     df,
                     abs_f,
-                    self.train_data_bucket,
                     file,
+                    self.train_data_bucket,
                     self.train_data_transform_log,
                 )
 
@@ -1,4 +1,4 @@
-from scania.mongo_db_operations.mongo_operations import MongoDB_Operation
+from scania.mongo_db_operations.staging_backends import get_staging_operation
 from scania.s3_bucket_operations.s3_operations import S3_Operation
 from utils.logger import App_Logger
 from utils.read_params import read_params
@@ -17,13 +17,13 @@ class DB_Operation_Train:
 
         self.class_name = self.__class__.__name__
 
-        self.train_data_bucket = self.config["s3_bucket"]["scania_train_data"]
+        self.train_data_bucket = self.config["s3_bucket"]["scania_train_data_bucket"]
 
         self.train_export_csv_file = self.config["export_csv_file"]["train"]
 
-        self.good_data_train_dir = self.config["data"]["train"]["good"]
+        self.good_data_train_dir = self.config["data"]["train"]["good_data_dir"]
 
-        self.input_files_bucket = self.config["s3_bucket"]["input_files"]
+        self.input_files_bucket = self.config["s3_bucket"]["input_files_bucket"]
 
         self.train_db_insert_log = self.config["train_db_log"]["db_insert"]
 
@@ -31,14 +31,25 @@ class DB_Operation_Train:
 
         self.s3 = S3_Operation()
 
-        self.mongo = MongoDB_Operation()
+        self.staging = get_staging_operation(self.config)
+
+        self.stream_export = self.config["mongodb"]["stream_export"]
+
+        self.profile_export = self.config["mongodb"]["profile_export"]
+
+        self.null_threshold = self.config["mongodb"]["null_threshold"]
+
+        self.target_col = self.config["base"]["target_col"]
 
         self.log_writer = App_Logger()
 
-    def insert_good_data_as_record(self, good_data_db_name, good_data_collection_name):
+    def insert_good_data_as_record(
+        self, good_data_db_name, good_data_collection_name, fnames=None
+    ):
         """
         Method Name :   insert_good_data_as_record
-        Description :   This method inserts the good data in MongoDB as collection
+        Description :   This method inserts the good data in MongoDB as collection. With fnames, only the good
+                        files with those names are inserted
 
         Output      :   A MongoDB collection is created with good data present in it
         On Failure  :   Write an exception log and then raise an exception
@@ -53,23 +64,21 @@ class DB_Operation_Train:
         )
 
         try:
-            lst = self.s3.read_csv_from_folder(
+            lst = self.s3.iter_csv_from_folder(
                 self.good_data_train_dir,
                 self.train_data_bucket,
                 self.train_db_insert_log,
+                fnames=fnames,
             )
 
-            for idx, f in enumerate(lst):
-                df = f[idx][0]
-
-                file = f[idx][1]
-
+            for df, file, _ in lst:
                 if file.endswith(".csv"):
-                    self.mongo.insert_dataframe_as_record(
+                    self.staging.insert_dataframe_as_record(
                         df,
                         db_name=good_data_db_name,
                         collection_name=good_data_collection_name,
                         log_file=self.train_db_insert_log,
+                        fname=file,
                     )
 
                 else:
@@ -94,7 +103,10 @@ class DB_Operation_Train:
         Method Name :   insert_good_data_as_record
         Description :   This method inserts the good data in MongoDB as collection
 
-        Output      :   A csv file stored in input files bucket, containing good data which was stored in MongoDB
+        Output      :   A file in the storage format of params.yaml stored in input files bucket, containing good data which was stored in MongoDB.
+                        With stream_export set in params.yaml, the collection is streamed to s3 bucket chunk by chunk.
+                        With profile_export set, the collection is profiled in MongoDB first and the columns over
+                        null_threshold nulls are not exported. Zero variance columns are kept, as training keeps them
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -107,19 +119,51 @@ class DB_Operation_Train:
         )
 
         try:
-            df = self.mongo.get_collection_as_dataframe(
-                db_name=good_data_db_name,
-                collection_name=good_data_collection_name,
-                log_file=self.train_export_csv_log,
-            )
+            exclude_columns = None
 
-            self.s3.upload_df_as_csv(
-                df,
-                self.train_export_csv_file,
-                self.train_export_csv_file,
-                self.input_files_bucket,
-                self.input_files_bucket,
-            )
+            if self.profile_export is True:
+                profile = self.staging.profile_collection(
+                    db_name=good_data_db_name,
+                    collection_name=good_data_collection_name,
+                    log_file=self.train_export_csv_log,
+                )
+
+                exclude_columns = self.staging.get_columns_to_drop(
+                    profile,
+                    self.null_threshold,
+                    [self.target_col],
+                    self.train_export_csv_log,
+                )
+
+            if self.stream_export is True:
+                chunks = self.staging.iter_collection_as_dataframes(
+                    db_name=good_data_db_name,
+                    collection_name=good_data_collection_name,
+                    log_file=self.train_export_csv_log,
+                    exclude_columns=exclude_columns,
+                )
+
+                self.s3.upload_df_chunks(
+                    chunks,
+                    self.train_export_csv_file,
+                    self.input_files_bucket,
+                    self.train_export_csv_log,
+                )
+
+            else:
+                df = self.staging.get_collection_as_dataframe(
+                    db_name=good_data_db_name,
+                    collection_name=good_data_collection_name,
+                    log_file=self.train_export_csv_log,
+                    exclude_columns=exclude_columns,
+                )
+
+                self.s3.upload_df(
+                    df,
+                    self.train_export_csv_file,
+                    self.input_files_bucket,
+                    self.train_export_csv_log,
+                )
 
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, self.train_export_csv_log,
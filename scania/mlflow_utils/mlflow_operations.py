@@ -420,7 +420,9 @@ class MLFlow_Operation:
                     self.log_file, f"Got the model name as {model_name}",
                 )
 
-                model_params_list = list(self.config[model_name].keys())
+                model_params_list = list(
+                    self.config["model_params"][base_model_name].keys()
+                )
 
                 self.log_writer.log(
                     self.log_file, f"Created a list of params based on {model_name}",
@@ -22,7 +22,7 @@ class Prediction:
 
         self.model_bucket = self.config["s3_bucket"]["scania_model_bucket"]
 
-        self.input_files_bucket = self.config["s3_bucket"]["inputs_files_bucket"]
+        self.input_files_bucket = self.config["s3_bucket"]["input_files_bucket"]
 
         self.prod_model_dir = self.config["models_dir"]["prod"]
 
@@ -99,7 +99,7 @@ class Prediction:
 
         try:
             list_of_files = self.s3.get_files_from_folder(
-                bucket, self.prod_model_dir, log_file,
+                self.prod_model_dir, bucket, log_file,
             )
 
             for file in list_of_files:
@@ -167,7 +167,7 @@ class Prediction:
             kmeans_model_name = self.prod_model_dir + "/" + "KMeans"
 
             kmeans_model = self.s3.load_model(
-                self.model_bucket, kmeans_model_name, self.pred_log,
+                kmeans_model_name, self.model_bucket, self.pred_log,
             )
 
             clusters = kmeans_model.predict(data)
@@ -188,7 +188,7 @@ class Prediction:
                 prod_model_name = self.prod_model_dir + "/" + model_name
 
                 model = self.s3.load_model(
-                    self.model_bucket, prod_model_name, self.pred_log,
+                    prod_model_name, self.model_bucket, self.pred_log,
                 )
 
                 result = list(model.predict(cluster_data))
@@ -200,8 +200,8 @@ class Prediction:
                 self.s3.upload_df_as_csv(
                     result,
                     self.pred_output_file,
-                    self.input_files_bucket,
                     self.pred_output_file,
+                    self.input_files_bucket,
                     self.pred_log,
                 )
 
@@ -23,9 +23,9 @@ class Train_Model:
 
         self.config = read_params()
 
-        self.model_train_log = self.config["train_db_log"]["train_model"]
+        self.model_train_log = self.config["train_db_log"]["model_training"]
 
-        self.target_col = self.config["target_col"]
+        self.target_col = self.config["base"]["target_col"]
 
         self.class_name = self.__class__.__name__
 
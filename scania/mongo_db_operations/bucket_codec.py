@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+from bson.binary import Binary
+
+BLOCK_FIELD = "_bucket"
+
+MAX_BLOCK_BYTES = 12 * 1024 * 1024
+
+
+def get_block_rows(bucket_rows, n_cols):
+    """
+    Method Name :   get_block_rows
+    Description :   This method caps the rows per block so that the packed columns of a block stay well below the
+                    16 MB document limit of MongoDB
+
+    Output      :   The number of rows per block
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    return max(1, min(bucket_rows, MAX_BLOCK_BYTES // (8 * max(n_cols, 1))))
+
+
+def pack_floats(values):
+    return Binary(np.ascontiguousarray(values, dtype="<f8").tobytes())
+
+
+def unpack_floats(data):
+    return np.frombuffer(bytes(data), dtype="<f8")
+
+
+def get_stats(values):
+    present = values[~np.isnan(values)]
+
+    if len(present) == 0:
+        return {"count": 0, "sum": 0.0, "sum_sq": 0.0, "min": None, "max": None}
+
+    return {
+        "count": int(len(present)),
+        "sum": float(present.sum()),
+        "sum_sq": float(np.square(present).sum()),
+        "min": float(present.min()),
+        "max": float(present.max()),
+    }
+
+
+def encode_column(values, na_values):
+    """
+    Method Name :   encode_column
+    Description :   This method encodes one column of a block. Numeric columns are packed as float64 with NaN
+                    for missing values. Text columns whose values are all numbers apart from at most one na token
+                    are packed the same way, with a bit mask of the token positions. Other columns are kept as
+                    lists. The null count of a column includes its na tokens
+
+    Output      :   A dict describing the encoded column
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    nulls = int(values.isna().sum())
+
+    if pd.api.types.is_bool_dtype(values):
+        pass
+
+    elif pd.api.types.is_numeric_dtype(values) and values.dtype.kind in "iuf":
+        floats = values.astype("float64").to_numpy()
+
+        return {
+            "kind": "float",
+            "dtype": str(values.dtype),
+            "values": pack_floats(floats),
+            "nulls": nulls,
+            **get_stats(floats),
+        }
+
+    else:
+        numbers = pd.to_numeric(values, errors="coerce")
+
+        tokens = values[numbers.isna() & values.notna()]
+
+        distinct = set(tokens.astype(str).unique())
+
+        if len(distinct) <= 1 and distinct <= set(na_values):
+            floats = numbers.astype("float64").to_numpy()
+
+            mask = (numbers.isna() & values.notna()).to_numpy()
+
+            return {
+                "kind": "float_token",
+                "token": distinct.pop() if distinct else None,
+                "values": pack_floats(floats),
+                "mask": Binary(np.packbits(mask).tobytes()),
+                "nulls": nulls + int(mask.sum()),
+                **get_stats(floats),
+            }
+
+    return {
+        "kind": "list",
+        "values": values.astype(object).where(values.notna(), None).tolist(),
+        "nulls": nulls + int(values.isin(na_values).sum()),
+    }
+
+
+def decode_column(spec, n_rows):
+    """
+    Method Name :   decode_column
+    Description :   This method decodes one column of a block back into a pandas series
+
+    Output      :   A pandas series
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if spec["kind"] == "list":
+        return pd.Series(spec["values"], dtype=object)
+
+    floats = unpack_floats(spec["values"])
+
+    if spec["kind"] == "float":
+        series = pd.Series(floats)
+
+        if spec["nulls"] == 0 and spec["dtype"] != "float64":
+            series = series.astype(spec["dtype"])
+
+        return series
+
+    mask = np.unpackbits(np.frombuffer(bytes(spec["mask"]), dtype=np.uint8))[:n_rows]
+
+    values = floats.astype(object)
+
+    values[np.isnan(floats)] = None
+
+    values[mask.astype(bool)] = spec["token"]
+
+    return pd.Series(values, dtype=object)
+
+
+def encode_block(data_frame, na_values, meta=None):
+    """
+    Method Name :   encode_block
+    Description :   This method encodes a dataframe as one bucketed document. The block metadata, with the number
+                    of rows and the columns in order, is kept under BLOCK_FIELD and the encoded values and stats
+                    of every column under data
+
+    Output      :   A document for MongoDB
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    block_meta = {
+        "n_rows": len(data_frame),
+        "columns": [str(col) for col in data_frame.columns],
+    }
+
+    block_meta.update(meta or {})
+
+    return {
+        BLOCK_FIELD: block_meta,
+        "data": {
+            str(col): encode_column(values.reset_index(drop=True), na_values)
+            for col, values in data_frame.items()
+        },
+    }
+
+
+def decode_block(doc):
+    """
+    Method Name :   decode_block
+    Description :   This method decodes a bucketed document back into the dataframe it was encoded from. Columns
+                    projected out of data are left out
+
+    Output      :   A pandas dataframe
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    block_meta = doc[BLOCK_FIELD]
+
+    return pd.DataFrame(
+        {
+            col: decode_column(doc["data"][col], block_meta["n_rows"])
+            for col in block_meta["columns"]
+            if col in doc["data"]
+        }
+    )
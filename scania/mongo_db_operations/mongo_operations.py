@@ -1,8 +1,26 @@
-import json
 import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
 
 import pandas as pd
-from pymongo import MongoClient
+from pymongo import MongoClient, ReplaceOne
+from pymongo.errors import BulkWriteError
+from scania.mongo_db_operations.bucket_codec import (
+    BLOCK_FIELD,
+    decode_block,
+    encode_block,
+    get_block_rows,
+)
+from scania.mongo_db_operations.staging_utils import (
+    HASH_FIELD,
+    add_to_totals,
+    get_columns_to_drop,
+    get_file_hash,
+    get_new_rows,
+    get_profile,
+    get_row_hashes,
+)
 from utils.logger import App_Logger
 from utils.read_params import read_params
 
@@ -25,6 +43,38 @@ class MongoDB_Operation:
 
         self.client = MongoClient(self.DB_URL)
 
+        self.insert_batch_size = self.config["mongodb"]["insert_batch_size"]
+
+        self.insert_workers = self.config["mongodb"]["insert_workers"]
+
+        self.export_batch_size = self.config["mongodb"]["export_batch_size"]
+
+        self.export_chunk_rows = self.config["mongodb"]["export_chunk_rows"]
+
+        self.insert_mode = self.config["mongodb"]["insert_mode"]
+
+        self.file_registry_suffix = self.config["mongodb"]["file_registry_suffix"]
+
+        self.layout = self.config["mongodb"]["layout"]
+
+        self.bucket_rows = self.config["mongodb"]["bucket_rows"]
+
+        self.na_values = self.config["storage_format"]["na_values"]
+
+        if self.insert_mode not in ("append", "skip_existing", "upsert"):
+            raise ValueError(
+                f"Unsupported insert mode {self.insert_mode}, use append, skip_existing or upsert"
+            )
+
+        if self.layout not in ("rows", "bucketed"):
+            raise ValueError(f"Unsupported layout {self.layout}, use rows or bucketed")
+
+        self.hash_field = HASH_FIELD
+
+        self.indexed_collections = set()
+
+        self.index_lock = threading.Lock()
+
         self.log_writer = App_Logger()
 
     def get_database(self, db_name, log_file):
@@ -97,10 +147,129 @@ class MongoDB_Operation:
                 e, self.class_name, method_name, log_file,
             )
 
-    def get_collection_as_dataframe(self, db_name, collection_name, log_file):
+    def get_chunk_as_dataframe(self, columns, n_rows):
+        """
+        Method Name :   get_chunk_as_dataframe
+        Description :   This method builds a dataframe from the per column value lists of a chunk of documents
+
+        Output      :   A pandas dataframe
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        for values in columns.values():
+            values.extend([None] * (n_rows - len(values)))
+
+        return pd.DataFrame(columns)
+
+    def iter_collection_as_dataframes(
+        self, db_name, collection_name, log_file, exclude_columns=None
+    ):
+        """
+        Method Name :   iter_collection_as_dataframes
+        Description :   This method streams the selected collection as dataframes of export_chunk_rows rows. The
+                        cursor projects out _id and fetches export_batch_size documents per round trip, and the
+                        values are accumulated per column, so that no list of documents is built. Documents of the
+                        bucketed layout are decoded into dataframes of their block of rows. The columns in
+                        exclude_columns are projected out on the server
+
+        Output      :   A generator of pandas dataframes
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.iter_collection_as_dataframes.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            database = self.get_database(db_name, log_file)
+
+            collection = database.get_collection(name=collection_name)
+
+            projection = {"_id": 0, self.hash_field: 0}
+
+            for col in exclude_columns or []:
+                projection[col] = 0
+
+                projection[f"data.{col}"] = 0
+
+            cursor = collection.find(
+                {}, projection, batch_size=self.export_batch_size,
+            )
+
+            columns, n_rows, n_chunks = {}, 0, 0
+
+            blocks, n_block_rows = [], 0
+
+            for doc in cursor:
+                if BLOCK_FIELD in doc:
+                    blocks.append(decode_block(doc))
+
+                    n_block_rows += len(blocks[-1])
+
+                    if n_block_rows >= self.export_chunk_rows:
+                        yield pd.concat(blocks, ignore_index=True)
+
+                        blocks, n_block_rows, n_chunks = [], 0, n_chunks + 1
+
+                    continue
+
+                for key, value in doc.items():
+                    values = columns.get(key)
+
+                    if values is None:
+                        values = columns[key] = [None] * n_rows
+
+                    elif len(values) < n_rows:
+                        values.extend([None] * (n_rows - len(values)))
+
+                    values.append(value)
+
+                n_rows += 1
+
+                if n_rows == self.export_chunk_rows:
+                    yield self.get_chunk_as_dataframe(columns, n_rows)
+
+                    columns = {key: [] for key in columns}
+
+                    n_rows, n_chunks = 0, n_chunks + 1
+
+            if n_rows > 0:
+                yield self.get_chunk_as_dataframe(columns, n_rows)
+
+                n_chunks += 1
+
+            if len(blocks) > 0:
+                yield pd.concat(blocks, ignore_index=True)
+
+                n_chunks += 1
+
+            self.log_writer.log(
+                log_file,
+                f"Streamed {collection_name} collection as {n_chunks} dataframe chunks",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def get_collection_as_dataframe(
+        self, db_name, collection_name, log_file, exclude_columns=None
+    ):
         """
         Method Name :   get_collection_as_dataframe
-        Description :   This method is used for converting the selected collection to dataframe
+        Description :   This method is used for converting the selected collection to dataframe, built from the
+                        streamed chunks of iter_collection_as_dataframes
 
         Output      :   A collection is returned from the selected db_name and collection_name
         On Failure  :   Write an exception log and then raise an exception
@@ -115,37 +284,443 @@ class MongoDB_Operation:
             "start", self.class_name, method_name, log_file,
         )
 
+        try:
+            chunks = list(
+                self.iter_collection_as_dataframes(
+                    db_name, collection_name, log_file, exclude_columns
+                )
+            )
+
+            if len(chunks) == 0:
+                df = pd.DataFrame()
+
+            elif len(chunks) == 1:
+                df = chunks[0]
+
+            else:
+                df = pd.concat(chunks, ignore_index=True)
+
+            self.log_writer.log(
+                log_file, "Converted collection to dataframe",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file, rows=len(df),
+            )
+
+            return df
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def get_row_stats_pipeline(self, columns):
+        """
+        Method Name :   get_row_stats_pipeline
+        Description :   This method builds the aggregation pipeline which computes, in one $group over the row
+                        documents, the null count of every column, with na tokens and missing fields counted as
+                        null, and the count, sum, sum of squares, min and max of its values converted to double
+
+        Output      :   An aggregation pipeline
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        group = {"_id": None, "rows": {"$sum": 1}}
+
+        for i, col in enumerate(columns):
+            field = f"${col}"
+
+            value = {
+                "$convert": {
+                    "input": field,
+                    "to": "double",
+                    "onError": None,
+                    "onNull": None,
+                }
+            }
+
+            group[f"p{i}"] = {"$sum": 1}
+
+            group[f"n{i}"] = {
+                "$sum": {
+                    "$cond": [
+                        {"$in": [{"$ifNull": [field, None]}, [None] + self.na_values]},
+                        1,
+                        0,
+                    ]
+                }
+            }
+
+            group[f"c{i}"] = {"$sum": {"$cond": [{"$eq": [value, None]}, 0, 1]}}
+
+            group[f"s{i}"] = {"$sum": value}
+
+            group[f"q{i}"] = {"$sum": {"$multiply": [value, value]}}
+
+            group[f"mn{i}"] = {"$min": value}
+
+            group[f"mx{i}"] = {"$max": value}
+
+        return [{"$match": {BLOCK_FIELD: {"$exists": False}}}, {"$group": group}]
+
+    def get_block_stats_pipeline(self, columns):
+        """
+        Method Name :   get_block_stats_pipeline
+        Description :   This method builds the aggregation pipeline which adds up the per column stats stored in the
+                        block documents of the bucketed layout, so that no values are decoded. The rows of a block
+                        without the column are counted in p, to be added to its nulls
+
+        Output      :   An aggregation pipeline
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        n_rows = f"${BLOCK_FIELD}.n_rows"
+
+        group = {"_id": None, "rows": {"$sum": n_rows}}
+
+        for i, col in enumerate(columns):
+            field = f"$data.{col}"
+
+            group[f"p{i}"] = {
+                "$sum": {"$cond": [{"$ifNull": [field, False]}, n_rows, 0]}
+            }
+
+            group[f"n{i}"] = {"$sum": f"{field}.nulls"}
+
+            group[f"c{i}"] = {"$sum": f"{field}.count"}
+
+            group[f"s{i}"] = {"$sum": f"{field}.sum"}
+
+            group[f"q{i}"] = {"$sum": f"{field}.sum_sq"}
+
+            group[f"mn{i}"] = {"$min": f"{field}.min"}
+
+            group[f"mx{i}"] = {"$max": f"{field}.max"}
+
+        return [{"$match": {BLOCK_FIELD: {"$exists": True}}}, {"$group": group}]
+
+    def profile_collection(self, db_name, collection_name, log_file):
+        """
+        Method Name :   profile_collection
+        Description :   This method profiles the columns of the selected collection in MongoDB with aggregation
+                        pipelines, so that no document leaves the server. Row documents are aggregated directly
+                        and block documents from their stored per block stats, and both are merged
+
+        Output      :   A dict of column name to its rows, nulls, null_ratio, count, mean, std, min, max and
+                        zero_variance, where std is the sample standard deviation of the numeric values
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.profile_collection.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
         try:
             database = self.get_database(db_name, log_file)
 
             collection = database.get_collection(name=collection_name)
 
-            df = pd.DataFrame(list(collection.find()))
+            sample = collection.find_one(
+                {BLOCK_FIELD: {"$exists": False}}, {"_id": 0, self.hash_field: 0}
+            )
+
+            columns = list(sample or {})
+
+            for col in collection.distinct(
+                f"{BLOCK_FIELD}.columns", {BLOCK_FIELD: {"$exists": True}}
+            ):
+                if col not in columns:
+                    columns.append(col)
 
-            if "_id" in df.columns.to_list():
-                df = df.drop(columns=["_id"], axis=1)
+            totals = {"rows": 0}
+
+            for pipeline in (
+                self.get_row_stats_pipeline(columns),
+                self.get_block_stats_pipeline(columns),
+            ):
+                for result in collection.aggregate(pipeline, allowDiskUse=True):
+                    add_to_totals(totals, result)
+
+            profile = get_profile(columns, totals)
 
             self.log_writer.log(
-                log_file, "Converted collection to dataframe",
+                log_file,
+                f"Profiled {len(columns)} columns of {totals['rows']} rows of {collection_name} collection",
             )
 
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, log_file,
             )
 
-            return df
+            return profile
 
         except Exception as e:
             self.log_writer.exception_log(
                 e, self.class_name, method_name, log_file,
             )
 
+    def get_columns_to_drop(
+        self, profile, null_threshold, keep_columns, log_file, drop_zero_variance=False
+    ):
+        """
+        Method Name :   get_columns_to_drop
+        Description :   This method picks from the profile the columns with a null ratio of null_threshold or
+                        more, and with drop_zero_variance the ones with zero variance, which only prediction drops.
+                        The columns in keep_columns, like the target column, are never picked
+
+        Output      :   A list of column names
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.get_columns_to_drop.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            cols_to_drop = get_columns_to_drop(
+                profile, null_threshold, keep_columns, drop_zero_variance
+            )
+
+            self.log_writer.log(
+                log_file,
+                f"Got {len(cols_to_drop)} columns with null ratio of {null_threshold} or more, with drop zero variance as {drop_zero_variance}",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+            return cols_to_drop
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def ensure_hash_index(self, collection):
+        """
+        Method Name :   ensure_hash_index
+        Description :   This method creates the unique index on the row hash field of the collection, once per
+                        process. Documents inserted without a hash are left out of the index
+
+        Output      :   The unique index exists on the collection
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        key = (collection.database.name, collection.name)
+
+        with self.index_lock:
+            if key in self.indexed_collections:
+                return
+
+            collection.create_index(
+                self.hash_field,
+                unique=True,
+                partialFilterExpression={self.hash_field: {"$exists": True}},
+            )
+
+            self.indexed_collections.add(key)
+
+    def get_record_batches(self, data_frame, row_hashes=None):
+        """
+        Method Name :   get_record_batches
+        Description :   This method converts the dataframe column by column into python values, with None in place
+                        of missing values, and zips them into documents of insert_batch_size rows at a time. With
+                        row_hashes, every document carries its row hash
+
+        Output      :   A generator of list of documents
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        keys = [str(col) for col in data_frame.columns]
+
+        col_values = []
+
+        for _, col in data_frame.items():
+            col_values.append(col.astype(object).where(col.notna(), None).tolist())
+
+        if row_hashes is not None:
+            keys.append(self.hash_field)
+
+            col_values.append(row_hashes)
+
+        for start in range(0, len(data_frame), self.insert_batch_size):
+            end = start + self.insert_batch_size
+
+            yield [
+                dict(zip(keys, row))
+                for row in zip(*(values[start:end] for values in col_values))
+            ]
+
+    def write_batch(self, collection, batch):
+        """
+        Method Name :   write_batch
+        Description :   This method writes a batch of documents as per insert_mode. append inserts every document,
+                        skip_existing inserts the documents whose row hash is not in the collection yet and upsert
+                        replaces the documents with the same row hash
+
+        Output      :   The number of documents inserted or replaced
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        try:
+            if self.insert_mode in ("append", "skip_existing"):
+                return len(collection.insert_many(batch, ordered=False).inserted_ids)
+
+            requests = [
+                ReplaceOne({self.hash_field: doc[self.hash_field]}, doc, upsert=True)
+                for doc in batch
+            ]
+
+            result = collection.bulk_write(requests, ordered=False)
+
+            return result.upserted_count + result.modified_count
+
+        except BulkWriteError as e:
+            write_errors = e.details["writeErrors"]
+
+            if self.insert_mode == "append" or any(
+                err["code"] != 11000 for err in write_errors
+            ):
+                raise e
+
+            return sum(
+                e.details.get(n, 0) for n in ("nInserted", "nUpserted", "nModified")
+            )
+
+    def get_existing_hashes(self, collection, row_hashes):
+        """
+        Method Name :   get_existing_hashes
+        Description :   This method looks up which of the row hashes are already in the collection, in queries of
+                        insert_batch_size hashes. The hash field of a block document is the list of hashes of its
+                        rows, so the same lookup works for both layouts
+
+        Output      :   A set of row hashes
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        existing = set()
+
+        for start in range(0, len(row_hashes), self.insert_batch_size):
+            chunk = row_hashes[start : start + self.insert_batch_size]
+
+            cursor = collection.find(
+                {self.hash_field: {"$in": chunk}}, {"_id": 0, self.hash_field: 1}
+            )
+
+            for doc in cursor:
+                value = doc[self.hash_field]
+
+                existing.update(value if isinstance(value, list) else [value])
+
+        return existing & set(row_hashes)
+
+    def get_block_batches(self, data_frame, row_hashes=None, meta=None):
+        """
+        Method Name :   get_block_batches
+        Description :   This method encodes the dataframe as block documents of the bucketed layout, each holding a
+                        block of rows, and groups them so that a batch holds about insert_batch_size rows. With
+                        row_hashes, every block carries the list of hashes of its rows
+
+        Output      :   A generator of list of block documents
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        block_rows = get_block_rows(self.bucket_rows, len(data_frame.columns))
+
+        blocks_per_batch = max(1, self.insert_batch_size // block_rows)
+
+        batch = []
+
+        for seq, start in enumerate(range(0, len(data_frame), block_rows)):
+            end = start + block_rows
+
+            block_meta = dict(meta or {}, seq=seq)
+
+            doc = encode_block(data_frame.iloc[start:end], self.na_values, block_meta)
+
+            if row_hashes is not None:
+                doc[self.hash_field] = row_hashes[start:end]
+
+            batch.append(doc)
+
+            if len(batch) == blocks_per_batch:
+                yield batch
+
+                batch = []
+
+        if len(batch) > 0:
+            yield batch
+
+    def write_blocks(self, collection, batch):
+        """
+        Method Name :   write_blocks
+        Description :   This method inserts a batch of block documents. The rows of a batch are deduplicated before
+                        encoding, so a duplicate key error here only comes from a concurrent insert of the same
+                        content, and the blocks which hit it are skipped unless insert_mode is append
+
+        Output      :   The number of rows inserted
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        try:
+            collection.insert_many(batch, ordered=False)
+
+            return sum(doc[BLOCK_FIELD]["n_rows"] for doc in batch)
+
+        except BulkWriteError as e:
+            write_errors = e.details["writeErrors"]
+
+            if self.insert_mode == "append" or any(
+                err["code"] != 11000 for err in write_errors
+            ):
+                raise e
+
+            failed = set(err["index"] for err in write_errors)
+
+            return sum(
+                doc[BLOCK_FIELD]["n_rows"]
+                for i, doc in enumerate(batch)
+                if i not in failed
+            )
+
     def insert_dataframe_as_record(
-        self, data_frame, db_name, collection_name, log_file
+        self, data_frame, db_name, collection_name, log_file, fname=None
     ):
         """
         Method Name :   insert_dataframe_as_record
-        Description :   This method inserts the dataframe as record in database collection
+        Description :   This method inserts the dataframe as record in database collection. The documents are
+                        built from the columns directly and inserted in unordered batches of insert_batch_size,
+                        with up to insert_workers batches in flight. Unless insert_mode is append, every document
+                        carries a content hash under a unique index, and a dataframe whose content was already
+                        inserted is skipped using the file registry collection. With the bucketed layout, the rows
+                        are written as block documents of up to bucket_rows rows each, after dropping the rows
+                        whose hash is already in the collection
 
         Output      :   The dataframe is inserted in database collection
         On Failure  :   Write an exception log and then raise an exception
@@ -160,26 +735,111 @@ class MongoDB_Operation:
         )
 
         try:
-            records = json.loads(data_frame.T.to_json()).values()
+            database = self.get_database(db_name, log_file)
+
+            collection = database.get_collection(collection_name)
+
+            row_hashes = None
+
+            if self.insert_mode != "append":
+                self.ensure_hash_index(collection)
+
+                row_hashes = get_row_hashes(data_frame)
+
+                file_hash = get_file_hash(row_hashes, data_frame.columns)
+
+                registry = database.get_collection(
+                    collection_name + self.file_registry_suffix
+                )
+
+                if registry.find_one({"_id": file_hash}) is not None:
+                    self.log_writer.log(
+                        log_file,
+                        f"Content of {fname} was already inserted in {collection_name} collection, skipping it",
+                    )
+
+                    self.log_writer.start_log(
+                        "exit", self.class_name, method_name, log_file,
+                    )
+
+                    return 0
 
             self.log_writer.log(
-                log_file, f"Converted dataframe to json records",
+                log_file,
+                f"Inserting {len(data_frame)} records to MongoDB in batches of {self.insert_batch_size} with {self.insert_workers} workers, insert mode as {self.insert_mode} and layout as {self.layout}",
             )
 
-            database = self.get_database(db_name, log_file)
+            if self.layout == "bucketed":
+                new_rows = data_frame
 
-            collection = database.get_collection(collection_name)
+                if row_hashes is not None:
+                    existing = self.get_existing_hashes(collection, row_hashes)
+
+                    new_rows, row_hashes = get_new_rows(
+                        data_frame, row_hashes, existing
+                    )
+
+                    self.log_writer.log(
+                        log_file,
+                        f"Skipping {len(data_frame) - len(new_rows)} records which are already in {collection_name} collection",
+                    )
+
+                insert_batch = lambda batch: self.write_blocks(collection, batch)
+
+                batches = self.get_block_batches(
+                    new_rows,
+                    row_hashes,
+                    meta={"fname": fname, "inserted_at": datetime.now()},
+                )
+
+            else:
+                insert_batch = lambda batch: self.write_batch(collection, batch)
+
+                batches = self.get_record_batches(data_frame, row_hashes)
+
+            inserted = 0
 
-            self.log_writer.log(log_file, "Inserting records to MongoDB")
+            if self.insert_workers > 1:
+                pending = set()
 
-            collection.insert_many(records)
+                with ThreadPoolExecutor(max_workers=self.insert_workers) as executor:
+                    for batch in batches:
+                        if len(pending) >= self.insert_workers:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
 
-            self.log_writer.log(log_file, "Inserted records to MongoDB")
+                            inserted += sum(fut.result() for fut in done)
+
+                        pending.add(executor.submit(insert_batch, batch))
+
+                    inserted += sum(fut.result() for fut in pending)
+
+            else:
+                inserted = sum(insert_batch(batch) for batch in batches)
+
+            if self.insert_mode != "append":
+                registry.replace_one(
+                    {"_id": file_hash},
+                    {
+                        "_id": file_hash,
+                        "fname": fname,
+                        "rows": len(data_frame),
+                        "written": inserted,
+                        "inserted_at": datetime.now(),
+                    },
+                    upsert=True,
+                )
+
+            self.log_writer.log(
+                log_file,
+                f"Wrote {inserted} of {len(data_frame)} records to MongoDB",
+            )
 
             self.log_writer.start_log(
-                "exit", self.class_name, method_name, log_file,
+                "exit", self.class_name, method_name, log_file, rows=inserted,
             )
 
+            return inserted
+
         except Exception as e:
             self.log_writer.exception_log(
                 e, self.class_name, method_name, log_file,
@@ -0,0 +1,882 @@
+import os
+import sqlite3
+import uuid
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+import pyarrow.parquet as pq
+from scania.mongo_db_operations.mongo_operations import MongoDB_Operation
+from scania.mongo_db_operations.staging_utils import (
+    HASH_FIELD,
+    add_to_totals,
+    get_column_totals,
+    get_columns_to_drop,
+    get_file_hash,
+    get_new_rows,
+    get_profile,
+    get_row_hashes,
+)
+from utils.logger import App_Logger
+from utils.read_params import read_params
+
+STAGING_BACKENDS = ("mongodb", "sqlite", "parquet")
+
+SQLITE_MAX_PROFILE_COLUMNS = 250
+
+
+def quote_name(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def to_double(value):
+    """
+    Method Name :   to_double
+    Description :   This method converts a value stored in SQLite to float, it is registered as a SQL function so
+                    that the profile aggregates run inside SQLite
+
+    Output      :   A float or None if the value is not a number
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if value is None or isinstance(value, bytes):
+        return None
+
+    try:
+        number = float(value)
+
+    except ValueError:
+        return None
+
+    return None if number != number else number
+
+
+class SQLite_Staging_Operation:
+    """
+    Description :   This class stages the good data in an embedded SQLite database, with the same insert, export
+                    and profile methods as MongoDB_Operation. Every db_name is a database file in the local
+                    staging dir and every collection a table, so that single node deployments run without a
+                    database server
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(self):
+        self.config = read_params()
+
+        self.class_name = self.__class__.__name__
+
+        self.staging_dir = self.config["mongodb"]["local_staging_dir"]
+
+        self.insert_batch_size = self.config["mongodb"]["insert_batch_size"]
+
+        self.export_chunk_rows = self.config["mongodb"]["export_chunk_rows"]
+
+        self.insert_mode = self.config["mongodb"]["insert_mode"]
+
+        self.file_registry_suffix = self.config["mongodb"]["file_registry_suffix"]
+
+        self.na_values = self.config["storage_format"]["na_values"]
+
+        if self.insert_mode not in ("append", "skip_existing", "upsert"):
+            raise ValueError(
+                f"Unsupported insert mode {self.insert_mode}, use append, skip_existing or upsert"
+            )
+
+        self.hash_field = HASH_FIELD
+
+        self.log_writer = App_Logger()
+
+    def connect(self, db_name):
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+        conn = sqlite3.connect(os.path.join(self.staging_dir, db_name + ".sqlite"))
+
+        conn.execute("PRAGMA journal_mode=WAL")
+
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        conn.create_function("to_double", 1, to_double)
+
+        return conn
+
+    def get_table_columns(self, conn, table_name):
+        rows = conn.execute(f"PRAGMA table_info({quote_name(table_name)})").fetchall()
+
+        return [row[1] for row in rows]
+
+    def ensure_table(self, conn, table_name, columns):
+        """
+        Method Name :   ensure_table
+        Description :   This method creates the table of the collection with the hash column and its unique index,
+                        and adds the columns which the table does not have yet
+
+        Output      :   The table has all the columns
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        table = quote_name(table_name)
+
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({quote_name(self.hash_field)})")
+
+        conn.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {quote_name(table_name + self.hash_field)} "
+            f"ON {table} ({quote_name(self.hash_field)}) WHERE {quote_name(self.hash_field)} IS NOT NULL"
+        )
+
+        existing = set(self.get_table_columns(conn, table_name))
+
+        for col in columns:
+            if col not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {quote_name(col)}")
+
+    def insert_dataframe_as_record(
+        self, data_frame, db_name, collection_name, log_file, fname=None
+    ):
+        """
+        Method Name :   insert_dataframe_as_record
+        Description :   This method inserts the dataframe as rows of the collection table, in batches of
+                        insert_batch_size within one transaction. insert_mode works as in MongoDB_Operation, with
+                        a unique index on the row hash and a file registry table
+
+        Output      :   The number of rows written
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.insert_dataframe_as_record.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            columns = [str(col) for col in data_frame.columns]
+
+            registry = quote_name(collection_name + self.file_registry_suffix)
+
+            with closing(self.connect(db_name)) as conn, conn:
+                self.ensure_table(conn, collection_name, columns)
+
+                row_hashes, file_hash = None, None
+
+                if self.insert_mode != "append":
+                    row_hashes = get_row_hashes(data_frame)
+
+                    file_hash = get_file_hash(row_hashes, data_frame.columns)
+
+                    conn.execute(
+                        f"CREATE TABLE IF NOT EXISTS {registry} "
+                        "(_id TEXT PRIMARY KEY, fname TEXT, rows INTEGER, written INTEGER, inserted_at TEXT)"
+                    )
+
+                    found = conn.execute(
+                        f"SELECT 1 FROM {registry} WHERE _id = ?", (file_hash,)
+                    ).fetchone()
+
+                    if found is not None:
+                        self.log_writer.log(
+                            log_file,
+                            f"Content of {fname} was already inserted in {collection_name} table, skipping it",
+                        )
+
+                        self.log_writer.start_log(
+                            "exit", self.class_name, method_name, log_file,
+                        )
+
+                        return 0
+
+                verb = {
+                    "append": "INSERT",
+                    "skip_existing": "INSERT OR IGNORE",
+                    "upsert": "INSERT OR REPLACE",
+                }[self.insert_mode]
+
+                names = columns + [self.hash_field]
+
+                sql = (
+                    f"{verb} INTO {quote_name(collection_name)} "
+                    f"({', '.join(map(quote_name, names))}) VALUES ({', '.join('?' * len(names))})"
+                )
+
+                col_values = [
+                    col.astype(object).where(col.notna(), None).tolist()
+                    for _, col in data_frame.items()
+                ]
+
+                col_values.append(row_hashes or [None] * len(data_frame))
+
+                changes = conn.total_changes
+
+                for start in range(0, len(data_frame), self.insert_batch_size):
+                    end = start + self.insert_batch_size
+
+                    conn.executemany(
+                        sql, zip(*(values[start:end] for values in col_values))
+                    )
+
+                inserted = conn.total_changes - changes
+
+                if file_hash is not None:
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO {registry} VALUES (?, ?, ?, ?, ?)",
+                        (
+                            file_hash,
+                            fname,
+                            len(data_frame),
+                            inserted,
+                            datetime.now().isoformat(),
+                        ),
+                    )
+
+            self.log_writer.log(
+                log_file,
+                f"Wrote {inserted} of {len(data_frame)} records to {collection_name} table of {db_name} SQLite database",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file, rows=inserted,
+            )
+
+            return inserted
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def iter_collection_as_dataframes(
+        self, db_name, collection_name, log_file, exclude_columns=None
+    ):
+        """
+        Method Name :   iter_collection_as_dataframes
+        Description :   This method streams the collection table as dataframes of export_chunk_rows rows, in
+                        insertion order. The hash column and the columns in exclude_columns are not selected
+
+        Output      :   A generator of pandas dataframes
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.iter_collection_as_dataframes.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            n_chunks = 0
+
+            with closing(self.connect(db_name)) as conn:
+                exclude = set(exclude_columns or []) | {self.hash_field}
+
+                columns = [
+                    col
+                    for col in self.get_table_columns(conn, collection_name)
+                    if col not in exclude
+                ]
+
+                if len(columns) > 0:
+                    cursor = conn.execute(
+                        f"SELECT {', '.join(map(quote_name, columns))} "
+                        f"FROM {quote_name(collection_name)} ORDER BY rowid"
+                    )
+
+                    while True:
+                        rows = cursor.fetchmany(self.export_chunk_rows)
+
+                        if not rows:
+                            break
+
+                        yield pd.DataFrame.from_records(rows, columns=columns)
+
+                        n_chunks += 1
+
+            self.log_writer.log(
+                log_file,
+                f"Streamed {collection_name} table as {n_chunks} dataframe chunks",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def get_collection_as_dataframe(
+        self, db_name, collection_name, log_file, exclude_columns=None
+    ):
+        """
+        Method Name :   get_collection_as_dataframe
+        Description :   This method reads the collection table as one dataframe, built from the streamed chunks
+                        of iter_collection_as_dataframes
+
+        Output      :   A pandas dataframe
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.get_collection_as_dataframe.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            chunks = list(
+                self.iter_collection_as_dataframes(
+                    db_name, collection_name, log_file, exclude_columns
+                )
+            )
+
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file, rows=len(df),
+            )
+
+            return df
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def profile_collection(self, db_name, collection_name, log_file):
+        """
+        Method Name :   profile_collection
+        Description :   This method profiles the columns of the collection table with SQL aggregates run inside
+                        SQLite, at most SQLITE_MAX_PROFILE_COLUMNS columns per query
+
+        Output      :   A dict of column name to its profile, as in MongoDB_Operation.profile_collection
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.profile_collection.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            with closing(self.connect(db_name)) as conn:
+                columns = [
+                    col
+                    for col in self.get_table_columns(conn, collection_name)
+                    if col != self.hash_field
+                ]
+
+                table = quote_name(collection_name)
+
+                totals = {
+                    "rows": conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                }
+
+                na_params = ", ".join("?" * len(self.na_values))
+
+                for start in range(0, len(columns), SQLITE_MAX_PROFILE_COLUMNS):
+                    idx = range(start, min(start + SQLITE_MAX_PROFILE_COLUMNS, len(columns)))
+
+                    inner = ", ".join(
+                        f"{quote_name(columns[i])} AS v{i}, to_double({quote_name(columns[i])}) AS d{i}"
+                        for i in idx
+                    )
+
+                    keys, aggregates, params = [], [], []
+
+                    for i in idx:
+                        keys += [f"n{i}", f"c{i}", f"s{i}", f"q{i}", f"mn{i}", f"mx{i}"]
+
+                        aggregates += [
+                            f"SUM(CASE WHEN v{i} IS NULL OR v{i} IN ({na_params}) THEN 1 ELSE 0 END)",
+                            f"COUNT(d{i})",
+                            f"SUM(d{i})",
+                            f"SUM(d{i} * d{i})",
+                            f"MIN(d{i})",
+                            f"MAX(d{i})",
+                        ]
+
+                        params += self.na_values
+
+                    result = conn.execute(
+                        f"SELECT {', '.join(aggregates)} FROM (SELECT {inner} FROM {table})",
+                        params,
+                    ).fetchone()
+
+                    add_to_totals(totals, dict(zip(keys, result)))
+
+            for i in range(len(columns)):
+                totals[f"p{i}"] = totals["rows"]
+
+            profile = get_profile(columns, totals)
+
+            self.log_writer.log(
+                log_file,
+                f"Profiled {len(columns)} columns of {totals['rows']} rows of {collection_name} table",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+            return profile
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def get_columns_to_drop(
+        self, profile, null_threshold, keep_columns, log_file, drop_zero_variance=False
+    ):
+        """
+        Method Name :   get_columns_to_drop
+        Description :   This method picks from the profile the columns over null_threshold nulls, and with
+                        drop_zero_variance the ones with zero variance, apart from keep_columns
+
+        Output      :   A list of column names
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.get_columns_to_drop.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            cols_to_drop = get_columns_to_drop(
+                profile, null_threshold, keep_columns, drop_zero_variance
+            )
+
+            self.log_writer.log(
+                log_file,
+                f"Got {len(cols_to_drop)} columns with null ratio of {null_threshold} or more, with drop zero variance as {drop_zero_variance}",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+            return cols_to_drop
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+
+class Parquet_Staging_Operation:
+    """
+    Description :   This class stages the good data as a local Parquet dataset, with the same insert, export and
+                    profile methods as MongoDB_Operation. Every collection is a folder of the local staging dir
+                    and every inserted dataframe one part file, named after its content hash unless insert_mode
+                    is append, so that the part files are also the file registry
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(self):
+        self.config = read_params()
+
+        self.class_name = self.__class__.__name__
+
+        self.staging_dir = self.config["mongodb"]["local_staging_dir"]
+
+        self.export_chunk_rows = self.config["mongodb"]["export_chunk_rows"]
+
+        self.insert_mode = self.config["mongodb"]["insert_mode"]
+
+        self.na_values = self.config["storage_format"]["na_values"]
+
+        if self.insert_mode not in ("append", "skip_existing", "upsert"):
+            raise ValueError(
+                f"Unsupported insert mode {self.insert_mode}, use append, skip_existing or upsert"
+            )
+
+        self.hash_field = HASH_FIELD
+
+        self.log_writer = App_Logger()
+
+    def get_collection_dir(self, db_name, collection_name):
+        return os.path.join(self.staging_dir, db_name, collection_name)
+
+    def get_part_files(self, collection_dir):
+        """
+        Method Name :   get_part_files
+        Description :   This method lists the part files of a collection in the order they were written
+
+        Output      :   A list of paths
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if not os.path.isdir(collection_dir):
+            return []
+
+        parts = [
+            os.path.join(collection_dir, f)
+            for f in os.listdir(collection_dir)
+            if f.startswith("part-") and f.endswith(".parquet")
+        ]
+
+        return sorted(parts, key=lambda f: (os.path.getmtime(f), f))
+
+    def get_existing_hashes(self, part_files):
+        """
+        Method Name :   get_existing_hashes
+        Description :   This method reads the row hash column of the part files which have it
+
+        Output      :   A set of row hashes
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        existing = set()
+
+        for part in part_files:
+            if self.hash_field in pq.ParquetFile(part).schema_arrow.names:
+                table = pq.read_table(part, columns=[self.hash_field])
+
+                existing.update(table.column(0).to_pylist())
+
+        existing.discard(None)
+
+        return existing
+
+    def insert_dataframe_as_record(
+        self, data_frame, db_name, collection_name, log_file, fname=None
+    ):
+        """
+        Method Name :   insert_dataframe_as_record
+        Description :   This method writes the dataframe as a new part file of the collection. Unless insert_mode
+                        is append, a dataframe whose part file exists is skipped, and the rows whose hash is in
+                        the other part files are dropped before writing
+
+        Output      :   The number of rows written
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.insert_dataframe_as_record.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            collection_dir = self.get_collection_dir(db_name, collection_name)
+
+            os.makedirs(collection_dir, exist_ok=True)
+
+            new_rows = data_frame.copy()
+
+            new_rows.columns = [str(col) for col in new_rows.columns]
+
+            if self.insert_mode == "append":
+                part_name = uuid.uuid4().hex
+
+            else:
+                row_hashes = get_row_hashes(data_frame)
+
+                part_name = get_file_hash(row_hashes, data_frame.columns)
+
+                part_file = os.path.join(collection_dir, f"part-{part_name}.parquet")
+
+                if os.path.exists(part_file):
+                    self.log_writer.log(
+                        log_file,
+                        f"Content of {fname} was already inserted in {collection_name} dataset, skipping it",
+                    )
+
+                    self.log_writer.start_log(
+                        "exit", self.class_name, method_name, log_file,
+                    )
+
+                    return 0
+
+                existing = self.get_existing_hashes(self.get_part_files(collection_dir))
+
+                new_rows, row_hashes = get_new_rows(new_rows, row_hashes, existing)
+
+                new_rows = new_rows.reset_index(drop=True)
+
+                new_rows[self.hash_field] = row_hashes
+
+            part_file = os.path.join(collection_dir, f"part-{part_name}.parquet")
+
+            tmp_file = part_file + ".tmp"
+
+            new_rows.to_parquet(tmp_file, index=False)
+
+            os.replace(tmp_file, part_file)
+
+            self.log_writer.log(
+                log_file,
+                f"Wrote {len(new_rows)} of {len(data_frame)} records to {part_file}",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file, rows=len(new_rows),
+            )
+
+            return len(new_rows)
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def iter_collection_as_dataframes(
+        self, db_name, collection_name, log_file, exclude_columns=None
+    ):
+        """
+        Method Name :   iter_collection_as_dataframes
+        Description :   This method streams the part files of the collection as dataframes of up to
+                        export_chunk_rows rows. Only the columns which are needed are read
+
+        Output      :   A generator of pandas dataframes
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.iter_collection_as_dataframes.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            exclude = set(exclude_columns or []) | {self.hash_field}
+
+            n_chunks = 0
+
+            for part in self.get_part_files(
+                self.get_collection_dir(db_name, collection_name)
+            ):
+                part_file = pq.ParquetFile(part)
+
+                columns = [
+                    col for col in part_file.schema_arrow.names if col not in exclude
+                ]
+
+                for batch in part_file.iter_batches(
+                    batch_size=self.export_chunk_rows, columns=columns
+                ):
+                    yield batch.to_pandas()
+
+                    n_chunks += 1
+
+            self.log_writer.log(
+                log_file,
+                f"Streamed {collection_name} dataset as {n_chunks} dataframe chunks",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def get_collection_as_dataframe(
+        self, db_name, collection_name, log_file, exclude_columns=None
+    ):
+        """
+        Method Name :   get_collection_as_dataframe
+        Description :   This method reads the collection dataset as one dataframe, built from the streamed chunks
+                        of iter_collection_as_dataframes
+
+        Output      :   A pandas dataframe
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.get_collection_as_dataframe.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            chunks = list(
+                self.iter_collection_as_dataframes(
+                    db_name, collection_name, log_file, exclude_columns
+                )
+            )
+
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file, rows=len(df),
+            )
+
+            return df
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def profile_collection(self, db_name, collection_name, log_file):
+        """
+        Method Name :   profile_collection
+        Description :   This method profiles the columns of the collection dataset, reading one column of one part
+                        file at a time
+
+        Output      :   A dict of column name to its profile, as in MongoDB_Operation.profile_collection
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.profile_collection.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            parts = self.get_part_files(
+                self.get_collection_dir(db_name, collection_name)
+            )
+
+            columns, totals = [], {"rows": 0}
+
+            for part in parts:
+                part_file = pq.ParquetFile(part)
+
+                n_rows = part_file.metadata.num_rows
+
+                totals["rows"] += n_rows
+
+                for col in part_file.schema_arrow.names:
+                    if col == self.hash_field:
+                        continue
+
+                    if col not in columns:
+                        columns.append(col)
+
+                    i = columns.index(col)
+
+                    values = part_file.read(columns=[col]).column(0).to_pandas()
+
+                    col_totals = get_column_totals(values, self.na_values)
+
+                    col_totals["p"] = n_rows
+
+                    add_to_totals(
+                        totals, {f"{key}{i}": value for key, value in col_totals.items()}
+                    )
+
+            profile = get_profile(columns, totals)
+
+            self.log_writer.log(
+                log_file,
+                f"Profiled {len(columns)} columns of {totals['rows']} rows of {collection_name} dataset",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+            return profile
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def get_columns_to_drop(
+        self, profile, null_threshold, keep_columns, log_file, drop_zero_variance=False
+    ):
+        """
+        Method Name :   get_columns_to_drop
+        Description :   This method picks from the profile the columns over null_threshold nulls, and with
+                        drop_zero_variance the ones with zero variance, apart from keep_columns
+
+        Output      :   A list of column names
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.get_columns_to_drop.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            cols_to_drop = get_columns_to_drop(
+                profile, null_threshold, keep_columns, drop_zero_variance
+            )
+
+            self.log_writer.log(
+                log_file,
+                f"Got {len(cols_to_drop)} columns with null ratio of {null_threshold} or more, with drop zero variance as {drop_zero_variance}",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+            return cols_to_drop
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+
+def get_staging_operation(config):
+    """
+    Method Name :   get_staging_operation
+    Description :   This method creates the staging operation object for the staging_backend in the mongodb
+                    section of params.yaml, mongodb for MongoDB_Operation, sqlite or parquet for the embedded
+                    stores in local_staging_dir
+
+    Output      :   An object with the insert, export and profile methods of MongoDB_Operation
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    backend = config["mongodb"]["staging_backend"]
+
+    if backend == "mongodb":
+        return MongoDB_Operation()
+
+    elif backend == "sqlite":
+        return SQLite_Staging_Operation()
+
+    elif backend == "parquet":
+        return Parquet_Staging_Operation()
+
+    else:
+        raise ValueError(
+            f"Unsupported staging backend {backend}, use one of {list(STAGING_BACKENDS)}"
+        )
@@ -0,0 +1,216 @@
+import hashlib
+import math
+
+import pandas as pd
+
+HASH_FIELD = "_row_hash"
+
+
+def get_row_hashes(data_frame):
+    """
+    Method Name :   get_row_hashes
+    Description :   This method hashes the content of every row of the dataframe. Columns are taken in name
+                    order, numbers as float64 and everything else as text, so that the same row read from
+                    different files gets the same hash
+
+    Output      :   A list of hex strings, one per row
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    canonical = pd.DataFrame(index=range(len(data_frame)))
+
+    for col in sorted(data_frame.columns, key=str):
+        values = data_frame[col].reset_index(drop=True)
+
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(
+            values
+        ):
+            canonical[str(col)] = values.astype("float64")
+
+        else:
+            canonical[str(col)] = (
+                values.astype(object)
+                .where(values.notna(), None)
+                .map(lambda x: None if x is None else str(x))
+            )
+
+    hashes = pd.util.hash_pandas_object(canonical, index=False)
+
+    return [format(h, "016x") for h in hashes.tolist()]
+
+
+def get_file_hash(row_hashes, columns):
+    """
+    Method Name :   get_file_hash
+    Description :   This method hashes the content of a whole file from its column names and row hashes
+
+    Output      :   A hex string
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    digest = hashlib.sha1("\x1f".join(sorted(map(str, columns))).encode())
+
+    digest.update("".join(row_hashes).encode())
+
+    return digest.hexdigest()
+
+
+def get_new_rows(data_frame, row_hashes, existing):
+    """
+    Method Name :   get_new_rows
+    Description :   This method drops the rows of the dataframe whose hash is in existing or repeats an earlier
+                    row of the same dataframe
+
+    Output      :   The new rows and their hashes
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    hashes = pd.Series(row_hashes)
+
+    keep = (~hashes.duplicated() & ~hashes.isin(existing)).to_numpy()
+
+    return data_frame[keep], hashes[keep].tolist()
+
+
+def get_column_totals(values, na_values):
+    """
+    Method Name :   get_column_totals
+    Description :   This method computes the profile totals of one column of values, the null count with the
+                    na tokens counted as null, and the count, sum, sum of squares, min and max of the values which
+                    are numbers
+
+    Output      :   A dict with the keys n, c, s, q, mn and mx
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    nulls = int(values.isna().sum())
+
+    if pd.api.types.is_bool_dtype(values):
+        numbers = pd.Series(dtype="float64")
+
+    elif pd.api.types.is_numeric_dtype(values):
+        numbers = values.astype("float64").dropna()
+
+    else:
+        nulls += int(values.isin(na_values).sum())
+
+        numbers = pd.to_numeric(values, errors="coerce").dropna()
+
+    if len(numbers) == 0:
+        return {"n": nulls, "c": 0, "s": 0.0, "q": 0.0, "mn": None, "mx": None}
+
+    return {
+        "n": nulls,
+        "c": int(len(numbers)),
+        "s": float(numbers.sum()),
+        "q": float((numbers * numbers).sum()),
+        "mn": float(numbers.min()),
+        "mx": float(numbers.max()),
+    }
+
+
+def add_to_totals(totals, result):
+    """
+    Method Name :   add_to_totals
+    Description :   This method merges a result of profile totals into totals. Totals are keyed by a prefix and
+                    the column index, like n0 or mx12, min and max are combined and everything else is added up
+
+    Output      :   The totals are updated
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    for key, value in result.items():
+        if key == "_id" or value is None:
+            continue
+
+        prev = totals.get(key)
+
+        if key.startswith("mn"):
+            totals[key] = value if prev is None else min(prev, value)
+
+        elif key.startswith("mx"):
+            totals[key] = value if prev is None else max(prev, value)
+
+        else:
+            totals[key] = (prev or 0) + value
+
+
+def get_profile(columns, totals):
+    """
+    Method Name :   get_profile
+    Description :   This method turns the profile totals of the columns into their profile. p is the number of
+                    rows which have the column, the other rows are counted as null, and std is the sample
+                    standard deviation of the numbers
+
+    Output      :   A dict of column name to its rows, nulls, null_ratio, count, mean, std, min, max and
+                    zero_variance
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    rows, profile = totals.get("rows", 0), {}
+
+    for i, col in enumerate(columns):
+        nulls = totals.get(f"n{i}", 0) + rows - totals.get(f"p{i}", 0)
+
+        count = totals.get(f"c{i}", 0)
+
+        total, total_sq = totals.get(f"s{i}", 0), totals.get(f"q{i}", 0)
+
+        col_min, col_max = totals.get(f"mn{i}"), totals.get(f"mx{i}")
+
+        std = None
+
+        if count > 1:
+            var = (total_sq - total * total / count) / (count - 1)
+
+            std = 0.0 if col_min == col_max else math.sqrt(max(var, 0.0))
+
+        profile[col] = {
+            "rows": rows,
+            "nulls": nulls,
+            "null_ratio": nulls / rows if rows > 0 else 0.0,
+            "count": count,
+            "mean": total / count if count > 0 else None,
+            "std": std,
+            "min": col_min,
+            "max": col_max,
+            "zero_variance": rows > 1 and count > 0 and col_min == col_max,
+        }
+
+    return profile
+
+
+def get_columns_to_drop(profile, null_threshold, keep_columns, drop_zero_variance=False):
+    """
+    Method Name :   get_columns_to_drop
+    Description :   This method picks from the profile the columns with a null ratio of null_threshold or more,
+                    and with drop_zero_variance the ones with zero variance, which only prediction drops. The
+                    columns in keep_columns, like the target column, are never picked
+
+    Output      :   A list of column names
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    return [
+        col
+        for col, stats in profile.items()
+        if col not in keep_columns
+        and (
+            stats["null_ratio"] >= null_threshold
+            or (drop_zero_variance is True and stats["zero_variance"])
+        )
+    ]
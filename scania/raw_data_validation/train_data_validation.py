@@ -25,21 +25,21 @@ class Raw_Train_Data_Validation:
 
         self.s3 = S3_Operation()
 
-        self.train_data_bucket = self.config["s3_bucket"]["scania_train_data"]
+        self.train_data_bucket = self.config["s3_bucket"]["scania_train_data_bucket"]
 
-        self.input_files_bucket = self.config["s3_bucket"]["input_files"]
+        self.input_files_bucket = self.config["s3_bucket"]["input_files_bucket"]
 
         self.raw_train_data_dir = self.config["data"]["raw_data"]["train_batch"]
 
-        self.train_schema_file = self.config["schema_file"]["train"]
+        self.train_schema_file = self.config["schema_file"]["train_schema_file"]
 
         self.regex_file = self.config["regex_file"]
 
         self.train_schema_log = self.config["train_db_log"]["values_from_schema"]
 
-        self.good_train_data_dir = self.config["data"]["train"]["good"]
+        self.good_train_data_dir = self.config["data"]["train"]["good_data_dir"]
 
-        self.bad_train_data_dir = self.config["data"]["train"]["bad"]
+        self.bad_train_data_dir = self.config["data"]["train"]["bad_data_dir"]
 
         self.train_gen_log = self.config["train_db_log"]["general"]
 
@@ -69,8 +69,11 @@ class Raw_Train_Data_Validation:
                 "start", self.class_name, method_name, self.train_schema_log,
             )
 
-            dic = self.s3.read_json(
-                self.train_schema_file, self.input_files_bucket, self.train_schema_log,
+            dic = self.s3.read_control_file(
+                self.train_schema_file,
+                self.input_files_bucket,
+                self.train_schema_log,
+                file_type="json",
             )
 
             LengthOfDateStampInFile = dic["LengthOfDateStampInFile"]
@@ -113,9 +116,9 @@ class Raw_Train_Data_Validation:
     def get_regex_pattern(self):
         """
         Method Name :   get_regex_pattern
-        Description :   This method gets regex pattern from input files s3 bucket
+        Description :   This method gets regex pattern from input files s3 bucket, through the control file cache
 
-        Output      :   A regex pattern is extracted
+        Output      :   A compiled regex pattern is extracted
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -128,12 +131,15 @@ class Raw_Train_Data_Validation:
                 "start", self.class_name, method_name, self.train_gen_log,
             )
 
-            regex = self.s3.read_text(
-                self.regex_file, self.input_files_bucket, self.train_gen_log,
+            regex = self.s3.read_control_file(
+                self.regex_file,
+                self.input_files_bucket,
+                self.train_gen_log,
+                file_type="regex",
             )
 
             self.log_writer.log(
-                self.train_gen_log, f"Got {regex} pattern",
+                self.train_gen_log, f"Got {regex.pattern} pattern",
             )
 
             self.log_writer.start_log(
@@ -183,11 +189,12 @@ class Raw_Train_Data_Validation:
             )
 
     def validate_raw_fname(
-        self, regex, LengthOfDateStampInFile, LengthOfTimeStampInFile
+        self, regex, LengthOfDateStampInFile, LengthOfTimeStampInFile, fnames=None
     ):
         """
         Method Name :   validate_raw_fname
-        Description :   This method validates the raw file name based on regex pattern and schema values
+        Description :   This method validates the raw file name based on regex pattern and schema values. With
+                        fnames, only the raw files with those names are validated
 
         Output      :   Raw file names are validated, good file names are stored in good data folder and rest is stored in bad data
         On Failure  :   Write an exception log and then raise an exception
@@ -205,17 +212,23 @@ class Raw_Train_Data_Validation:
             self.create_dirs_for_good_bad_data(self.train_name_valid_log)
 
             onlyfiles = self.s3.get_files_from_folder(
-                self.raw_data_bucket,
                 self.raw_train_data_dir,
+                self.raw_data_bucket,
                 self.train_name_valid_log,
             )
 
-            train_batch_files = [f.split("/")[1] for f in onlyfiles]
+            train_batch_files = [
+                f.split("/")[1]
+                for f in onlyfiles
+                if fnames is None or f.split("/")[1] in fnames
+            ]
 
             self.log_writer.log(
                 self.train_name_valid_log, "Got training files with absolute file name",
             )
 
+            good_pairs, bad_pairs = [], []
+
             for fname in train_batch_files:
                 raw_data_train_fname = self.raw_train_data_dir + "/" + fname
 
@@ -228,46 +241,44 @@ class Raw_Train_Data_Validation:
                     "Created raw,good and bad data file name",
                 )
 
-                if re.match(regex, fname):
+                if regex.match(fname):
                     splitAtDot = re.split(".csv", fname)
 
                     splitAtDot = re.split("_", splitAtDot[0])
 
                     if len(splitAtDot[1]) == LengthOfDateStampInFile:
                         if len(splitAtDot[2]) == LengthOfTimeStampInFile:
-                            self.s3.copy_data(
-                                raw_data_train_fname,
-                                self.train_data_bucket,
-                                good_data_train_fname,
-                                self.train_data_bucket,
-                                self.train_name_valid_log,
+                            good_pairs.append(
+                                (raw_data_train_fname, good_data_train_fname)
                             )
 
                         else:
-                            self.s3.copy_data(
-                                raw_data_train_fname,
-                                self.train_data_bucket,
-                                bad_data_train_fname,
-                                self.train_data_bucket,
-                                self.train_name_valid_log,
+                            bad_pairs.append(
+                                (raw_data_train_fname, bad_data_train_fname)
                             )
 
                     else:
-                        self.s3.copy_data(
-                            raw_data_train_fname,
-                            self.train_data_bucket,
-                            bad_data_train_fname,
-                            self.train_data_bucket,
-                            self.train_name_valid_log,
-                        )
+                        bad_pairs.append((raw_data_train_fname, bad_data_train_fname))
                 else:
-                    self.s3.copy_data(
-                        raw_data_train_fname,
-                        self.train_data_bucket,
-                        bad_data_train_fname,
-                        self.train_data_bucket,
-                        self.train_name_valid_log,
-                    )
+                    bad_pairs.append((raw_data_train_fname, bad_data_train_fname))
+
+            self.s3.check_manifest(
+                self.s3.copy_many(
+                    good_pairs,
+                    self.raw_data_bucket,
+                    self.train_data_bucket,
+                    self.train_name_valid_log,
+                )
+            )
+
+            self.s3.check_manifest(
+                self.s3.copy_many(
+                    bad_pairs,
+                    self.raw_data_bucket,
+                    self.train_data_bucket,
+                    self.train_name_valid_log,
+                )
+            )
 
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, self.train_name_valid_log,
@@ -278,10 +289,11 @@ class Raw_Train_Data_Validation:
                 e, self.class_name, method_name, self.train_name_valid_log,
             )
 
-    def validate_col_length(self, NumberofColumns):
+    def validate_col_length(self, NumberofColumns, fnames=None):
         """
         Method Name :   validate_col_length
-        Description :   This method validates the column length based on number of columns as mentioned in schema values
+        Description :   This method validates the column length based on number of columns as mentioned in schema values.
+                        With fnames, only the good files with those names are validated
 
         Output      :   The files' columns length are validated and good data is stored in good data folder and rest is stored in bad data folder
         On Failure  :   Write an exception log and then raise an exception
@@ -296,37 +308,37 @@ class Raw_Train_Data_Validation:
         )
 
         try:
-            lst = self.s3.read_csv_from_folder(
+            lst = self.s3.peek_headers_from_folder(
                 self.good_train_data_dir,
                 self.train_data_bucket,
                 self.train_col_valid_log,
+                fnames=fnames,
             )
 
-            for idx, f in enumerate(lst):
-                df = f[idx][0]
-
-                file = f[idx][1]
-
-                abs_f = f[idx][2]
+            bad_pairs = []
 
+            for _, n_cols, file, abs_f in lst:
                 if file.endswith(".csv"):
-                    if df.shape[1] == NumberofColumns:
+                    if n_cols == NumberofColumns:
                         pass
 
                     else:
                         dest_f = self.bad_train_data_dir + "/" + abs_f
 
-                        self.s3.move_data(
-                            file,
-                            self.train_data_bucket,
-                            dest_f,
-                            self.train_data_bucket,
-                            self.train_col_valid_log,
-                        )
+                        bad_pairs.append((file, dest_f))
 
                 else:
                     pass
 
+            self.s3.check_manifest(
+                self.s3.move_many(
+                    bad_pairs,
+                    self.train_data_bucket,
+                    self.train_data_bucket,
+                    self.train_col_valid_log,
+                )
+            )
+
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, self.train_col_valid_log,
             )
@@ -336,10 +348,11 @@ class Raw_Train_Data_Validation:
                 e, self.class_name, method_name, self.train_col_valid_log,
             )
 
-    def validate_missing_values_in_col(self):
+    def validate_missing_values_in_col(self, fnames=None):
         """
         Method Name :   validate_missing_values_in_col
-        Description :   This method validates the missing values in columns
+        Description :   This method validates the missing values in columns. With fnames, only the good files with
+                        those names are validated
 
         Output      :   Missing columns are validated, and good data is stored in good data folder and rest is to stored in bad data folder
         On Failure  :   Write an exception log and then raise an exception
@@ -354,19 +367,16 @@ class Raw_Train_Data_Validation:
         )
 
         try:
-            lst = self.s3.read_csv_from_folder(
+            lst = self.s3.iter_csv_from_folder(
                 self.good_train_data_dir,
                 self.train_data_bucket,
                 self.train_missing_value_log,
+                fnames=fnames,
             )
 
-            for idx, f in lst:
-                df = f[idx][0]
-
-                file = f[idx][1]
-
-                abs_f = f[idx][2]
+            bad_pairs = []
 
+            for df, file, abs_f in lst:
                 if abs_f.endswith(".csv"):
                     count = 0
 
@@ -376,13 +386,7 @@ class Raw_Train_Data_Validation:
 
                             dest_f = self.bad_train_data_dir + "/" + abs_f
 
-                            self.s3.move_data(
-                                file,
-                                self.train_data_bucket,
-                                dest_f,
-                                self.train_data_bucket,
-                                self.train_missing_value_log,
-                            )
+                            bad_pairs.append((file, dest_f))
 
                             break
 
@@ -400,9 +404,18 @@ class Raw_Train_Data_Validation:
                 else:
                     pass
 
-                self.log_writer.start_log(
-                    "exit", self.class_name, method_name, self.train_missing_value_log,
+            self.s3.check_manifest(
+                self.s3.move_many(
+                    bad_pairs,
+                    self.train_data_bucket,
+                    self.train_data_bucket,
+                    self.train_missing_value_log,
                 )
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, self.train_missing_value_log,
+            )
 
         except Exception as e:
             self.log_writer.exception_log(
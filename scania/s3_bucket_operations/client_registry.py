@@ -0,0 +1,113 @@
+import threading
+
+import boto3
+from botocore.config import Config
+from scania.s3_bucket_operations.retry_controller import (
+    Managed_Client,
+    get_retry_controller,
+)
+from scania.s3_bucket_operations.storage_backends import Local_Storage_Client
+
+storage_clients = {}
+
+storage_clients_lock = threading.Lock()
+
+
+def get_botocore_config(config):
+    """
+    Method Name :   get_botocore_config
+    Description :   This method builds the botocore config with the connection pool, keep-alive, timeout and retry
+                    settings of the s3_client section of params.yaml. When the retry controller of s3_retry is
+                    enabled, botocore does not retry by itself, so that throttling reaches the controller
+
+    Output      :   A botocore Config object
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    client_config = config["s3_client"]
+
+    max_attempts = client_config["retries"]["max_attempts"]
+
+    if config["s3_retry"]["enabled"] is True:
+        max_attempts = 0
+
+    kwargs = {
+        "max_pool_connections": client_config["max_pool_connections"],
+        "connect_timeout": client_config["connect_timeout"],
+        "read_timeout": client_config["read_timeout"],
+        "retries": {
+            "max_attempts": max_attempts,
+            "mode": client_config["retries"]["mode"],
+        },
+    }
+
+    try:
+        return Config(tcp_keepalive=client_config["tcp_keepalive"], **kwargs)
+
+    except TypeError:
+        return Config(**kwargs)
+
+
+def get_storage_client(config):
+    """
+    Method Name :   get_storage_client
+    Description :   This method returns the process wide storage client for the backend chosen in the storage
+                    section of params.yaml. Clients are thread safe, so one client and one connection pool is
+                    shared by every S3_Operation object of the process. With s3_retry enabled, the client
+                    is wrapped so that its calls go through the shared retry controller
+
+    Output      :   A storage client with the boto3 s3 client interface
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    backend = config["storage"]["backend"]
+
+    if backend == "local":
+        registry_key = (backend, config["storage"]["local_root"])
+
+    elif backend == "s3":
+        registry_key = (backend, None)
+
+    else:
+        raise ValueError(f"Unsupported storage backend {backend}, use s3 or local")
+
+    client = storage_clients.get(registry_key)
+
+    if client is not None:
+        return client
+
+    with storage_clients_lock:
+        if registry_key not in storage_clients:
+            if backend == "s3":
+                session = boto3.session.Session()
+
+                client = session.client("s3", config=get_botocore_config(config))
+
+            else:
+                client = Local_Storage_Client(config["storage"]["local_root"])
+
+            if config["s3_retry"]["enabled"] is True:
+                client = Managed_Client(client, get_retry_controller(config))
+
+            storage_clients[registry_key] = client
+
+        return storage_clients[registry_key]
+
+
+def clear_storage_clients():
+    """
+    Method Name :   clear_storage_clients
+    Description :   This method drops the shared storage clients, so that they are created again on next use
+
+    Output      :   The registry is emptied
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    with storage_clients_lock:
+        storage_clients.clear()
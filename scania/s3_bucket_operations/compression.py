@@ -0,0 +1,161 @@
+import gzip
+import zlib
+from contextlib import contextmanager
+from io import BytesIO
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def check_codec(codec):
+    """
+    Method Name :   check_codec
+    Description :   This method checks whether the compression codec is supported and installed
+
+    Output      :   The codec is returned as it is, None means no compression
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if codec is None:
+        return codec
+
+    if codec not in ("gzip", "zstd"):
+        raise ValueError(f"Unsupported compression codec {codec}, use gzip or zstd")
+
+    if codec == "zstd" and zstandard is None:
+        raise ImportError("zstd compression requires the zstandard package")
+
+    return codec
+
+
+@contextmanager
+def compressed_writer(fileobj, codec=None, level=None):
+    """
+    Method Name :   compressed_writer
+    Description :   This method wraps a binary file object in a streaming compressor, so that data is compressed
+                    as it is written. The compressed frame is finished on exit without closing the file object
+
+    Output      :   A binary writer is yielded
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    codec = check_codec(codec)
+
+    if codec is None:
+        yield fileobj
+
+    elif codec == "gzip":
+        writer = gzip.GzipFile(
+            fileobj=fileobj, mode="wb", compresslevel=6 if level is None else level
+        )
+
+        try:
+            yield writer
+
+        finally:
+            writer.close()
+
+    else:
+        cctx = zstandard.ZstdCompressor(level=3 if level is None else level)
+
+        writer = cctx.stream_writer(fileobj)
+
+        try:
+            yield writer
+
+        finally:
+            writer.flush(zstandard.FLUSH_FRAME)
+
+
+def get_codec(content_encoding):
+    """
+    Method Name :   get_codec
+    Description :   This method maps the content encoding metadata of an object to a compression codec
+
+    Output      :   gzip or zstd, None if the object is not compressed with a supported codec
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if content_encoding is None:
+        return None
+
+    codec = content_encoding.strip().lower()
+
+    if codec in ("gzip", "x-gzip"):
+        return "gzip"
+
+    if codec == "zstd":
+        return check_codec(codec)
+
+    return None
+
+
+def decompressed_reader(fileobj, codec=None):
+    """
+    Method Name :   decompressed_reader
+    Description :   This method wraps a binary file object in a streaming decompressor, so that data is
+                    decompressed as it is read
+
+    Output      :   A binary reader is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    codec = check_codec(codec)
+
+    if codec is None:
+        return fileobj
+
+    elif codec == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+
+    else:
+        return zstandard.ZstdDecompressor().stream_reader(fileobj)
+
+
+def decompress(data, codec=None):
+    """
+    Method Name :   decompress
+    Description :   This method decompresses the complete data of an object
+
+    Output      :   The decompressed bytes are returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if check_codec(codec) is None:
+        return data
+
+    return decompressed_reader(BytesIO(data), codec).read()
+
+
+def decompress_prefix(data, codec=None):
+    """
+    Method Name :   decompress_prefix
+    Description :   This method decompresses as much as possible of the leading bytes of an object, as read by a
+                    ranged GET request
+
+    Output      :   The decompressed bytes are returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if check_codec(codec) is None:
+        return data
+
+    elif codec == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(data)
+
+    else:
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
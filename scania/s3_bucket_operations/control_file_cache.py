@@ -0,0 +1,150 @@
+import json
+import re
+import threading
+import time
+from contextlib import closing
+
+from botocore.exceptions import ClientError
+from scania.s3_bucket_operations.compression import decompress, get_codec
+
+
+def parse_text(data):
+    return data.decode()
+
+
+def parse_json(data):
+    return json.loads(data.decode())
+
+
+def parse_regex(data):
+    return re.compile(data.decode().strip())
+
+
+PARSERS = {"text": parse_text, "json": parse_json, "regex": parse_regex}
+
+
+class Control_File_Cache:
+    """
+    Description :   This class caches the small control files of s3 bucket, like the schema files and the regex
+                    file, as parsed objects. An entry is served from memory for ttl_seconds, after which it is
+                    revalidated with a conditional GET on its ETag and parsed again only if it has changed
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(self, ttl_seconds):
+        self.ttl_seconds = ttl_seconds
+
+        self.entries = {}
+
+        self.lock = threading.Lock()
+
+        self.stats = {"hits": 0, "revalidations": 0, "misses": 0}
+
+    def get(self, s3_client, bucket, key, file_type="text"):
+        """
+        Method Name :   get
+        Description :   This method returns the control file parsed as file_type, one of text, json or regex.
+                        The object is read by key, without listing the bucket
+
+        Output      :   A str, a parsed json object or a compiled regex pattern
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        parse = PARSERS[file_type]
+
+        cache_key = (bucket, key, file_type)
+
+        with self.lock:
+            cached = self.entries.get(cache_key)
+
+        kwargs = {"Bucket": bucket, "Key": key}
+
+        if cached is not None:
+            etag, parsed, fetched_at = cached
+
+            if time.monotonic() - fetched_at < self.ttl_seconds:
+                with self.lock:
+                    self.stats["hits"] += 1
+
+                return parsed
+
+            kwargs["IfNoneMatch"] = etag
+
+        try:
+            response = s3_client.get_object(**kwargs)
+
+        except ClientError as e:
+            not_modified = e.response["Error"]["Code"] in ("304", "NotModified")
+
+            if cached is None or not_modified is False:
+                raise e
+
+            with self.lock:
+                self.entries[cache_key] = (etag, parsed, time.monotonic())
+
+                self.stats["revalidations"] += 1
+
+            return parsed
+
+        with closing(response["Body"]) as body:
+            data = decompress(body.read(), get_codec(response.get("ContentEncoding")))
+
+        parsed = parse(data)
+
+        with self.lock:
+            self.entries[cache_key] = (response["ETag"], parsed, time.monotonic())
+
+            self.stats["misses"] += 1
+
+        return parsed
+
+    def invalidate(self, bucket=None, key=None):
+        with self.lock:
+            for cache_key in list(self.entries):
+                if bucket is not None and cache_key[0] != bucket:
+                    continue
+
+                if key is not None and cache_key[1] != key:
+                    continue
+
+                del self.entries[cache_key]
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+
+            stats["entries"] = len(self.entries)
+
+        return stats
+
+
+control_file_cache = None
+
+control_file_cache_lock = threading.Lock()
+
+
+def get_control_file_cache(config):
+    """
+    Method Name :   get_control_file_cache
+    Description :   This method returns the process wide control file cache, creating it from the
+                    control_file_cache section of params.yaml on first use
+
+    Output      :   A Control_File_Cache object is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    global control_file_cache
+
+    with control_file_cache_lock:
+        if control_file_cache is None:
+            control_file_cache = Control_File_Cache(
+                ttl_seconds=config["control_file_cache"]["ttl_seconds"]
+            )
+
+        return control_file_cache
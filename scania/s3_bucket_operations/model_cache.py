@@ -0,0 +1,346 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+from botocore.exceptions import ClientError
+
+
+class Model_Cache:
+    """
+    Description :   This class is used for caching the models loaded from s3 bucket. Deserialized models are kept
+                    in an in-process LRU, and the raw objects are kept in a size bounded directory on disk. Both
+                    tiers are keyed by bucket and key, and revalidated against the object ETag with a
+                    conditional GET, so that a model is downloaded again only when it has changed in s3 bucket
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(self, max_models, cache_dir, max_disk_bytes, revalidate_seconds=0):
+        self.max_models = max_models
+
+        self.cache_dir = cache_dir
+
+        self.max_disk_bytes = max_disk_bytes
+
+        self.revalidate_seconds = revalidate_seconds
+
+        self.lock = threading.Lock()
+
+        self.models = OrderedDict()
+
+        self.disk_entries = OrderedDict()
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.scan_disk()
+
+    def scan_disk(self):
+        """
+        Method Name :   scan_disk
+        Description :   This method indexes the objects already present in the disk cache, oldest first
+
+        Output      :   The disk cache index is rebuilt
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        entries = []
+
+        for fname in os.listdir(self.cache_dir):
+            if not fname.endswith(".json"):
+                continue
+
+            meta_path = os.path.join(self.cache_dir, fname)
+
+            try:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+
+                entries.append((os.path.getmtime(meta_path), fname[:-5], meta))
+
+            except (OSError, ValueError):
+                continue
+
+        for _, digest, meta in sorted(entries, key=lambda x: x[0]):
+            self.disk_entries[digest] = meta
+
+    def get_digest(self, bucket, key):
+        return hashlib.sha1(f"{bucket}/{key}".encode()).hexdigest()
+
+    def fetch(self, s3_client, bucket, key, etag=None):
+        """
+        Method Name :   fetch
+        Description :   This method gets the object from s3 bucket, conditionally on the etag if one is given
+
+        Output      :   None if the object has not changed, otherwise a tuple of body, etag and content encoding
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        kwargs = {"Bucket": bucket, "Key": key}
+
+        if etag is not None:
+            kwargs["IfNoneMatch"] = etag
+
+        try:
+            response = s3_client.get_object(**kwargs)
+
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("304", "NotModified"):
+                return None
+
+            raise e
+
+        with closing(response["Body"]) as body:
+            return body.read(), response["ETag"], response.get("ContentEncoding")
+
+    def get_model(self, s3_client, bucket, key, loads):
+        """
+        Method Name :   get_model
+        Description :   This method returns the model for bucket and key, from memory, from disk or from s3 bucket
+                        in that order. loads is called with the raw object and its content encoding to
+                        deserialize the model
+
+        Output      :   A deserialized model is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        cache_key = (bucket, key)
+
+        digest = self.get_digest(bucket, key)
+
+        with self.lock:
+            cached = self.models.get(cache_key)
+
+            disk_meta = self.disk_entries.get(digest)
+
+        fetched = None
+
+        if cached is not None:
+            etag, model, checked_at = cached
+
+            if time.time() - checked_at < self.revalidate_seconds:
+                return self.memory_hit(cache_key, etag, model, False)
+
+            fetched = self.fetch(s3_client, bucket, key, etag)
+
+            if fetched is None:
+                return self.memory_hit(cache_key, etag, model, True)
+
+        elif disk_meta is not None:
+            fetched = self.fetch(s3_client, bucket, key, disk_meta["etag"])
+
+            data = self.read_disk(digest) if fetched is None else None
+
+            if data is not None:
+                model = loads(data, disk_meta["content_encoding"])
+
+                with self.lock:
+                    self.stats["disk_hits"] += 1
+
+                    if digest in self.disk_entries:
+                        self.disk_entries.move_to_end(digest)
+
+                self.put_memory(cache_key, disk_meta["etag"], model)
+
+                return model
+
+        if fetched is None:
+            fetched = self.fetch(s3_client, bucket, key)
+
+        data, etag, content_encoding = fetched
+
+        model = loads(data, content_encoding)
+
+        with self.lock:
+            self.stats["misses"] += 1
+
+        self.put_disk(digest, bucket, key, etag, content_encoding, data)
+
+        self.put_memory(cache_key, etag, model)
+
+        return model
+
+    def memory_hit(self, cache_key, etag, model, revalidated):
+        with self.lock:
+            self.stats["memory_hits"] += 1
+
+            if cache_key in self.models:
+                self.models.move_to_end(cache_key)
+
+                if revalidated is True:
+                    self.models[cache_key] = (etag, model, time.time())
+
+        return model
+
+    def put_memory(self, cache_key, etag, model):
+        with self.lock:
+            self.models[cache_key] = (etag, model, time.time())
+
+            self.models.move_to_end(cache_key)
+
+            while len(self.models) > self.max_models:
+                self.models.popitem(last=False)
+
+                self.stats["memory_evictions"] += 1
+
+    def read_disk(self, digest):
+        try:
+            with open(os.path.join(self.cache_dir, digest + ".bin"), "rb") as f:
+                return f.read()
+
+        except OSError:
+            with self.lock:
+                self.disk_entries.pop(digest, None)
+
+            return None
+
+    def put_disk(self, digest, bucket, key, etag, content_encoding, data):
+        """
+        Method Name :   put_disk
+        Description :   This method writes the raw object to the disk cache and evicts the least recently used
+                        objects until the cache fits in max_disk_bytes
+
+        Output      :   The raw object is stored in the disk cache
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if len(data) > self.max_disk_bytes:
+            return
+
+        meta = {
+            "bucket": bucket,
+            "key": key,
+            "etag": etag,
+            "content_encoding": content_encoding,
+            "size": len(data),
+        }
+
+        bin_path = os.path.join(self.cache_dir, digest + ".bin")
+
+        meta_path = os.path.join(self.cache_dir, digest + ".json")
+
+        tmp_suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+
+        with open(bin_path + tmp_suffix, "wb") as f:
+            f.write(data)
+
+        with open(meta_path + tmp_suffix, "w") as f:
+            json.dump(meta, f)
+
+        os.replace(bin_path + tmp_suffix, bin_path)
+
+        os.replace(meta_path + tmp_suffix, meta_path)
+
+        with self.lock:
+            self.disk_entries[digest] = meta
+
+            self.disk_entries.move_to_end(digest)
+
+            total = sum(m["size"] for m in self.disk_entries.values())
+
+            evicted = []
+
+            while total > self.max_disk_bytes and len(self.disk_entries) > 1:
+                old_digest, old_meta = self.disk_entries.popitem(last=False)
+
+                total -= old_meta["size"]
+
+                evicted.append(old_digest)
+
+                self.stats["disk_evictions"] += 1
+
+        for old_digest in evicted:
+            for ext in (".bin", ".json"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, old_digest + ext))
+
+                except OSError:
+                    pass
+
+    def invalidate(self, bucket, key):
+        """
+        Method Name :   invalidate
+        Description :   This method drops the cached model for bucket and key from both tiers
+
+        Output      :   The model is removed from the cache
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        digest = self.get_digest(bucket, key)
+
+        with self.lock:
+            self.models.pop((bucket, key), None)
+
+            self.disk_entries.pop(digest, None)
+
+        for ext in (".bin", ".json"):
+            try:
+                os.remove(os.path.join(self.cache_dir, digest + ext))
+
+            except OSError:
+                pass
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+
+            stats["memory_entries"] = len(self.models)
+
+            stats["disk_entries"] = len(self.disk_entries)
+
+            stats["disk_bytes"] = sum(m["size"] for m in self.disk_entries.values())
+
+        return stats
+
+
+model_cache = None
+
+model_cache_lock = threading.Lock()
+
+
+def get_model_cache(config):
+    """
+    Method Name :   get_model_cache
+    Description :   This method returns the process wide model cache, creating it from the model_cache section
+                    of params.yaml on first use
+
+    Output      :   A Model_Cache object is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    global model_cache
+
+    with model_cache_lock:
+        if model_cache is None:
+            model_cache = Model_Cache(
+                max_models=config["model_cache"]["max_models"],
+                cache_dir=config["model_cache"]["cache_dir"],
+                max_disk_bytes=config["model_cache"]["max_disk_bytes"],
+                revalidate_seconds=config["model_cache"]["revalidate_seconds"],
+            )
+
+        return model_cache
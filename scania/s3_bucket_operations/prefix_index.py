@@ -0,0 +1,264 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+
+class S3_Object_Ref:
+    """
+    Description :   This class is a lightweight reference to an object listed in s3 bucket. It exposes the same
+                    key, size, e_tag, last_modified and get() as a boto3 ObjectSummary without holding a resource
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    __slots__ = ("s3_client", "bucket_name", "key", "size", "e_tag", "last_modified")
+
+    def __init__(self, s3_client, bucket_name, key, size, e_tag, last_modified):
+        self.s3_client = s3_client
+
+        self.bucket_name = bucket_name
+
+        self.key = key
+
+        self.size = size
+
+        self.e_tag = e_tag
+
+        self.last_modified = last_modified
+
+    def get(self, **kwargs):
+        return self.s3_client.get_object(Bucket=self.bucket_name, Key=self.key, **kwargs)
+
+    def __repr__(self):
+        return f"S3_Object_Ref(bucket_name={self.bucket_name!r}, key={self.key!r})"
+
+
+class Prefix_Index:
+    """
+    Description :   This class holds the listing of one prefix of s3 bucket. Pages of list_objects_v2 are fetched
+                    lazily, only as far as a lookup needs them, and stored in array backed columns of key, size,
+                    ETag and LastModified in key order
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(self, s3_client, bucket, prefix, page_size):
+        self.s3_client = s3_client
+
+        self.bucket = bucket
+
+        self.prefix = prefix
+
+        self.page_size = page_size
+
+        self.keys = []
+
+        self.sizes = array("q")
+
+        self.etags = []
+
+        self.mtimes = array("d")
+
+        self.token = None
+
+        self.complete = False
+
+        self.created_at = time.monotonic()
+
+        self.lock = threading.Lock()
+
+    def fetch_page(self):
+        kwargs = {"Bucket": self.bucket, "Prefix": self.prefix, "MaxKeys": self.page_size}
+
+        if self.token is not None:
+            kwargs["ContinuationToken"] = self.token
+
+        response = self.s3_client.list_objects_v2(**kwargs)
+
+        for obj in response.get("Contents", []):
+            self.keys.append(obj["Key"])
+
+            self.sizes.append(obj["Size"])
+
+            self.etags.append(obj["ETag"])
+
+            self.mtimes.append(obj["LastModified"].timestamp())
+
+        self.token = response.get("NextContinuationToken")
+
+        self.complete = not response.get("IsTruncated") or self.token is None
+
+    def iter_entries(self, prefix="", suffix=""):
+        """
+        Method Name :   iter_entries
+        Description :   This method yields the entries whose key starts with prefix and ends with suffix, listing
+                        further pages only until the keys move past prefix
+
+        Output      :   A generator of tuple of key, size, etag and last modified timestamp
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        idx = None
+
+        while True:
+            with self.lock:
+                if idx is None:
+                    idx = bisect_left(self.keys, prefix)
+
+                while idx >= len(self.keys) and not self.complete:
+                    self.fetch_page()
+
+                    idx = max(idx, bisect_left(self.keys, prefix))
+
+                if idx >= len(self.keys):
+                    return
+
+                entry = (
+                    self.keys[idx],
+                    self.sizes[idx],
+                    self.etags[idx],
+                    self.mtimes[idx],
+                )
+
+            if not entry[0].startswith(prefix):
+                return
+
+            if entry[0].endswith(suffix):
+                yield entry
+
+            idx += 1
+
+
+class Prefix_Index_Cache:
+    """
+    Description :   This class keeps the prefix indexes of the process. A lookup is served from any index whose
+                    prefix covers it, indexes expire after ttl_seconds and are invalidated explicitly by writes.
+                    Buckets in uncached_buckets are written by other processes, so their listings are never cached
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(self, ttl_seconds, page_size, uncached_buckets=()):
+        self.ttl_seconds = ttl_seconds
+
+        self.page_size = page_size
+
+        self.uncached_buckets = set(uncached_buckets)
+
+        self.indexes = {}
+
+        self.lock = threading.Lock()
+
+    def get_index(self, s3_client, bucket, prefix, fresh=False):
+        """
+        Method Name :   get_index
+        Description :   This method returns an unexpired index covering prefix in bucket, creating it if needed.
+                        With fresh, or for an uncached bucket, a new index is listed and the cached indexes which
+                        cover prefix are dropped
+
+        Output      :   A Prefix_Index object is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        now = time.monotonic()
+
+        cached = fresh is False and bucket not in self.uncached_buckets
+
+        with self.lock:
+            for (idx_bucket, idx_prefix), index in list(self.indexes.items()):
+                covers = idx_bucket == bucket and prefix.startswith(idx_prefix)
+
+                if now - index.created_at >= self.ttl_seconds or (covers and not cached):
+                    del self.indexes[(idx_bucket, idx_prefix)]
+
+                elif covers:
+                    return index
+
+            index = Prefix_Index(s3_client, bucket, prefix, self.page_size)
+
+            if cached and self.ttl_seconds > 0:
+                self.indexes[(bucket, prefix)] = index
+
+            return index
+
+    def list_objects(self, s3_client, bucket, prefix="", suffix="", fresh=False):
+        """
+        Method Name :   list_objects
+        Description :   This method lists the objects of bucket whose key starts with prefix and ends with suffix.
+                        With fresh, the bucket is listed again instead of served from a cached index
+
+        Output      :   A list of S3_Object_Ref objects is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        index = self.get_index(s3_client, bucket, prefix, fresh)
+
+        return [
+            S3_Object_Ref(s3_client, bucket, key, size, etag, mtime)
+            for key, size, etag, mtime in index.iter_entries(prefix, suffix)
+        ]
+
+    def invalidate(self, bucket=None, key=None):
+        """
+        Method Name :   invalidate
+        Description :   This method drops the indexes which may contain key in bucket. Without key all the
+                        indexes of bucket are dropped, and without bucket every index is dropped
+
+        Output      :   The matching indexes are dropped
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        with self.lock:
+            for idx_bucket, idx_prefix in list(self.indexes):
+                if bucket is not None and idx_bucket != bucket:
+                    continue
+
+                if key is not None and not key.startswith(idx_prefix):
+                    continue
+
+                del self.indexes[(idx_bucket, idx_prefix)]
+
+
+prefix_index_cache = None
+
+prefix_index_cache_lock = threading.Lock()
+
+
+def get_prefix_index_cache(config):
+    """
+    Method Name :   get_prefix_index_cache
+    Description :   This method returns the process wide prefix index cache, creating it from the s3_prefix_index
+                    section of params.yaml on first use. uncached_buckets names keys of the s3_bucket section
+
+    Output      :   A Prefix_Index_Cache object is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    global prefix_index_cache
+
+    with prefix_index_cache_lock:
+        if prefix_index_cache is None:
+            prefix_index_cache = Prefix_Index_Cache(
+                ttl_seconds=config["s3_prefix_index"]["ttl_seconds"],
+                page_size=config["s3_prefix_index"]["page_size"],
+                uncached_buckets=[
+                    config["s3_bucket"][bucket]
+                    for bucket in config["s3_prefix_index"]["uncached_buckets"]
+                ],
+            )
+
+        return prefix_index_cache
@@ -0,0 +1,330 @@
+import random
+import threading
+import time
+
+from boto3.exceptions import S3UploadFailedError
+from botocore.exceptions import ClientError, ConnectionError, HTTPClientError
+
+THROTTLE_CODES = (
+    "SlowDown",
+    "503",
+    "ServiceUnavailable",
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottled",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+)
+
+TRANSIENT_CODES = (
+    "500",
+    "502",
+    "504",
+    "InternalError",
+    "RequestTimeout",
+    "RequestTimeoutException",
+)
+
+UNMANAGED_ATTRIBUTES = (
+    "meta",
+    "exceptions",
+    "can_paginate",
+    "get_paginator",
+    "get_waiter",
+    "generate_presigned_url",
+    "generate_presigned_post",
+)
+
+
+def classify_error(error):
+    """
+    Method Name :   classify_error
+    Description :   This method sorts an error raised by a storage call into throttle, transient or fatal
+
+    Output      :   throttle, transient or None if the call should not be retried
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if isinstance(error, ClientError):
+        code = str(error.response.get("Error", {}).get("Code", ""))
+
+        status = str(
+            error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", "")
+        )
+
+        if code in THROTTLE_CODES or status == "503":
+            return "throttle"
+
+        if code in TRANSIENT_CODES or status in ("500", "502", "504"):
+            return "transient"
+
+        return None
+
+    if isinstance(error, S3UploadFailedError):
+        msg = str(error)
+
+        if any(f"({code})" in msg for code in THROTTLE_CODES):
+            return "throttle"
+
+        if any(f"({code})" in msg for code in TRANSIENT_CODES):
+            return "transient"
+
+        return None
+
+    if isinstance(error, (ConnectionError, HTTPClientError)):
+        return "transient"
+
+    return None
+
+
+class Retry_Controller:
+    """
+    Description :   This class retries the storage calls of the process and limits how many of them run at once.
+                    Failed calls are retried with full jitter exponential backoff. The concurrency limit grows
+                    additively with each successful call and is cut multiplicatively on each throttling
+                    response, so that bulk operations slow down smoothly instead of failing
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(
+        self,
+        max_attempts,
+        base_delay,
+        max_delay,
+        initial_limit,
+        min_limit,
+        max_limit,
+        increase,
+        decrease_factor,
+    ):
+        self.max_attempts = max_attempts
+
+        self.base_delay = base_delay
+
+        self.max_delay = max_delay
+
+        self.min_limit = min_limit
+
+        self.max_limit = max_limit
+
+        self.increase = increase
+
+        self.decrease_factor = decrease_factor
+
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+
+        self.inflight = 0
+
+        self.cond = threading.Condition()
+
+        self.metrics = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "throttles": 0,
+            "transient_errors": 0,
+            "limit_decreases": 0,
+            "backoff_seconds": 0.0,
+            "max_inflight": 0,
+        }
+
+    def acquire(self):
+        with self.cond:
+            while self.inflight >= int(self.limit):
+                self.cond.wait()
+
+            self.inflight += 1
+
+            self.metrics["max_inflight"] = max(
+                self.metrics["max_inflight"], self.inflight
+            )
+
+    def release(self, outcome):
+        """
+        Method Name :   release
+        Description :   This method frees the slot of a finished call and adjusts the concurrency limit, additive
+                        increase on success and multiplicative decrease on throttling
+
+        Output      :   The concurrency limit is updated
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        with self.cond:
+            self.inflight -= 1
+
+            if outcome == "success":
+                self.limit = min(
+                    self.max_limit, self.limit + self.increase / self.limit
+                )
+
+            elif outcome == "throttle":
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+
+                self.metrics["limit_decreases"] += 1
+
+            self.cond.notify_all()
+
+    def get_delay(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, func, *args, **kwargs):
+        """
+        Method Name :   call
+        Description :   This method runs a storage call under the concurrency limit, retrying throttled and
+                        transient failures. Seekable file objects passed to the call are rewound before a retry,
+                        and calls reading from a file object which cannot be rewound, like a pipe, are not retried
+
+        Output      :   The result of the call is returned
+        On Failure  :   Raise the last error once the attempts are used up, or at once for other errors
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        positions, max_attempts = [], self.max_attempts
+
+        for f in list(args) + list(kwargs.values()):
+            if not hasattr(f, "read"):
+                continue
+
+            if getattr(f, "seekable", lambda: False)():
+                positions.append((f, f.tell()))
+
+            else:
+                max_attempts = 1
+
+        with self.cond:
+            self.metrics["calls"] += 1
+
+        attempt = 0
+
+        while True:
+            self.acquire()
+
+            try:
+                result = func(*args, **kwargs)
+
+            except Exception as e:
+                kind = classify_error(e)
+
+                self.release(kind)
+
+                with self.cond:
+                    if kind == "throttle":
+                        self.metrics["throttles"] += 1
+
+                    elif kind == "transient":
+                        self.metrics["transient_errors"] += 1
+
+                    if kind is None or attempt + 1 >= max_attempts:
+                        self.metrics["failures"] += 1
+
+                        raise e
+
+                    self.metrics["retries"] += 1
+
+                delay = self.get_delay(attempt)
+
+                with self.cond:
+                    self.metrics["backoff_seconds"] += delay
+
+                time.sleep(delay)
+
+                for f, pos in positions:
+                    f.seek(pos)
+
+                attempt += 1
+
+                continue
+
+            self.release("success")
+
+            with self.cond:
+                self.metrics["successes"] += 1
+
+            return result
+
+    def get_metrics(self):
+        with self.cond:
+            metrics = dict(self.metrics)
+
+            metrics["limit"] = round(self.limit, 2)
+
+            metrics["inflight"] = self.inflight
+
+        return metrics
+
+
+class Managed_Client:
+    """
+    Description :   This class wraps a storage client, so that every api call of the client goes through the
+                    Retry_Controller. Other attributes are passed through as they are
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(self, client, controller):
+        self.client = client
+
+        self.controller = controller
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+
+        if name.startswith("_") or name in UNMANAGED_ATTRIBUTES:
+            return attr
+
+        if not callable(attr):
+            return attr
+
+        def managed_call(*args, **kwargs):
+            return self.controller.call(attr, *args, **kwargs)
+
+        managed_call.__name__ = name
+
+        return managed_call
+
+
+retry_controller = None
+
+retry_controller_lock = threading.Lock()
+
+
+def get_retry_controller(config):
+    """
+    Method Name :   get_retry_controller
+    Description :   This method returns the process wide retry controller, creating it from the s3_retry section
+                    of params.yaml on first use
+
+    Output      :   A Retry_Controller object is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    global retry_controller
+
+    with retry_controller_lock:
+        if retry_controller is None:
+            retry_config = config["s3_retry"]
+
+            retry_controller = Retry_Controller(
+                max_attempts=retry_config["max_attempts"],
+                base_delay=retry_config["base_delay"],
+                max_delay=retry_config["max_delay"],
+                initial_limit=retry_config["initial_limit"],
+                min_limit=retry_config["min_limit"],
+                max_limit=retry_config["max_limit"],
+                increase=retry_config["increase"],
+                decrease_factor=retry_config["decrease_factor"],
+            )
+
+        return retry_controller
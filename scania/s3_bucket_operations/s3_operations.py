@@ -1,13 +1,38 @@
+import csv
 import json
 import os
 import pickle
-from io import StringIO
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import closing
+from io import BytesIO, StringIO, TextIOWrapper
 
 import boto3
 import pandas as pd
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
+from scania.s3_bucket_operations.client_registry import get_storage_client
+from scania.s3_bucket_operations.compression import (
+    check_codec,
+    compressed_writer,
+    decompress,
+    decompress_prefix,
+    decompressed_reader,
+    get_codec,
+)
+from scania.s3_bucket_operations.control_file_cache import get_control_file_cache
+from scania.s3_bucket_operations.model_cache import get_model_cache
+from scania.s3_bucket_operations.prefix_index import get_prefix_index_cache
+from scania.s3_bucket_operations.retry_controller import get_retry_controller
+from scania.s3_bucket_operations.storage_format import (
+    check_file_format,
+    coerce_numeric_columns,
+    get_fname_for_format,
+    read_df,
+    write_df,
+    write_df_chunks,
+)
 from utils.logger import App_Logger
-from utils.model_utils import Model_Utils
 from utils.read_params import read_params
 
 
@@ -27,18 +52,126 @@ class S3_Operation:
 
         self.class_name = self.__class__.__name__
 
-        self.model_utils = Model_Utils()
-
         self.file_format = self.config["model_utils"]["save_format"]
 
-        self.s3_client = boto3.client("s3")
+        self.max_workers = self.config["s3_concurrency"]["max_workers"]
+
+        self.max_inflight_bytes = self.config["s3_concurrency"]["max_inflight_bytes"]
+
+        self.max_delete_keys = 1000
+
+        self.in_memory_upload = self.config["s3_upload"]["in_memory"]
+
+        self.compression = check_codec(self.config["s3_upload"]["compression"])
+
+        self.compression_level = self.config["s3_upload"]["compression_level"]
+
+        self.model_cache_enabled = self.config["model_cache"]["enabled"]
+
+        self.storage_format = check_file_format(self.config["storage_format"]["format"])
+
+        self.na_values = self.config["storage_format"]["na_values"]
+
+        self.stream_csv = self.config["s3_read"]["stream"]
+
+        self.peek_bytes = self.config["s3_read"]["peek_bytes"]
+
+        self.transfer_config = TransferConfig(
+            multipart_threshold=self.config["s3_upload"]["multipart_threshold"],
+            multipart_chunksize=self.config["s3_upload"]["multipart_chunksize"],
+            max_concurrency=self.config["s3_upload"]["max_concurrency"],
+        )
+
+        self.s3_client = get_storage_client(self.config)
+
+        self.prefix_index = get_prefix_index_cache(self.config)
+
+        self.control_files = get_control_file_cache(self.config)
+
+        self.retry_controller = (
+            get_retry_controller(self.config)
+            if self.config["s3_retry"]["enabled"] is True
+            else None
+        )
+
+    def get_retry_metrics(self, log_file):
+        """
+        Method Name :   get_retry_metrics
+        Description :   This method gets the metrics of the retry controller shared by all the s3 calls of the
+                        process, like retries, throttles, backoff time and the current concurrency limit
+
+        Output      :   A dict of retry metrics, empty if s3_retry is disabled
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.get_retry_metrics.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            metrics = (
+                {}
+                if self.retry_controller is None
+                else self.retry_controller.get_metrics()
+            )
+
+            self.log_writer.log(
+                log_file, f"S3 retry metrics are {metrics}",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+            return metrics
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def get_body(self, response):
+        """
+        Method Name :   get_body
+        Description :   This method returns the body of a get_object response, decompressed as it is read when
+                        the object has gzip or zstd as content encoding
+
+        Output      :   A binary reader of the object data
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        return decompressed_reader(
+            response["Body"], get_codec(response.get("ContentEncoding"))
+        )
+
+    def read_body(self, response):
+        """
+        Method Name :   read_body
+        Description :   This method reads the whole body of a get_object response, decompressed as per its content
+                        encoding, and closes the body once it is read
+
+        Output      :   The object data as bytes
+        On Failure  :   Raise an exception
 
-        self.s3_resource = boto3.resource("s3")
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        with closing(response["Body"]):
+            return self.get_body(response).read()
 
-    def read_object(self, object, log_file, decode=True, make_readable=False):
+    def read_object(
+        self, object, log_file, decode=True, make_readable=False, stream=False
+    ):
         """
         Method Name :   read_object
-        Description :   This method reads the object with kwargs
+        Description :   This method reads the object with kwargs. When stream is True, the botocore
+                        StreamingBody is returned as it is, so that the caller can consume it incrementally
 
         Output      :   A object is read with kwargs
         On Failure  :   Write an exception log and then raise an exception
@@ -53,11 +186,27 @@ class S3_Operation:
         )
 
         try:
-            func = (
-                lambda: object.get()["Body"].read().decode()
-                if decode is True
-                else object.get()["Body"].read()
-            )
+            response = object.get()
+
+            if stream is True:
+                body = self.get_body(response)
+
+                self.log_writer.log(
+                    log_file,
+                    f"Opened the s3 object as a streaming body with content encoding as {response.get('ContentEncoding')}",
+                )
+
+                self.log_writer.start_log(
+                    "exit", self.class_name, method_name, log_file,
+                )
+
+                return body
+
+            content = self.read_body(response)
+
+            n_bytes = len(content)
+
+            func = lambda: content.decode() if decode is True else content
 
             self.log_writer.log(
                 log_file, f"Read the s3 object with decode as {decode}",
@@ -70,7 +219,7 @@ class S3_Operation:
             )
 
             self.log_writer.start_log(
-                "exit", self.class_name, method_name, log_file,
+                "exit", self.class_name, method_name, log_file, bytes=n_bytes,
             )
 
             return conv_func()
@@ -156,12 +305,102 @@ class S3_Operation:
                 e, self.class_name, method_name, log_file,
             )
 
-    def get_df_from_object(self, object, log_file):
+    def read_control_file(self, fname, bucket, log_file, file_type="text"):
+        """
+        Method Name :   read_control_file
+        Description :   This method reads a small control file like a schema or regex file from s3 bucket through
+                        the control file cache, parsed as text, json or a compiled regex as per file_type
+
+        Output      :   A str, a parsed json object or a compiled regex pattern
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.read_control_file.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            content = self.control_files.get(self.s3_client, bucket, fname, file_type)
+
+            self.log_writer.log(
+                log_file,
+                f"Read {fname} control file as {file_type} from {bucket} bucket, cache stats are {self.control_files.get_stats()}",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+            return content
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def preload_control_files(self, files, bucket, log_file):
+        """
+        Method Name :   preload_control_files
+        Description :   This method loads a list of (fname, file_type) control files into the control file cache
+                        concurrently. Files which cannot be read are logged and left to be read on first use
+
+        Output      :   A list of control files which could not be preloaded
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.preload_control_files.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        def preload(f):
+            try:
+                self.control_files.get(self.s3_client, bucket, f[0], f[1])
+
+                return None
+
+            except Exception as e:
+                return f"{f[0]} : {e}"
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                failed = [err for err in executor.map(preload, files) if err]
+
+            self.log_writer.log(
+                log_file,
+                f"Preloaded {len(files) - len(failed)} of {len(files)} control files from {bucket} bucket",
+            )
+
+            if failed:
+                self.log_writer.log(
+                    log_file, f"Failed to preload {failed}",
+                )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+            return failed
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def get_df_from_object(self, object, log_file, stream=False, chunksize=None):
         """
         Method Name :   get_df_from_object
-        Description :   This method gets dataframe from object 
+        Description :   This method gets dataframe from object. When stream is True or chunksize is given,
+                        the s3 body is fed directly to the csv parser without decoding it into memory first
 
-        Output      :   Dataframe is read from the object
+        Output      :   Dataframe is read from the object, or an iterator of dataframes if chunksize is given
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -174,9 +413,20 @@ class S3_Operation:
         )
 
         try:
-            content = self.read_object(object, log_file, make_readable=True)
+            if stream is True or chunksize is not None:
+                body = self.read_object(object, log_file, stream=True)
+
+                df = pd.read_csv(body, chunksize=chunksize)
+
+                self.log_writer.log(
+                    log_file,
+                    f"Streamed s3 object to csv parser with chunksize as {chunksize}",
+                )
+
+            else:
+                content = self.read_object(object, log_file, make_readable=True)
 
-            df = pd.read_csv(content)
+                df = pd.read_csv(content)
 
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, log_file,
@@ -189,12 +439,13 @@ class S3_Operation:
                 e, self.class_name, method_name, log_file,
             )
 
-    def read_csv(self, fname, bucket, log_file):
+    def read_csv(self, fname, bucket, log_file, stream=False, chunksize=None):
         """
         Method Name :   read_csv
-        Description :   This method reads the csv data from s3 bucket
+        Description :   This method reads the csv data from s3 bucket. With stream as True the object body is
+                        parsed as it is downloaded, and with chunksize an iterator of dataframes is returned
 
-        Output      :   A pandas series object consisting of runs for the particular experiment id
+        Output      :   A pandas dataframe, or an iterator of dataframes if chunksize is given
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -209,7 +460,9 @@ class S3_Operation:
         try:
             csv_obj = self.get_file_object(fname, bucket, log_file,)
 
-            df = self.get_df_from_object(csv_obj, log_file)
+            df = self.get_df_from_object(
+                csv_obj, log_file, stream=stream, chunksize=chunksize
+            )
 
             self.log_writer.log(
                 log_file, f"Read {fname} csv file from {bucket} bucket",
@@ -226,150 +479,778 @@ class S3_Operation:
                 e, self.class_name, method_name, log_file,
             )
 
-    def read_csv_from_folder(self, folder_name, bucket, log_file):
+    def read_csv_object(self, key, bucket, log_file):
         """
-        Method Name :   read_csv_from_folder
-        Description :   This method reads the csv files from folder
+        Method Name :   read_csv_object
+        Description :   This method reads the csv data of a known key from s3 bucket, without listing the bucket
 
-        Output      :   A list of tuple of dataframe, along with absolute file name and file name is returned
+        Output      :   A pandas dataframe is read from the object
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
         Revisions   :   moved setup to cloud
         """
-        method_name = self.read_csv_from_folder.__name__
+        method_name = self.read_csv_object.__name__
 
         self.log_writer.start_log(
             "start", self.class_name, method_name, log_file,
         )
+
         try:
-            files = self.get_files_from_folder(folder_name, bucket, log_file,)
+            response = self.s3_client.get_object(Bucket=bucket, Key=key)
 
-            lst = [
-                (self.read_csv(f, bucket, log_file,), f, f.split("/")[-1],)
-                for f in files
-            ]
+            with closing(response["Body"]):
+                df = pd.read_csv(self.get_body(response))
 
             self.log_writer.log(
-                log_file,
-                f"Read csv files from {folder_name} folder from {bucket} bucket",
+                log_file, f"Read {key} csv file from {bucket} bucket",
             )
 
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, log_file,
             )
 
-            return lst
+            return df
 
         except Exception as e:
             self.log_writer.exception_log(
                 e, self.class_name, method_name, log_file,
             )
 
-    def load_object(self, object, bucket, log_file):
+    def get_header_end(self, data):
         """
-        Method Name :   load_object
-        Description :   This method loads the object from s3 bucket
+        Method Name :   get_header_end
+        Description :   This method finds the end of the header row in the leading bytes of a csv file, skipping
+                        blank lines and newlines which are inside quotes
 
-        Output      :   An object is loaded from s3 bucket
+        Output      :   A tuple of start and end offset of the header row, end is None if the row is not complete
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        start = len(data) - len(data.lstrip(b"\r\n"))
+
+        pos = data.find(b"\n", start)
+
+        while pos != -1 and data.count(b'"', start, pos) % 2 == 1:
+            pos = data.find(b"\n", pos + 1)
+
+        return start, (None if pos == -1 else pos)
+
+    def peek_header(self, fname, bucket, log_file):
+        """
+        Method Name :   peek_header
+        Description :   This method reads only the header row of a csv file in s3 bucket, using ranged GET requests
+                        of peek_bytes in params.yaml. The range is doubled until the header row is complete.
+                        Compressed objects are decompressed as far as the range goes
+
+        Output      :   A tuple of list of column names and number of columns
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
         Revisions   :   moved setup to cloud
         """
-        method_name = self.load_object.__name__
+        method_name = self.peek_header.__name__
 
         self.log_writer.start_log(
             "start", self.class_name, method_name, log_file,
         )
 
         try:
-            self.s3_resource.Object(bucket, object).load()
+            range_bytes = self.peek_bytes
+
+            while True:
+                try:
+                    response = self.s3_client.get_object(
+                        Bucket=bucket, Key=fname, Range=f"bytes=0-{range_bytes - 1}"
+                    )
+
+                except ClientError as e:
+                    if e.response["Error"]["Code"] != "InvalidRange":
+                        raise e
+
+                    data, complete = b"", True
+
+                    break
+
+                with closing(response["Body"]) as body:
+                    raw = body.read()
+
+                data = decompress_prefix(
+                    raw, get_codec(response.get("ContentEncoding"))
+                )
+
+                total = response.get("ContentRange", "/").split("/")[-1]
+
+                complete = len(raw) < range_bytes or (
+                    total.isdigit() and len(raw) >= int(total)
+                )
+
+                start, end = self.get_header_end(data)
+
+                if end is not None or complete is True:
+                    break
+
+                range_bytes *= 2
+
+            start, end = self.get_header_end(data)
+
+            line = data[start:end].decode("utf-8-sig").rstrip("\r")
+
+            columns = next(csv.reader([line]), []) if line else []
 
             self.log_writer.log(
-                log_file, f"Loaded {object} from {bucket} bucket",
+                log_file,
+                f"Read header of {fname} file from {bucket} bucket with {len(columns)} columns from {range_bytes} bytes range",
             )
 
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, log_file,
             )
 
+            return columns, len(columns)
+
         except Exception as e:
             self.log_writer.exception_log(
                 e, self.class_name, method_name, log_file,
             )
 
-    def create_folder(self, folder_name, bucket, log_file):
+    def peek_headers_from_folder(self, folder_name, bucket, log_file, fnames=None):
         """
-        Method Name :   create_folder
-        Description :   This method creates a folder in s3 bucket
+        Method Name :   peek_headers_from_folder
+        Description :   This method reads the header rows of the csv files in folder concurrently, without
+                        downloading the files. With fnames, only the files with those names are read
 
-        Output      :   A folder is created in s3 bucket 
+        Output      :   A list of tuple of list of column names, number of columns, absolute file name and file name
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
         Revisions   :   moved setup to cloud
         """
-        method_name = self.create_folder.__name__
+        method_name = self.peek_headers_from_folder.__name__
 
         self.log_writer.start_log(
             "start", self.class_name, method_name, log_file,
         )
 
         try:
-            self.load_object(bucket, folder_name)
+            files = [
+                obj.key
+                for obj in self.prefix_index.list_objects(
+                    self.s3_client, bucket, folder_name
+                )
+                if not obj.key.endswith("/")
+                and (fnames is None or obj.key.split("/")[-1] in fnames)
+            ]
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                headers = list(
+                    executor.map(
+                        lambda f: self.peek_header(f, bucket, log_file), files
+                    )
+                )
+
+            lst = [
+                (columns, n_cols, f, f.split("/")[-1])
+                for (columns, n_cols), f in zip(headers, files)
+            ]
 
             self.log_writer.log(
-                log_file, f"Folder {folder_name} already exists.",
+                log_file,
+                f"Read headers of {len(lst)} files from {folder_name} folder of {bucket} bucket",
             )
 
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, log_file,
             )
 
-        except ClientError as e:
-            if e.response["Error"]["Code"] == "404":
-                self.log_writer.log(
-                    log_file, f"{folder_name} folder does not exist,creating new one",
-                )
+            return lst
 
-                self.put_object(folder_name, bucket, log_file)
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
 
-                self.log_writer.log(
-                    log_file, f"{folder_name} folder created in {bucket} bucket",
-                )
+    def iter_csv_from_folder(self, folder_name, bucket, log_file, fnames=None):
+        """
+        Method Name :   iter_csv_from_folder
+        Description :   This method reads the csv files from folder concurrently using a bounded thread pool.
+                        The number of objects and bytes in flight are limited by s3_concurrency in params.yaml.
+                        With fnames, only the files with those names are read
 
-            else:
-                self.log_writer.log(
-                    log_file, f"Error occured in creating {folder_name} folder",
+        Output      :   A generator of tuple of dataframe, along with absolute file name and file name is returned
+                        in the order in which the downloads finish
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.iter_csv_from_folder.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            objs = [
+                (obj.key, obj.size)
+                for obj in self.prefix_index.list_objects(
+                    self.s3_client, bucket, folder_name
                 )
+                if not obj.key.endswith("/")
+                and (fnames is None or obj.key.split("/")[-1] in fnames)
+            ]
+
+            self.log_writer.log(
+                log_file,
+                f"Fetching {len(objs)} csv files from {folder_name} folder of {bucket} bucket with {self.max_workers} workers",
+            )
+
+            pending = {}
+
+            inflight_bytes = 0
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for key, size in objs + [(None, 0)]:
+                    while pending and (
+                        key is None
+                        or len(pending) >= self.max_workers
+                        or inflight_bytes + size > self.max_inflight_bytes
+                    ):
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                        for fut in done:
+                            done_key, done_size = pending.pop(fut)
+
+                            inflight_bytes -= done_size
+
+                            yield fut.result(), done_key, done_key.split("/")[-1]
+
+                    if key is not None:
+                        fut = executor.submit(
+                            self.read_csv_object, key, bucket, log_file
+                        )
+
+                        pending[fut] = (key, size)
+
+                        inflight_bytes += size
+
+            self.log_writer.log(
+                log_file,
+                f"Read csv files from {folder_name} folder from {bucket} bucket",
+            )
+
+            self.get_retry_metrics(log_file)
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def read_csv_from_folder(
+        self, folder_name, bucket, log_file, parallel=False, fnames=None
+    ):
+        """
+        Method Name :   read_csv_from_folder
+        Description :   This method reads the csv files from folder. With parallel as True, the files are fetched
+                        concurrently and collected in the order in which they finish, use iter_csv_from_folder to
+                        process them one at a time instead. With fnames, only the files with those names are read
+
+        Output      :   A list of tuple of dataframe, along with absolute file name and file name is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.read_csv_from_folder.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+        try:
+            if parallel is True:
+                lst = list(
+                    self.iter_csv_from_folder(
+                        folder_name, bucket, log_file, fnames=fnames
+                    )
+                )
+
+                self.log_writer.start_log(
+                    "exit", self.class_name, method_name, log_file,
+                )
+
+                return lst
+
+            files = self.get_files_from_folder(folder_name, bucket, log_file,)
+
+            lst = [
+                (self.read_csv(f, bucket, log_file,), f, f.split("/")[-1],)
+                for f in files
+                if fnames is None or f.split("/")[-1] in fnames
+            ]
+
+            self.log_writer.log(
+                log_file,
+                f"Read csv files from {folder_name} folder from {bucket} bucket",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+            return lst
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def read_df(self, fname, bucket, log_file, file_format=None, columns=None):
+        """
+        Method Name :   read_df
+        Description :   This method reads a dataframe stored in the storage format of params.yaml, or in
+                        file_format if given, from s3 bucket. The extension of fname is replaced by the one of the
+                        format. Only the given columns are parsed when columns is not None
+
+        Output      :   A pandas dataframe
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.read_df.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            file_format = check_file_format(
+                self.storage_format if file_format is None else file_format
+            )
+
+            key = get_fname_for_format(fname, file_format)
+
+            f_obj = self.get_file_object(key, bucket, log_file)
+
+            if file_format == "csv" and self.stream_csv is True:
+                content = self.read_object(f_obj, log_file, stream=True)
+
+            elif file_format == "csv":
+                content = self.read_object(f_obj, log_file, make_readable=True)
+
+            else:
+                content = BytesIO(self.read_object(f_obj, log_file, decode=False))
+
+            df = read_df(content, file_format, columns)
+
+            self.log_writer.log(
+                log_file,
+                f"Read {key} {file_format} file from {bucket} bucket with shape {df.shape}",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file, rows=len(df),
+            )
+
+            return df
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def load_object(self, object, bucket, log_file):
+        """
+        Method Name :   load_object
+        Description :   This method loads the object from s3 bucket
+
+        Output      :   An object is loaded from s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.load_object.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            self.s3_client.head_object(Bucket=bucket, Key=object)
+
+            self.log_writer.log(
+                log_file, f"Loaded {object} from {bucket} bucket",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def create_folder(self, folder_name, bucket, log_file):
+        """
+        Method Name :   create_folder
+        Description :   This method creates a folder in s3 bucket
+
+        Output      :   A folder is created in s3 bucket 
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.create_folder.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            self.s3_client.head_object(Bucket=bucket, Key=folder_name + "/")
+
+            self.log_writer.log(
+                log_file, f"Folder {folder_name} already exists.",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "404":
+                self.log_writer.log(
+                    log_file, f"{folder_name} folder does not exist,creating new one",
+                )
+
+                self.put_object(folder_name, bucket, log_file)
+
+                self.log_writer.log(
+                    log_file, f"{folder_name} folder created in {bucket} bucket",
+                )
+
+            else:
+                self.log_writer.log(
+                    log_file, f"Error occured in creating {folder_name} folder",
+                )
+
+                self.log_writer.exception_log(
+                    e, self.class_name, method_name, log_file,
+                )
+
+    def put_object(self, object, bucket, log_file):
+        """
+        Method Name :   put_object
+        Description :   This method puts an object in s3 bucket
+
+        Output      :   An object is put in s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.put_object.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            self.s3_client.put_object(Bucket=bucket, Key=(object + "/"))
+
+            self.prefix_index.invalidate(bucket, object + "/")
+
+            self.log_writer.log(
+                log_file, f"Created {object} folder in {bucket} bucket",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def upload_file(self, from_fname, to_fname, bucket, log_file, remove=True):
+        """
+        Method Name :   upload_file
+        Description :   This method uploades a file to s3 bucket with kwargs
+
+        Output      :   A file is uploaded to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.upload_file.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            self.log_writer.log(
+                log_file, f"Uploading {from_fname} to s3 bucket {bucket}",
+            )
+
+            self.s3_client.upload_file(
+                from_fname, bucket, to_fname, Config=self.transfer_config
+            )
+
+            self.prefix_index.invalidate(bucket, to_fname)
+
+            self.log_writer.log(
+                log_file, f"Uploaded {from_fname} to s3 bucket {bucket}",
+            )
+
+            if remove is True:
+                self.log_writer.log(
+                    log_file, f"Option remove is set {remove}..deleting the file",
+                )
+
+                os.remove(from_fname)
+
+                self.log_writer.log(
+                    log_file, f"Removed the local copy of {from_fname}",
+                )
+
+                self.log_writer.start_log(
+                    "exit", self.class_name, method_name, log_file,
+                )
+
+            else:
+                self.log_writer.log(
+                    log_file, f"Option remove is set {remove}, not deleting the file",
+                )
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def upload_fileobj(
+        self, fileobj, to_fname, bucket, log_file, content_encoding=None
+    ):
+        """
+        Method Name :   upload_fileobj
+        Description :   This method uploads a binary file object to s3 bucket, as a multipart upload when it is
+                        larger than the multipart threshold in params.yaml
+
+        Output      :   A file object is uploaded to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.upload_fileobj.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            extra_args = {}
+
+            if content_encoding is not None:
+                extra_args["ContentEncoding"] = content_encoding
+
+            self.s3_client.upload_fileobj(
+                fileobj,
+                bucket,
+                to_fname,
+                ExtraArgs=extra_args,
+                Config=self.transfer_config,
+            )
+
+            self.prefix_index.invalidate(bucket, to_fname)
+
+            self.log_writer.log(
+                log_file, f"Uploaded {to_fname} to s3 bucket {bucket}",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def upload_from_memory(
+        self, write_func, to_fname, bucket, log_file, text=False, compress=True
+    ):
+        """
+        Method Name :   upload_from_memory
+        Description :   This method serializes the data with write_func into an in-memory buffer, compressing it
+                        on the fly as configured in params.yaml, and uploads the buffer to s3 bucket. No local file
+                        is written. With text as True, write_func is given a text stream instead of a binary one.
+                        With compress as False, the data is uploaded as it is serialized
+
+        Output      :   The serialized data is uploaded to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.upload_from_memory.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            buffer = BytesIO()
+
+            compression = self.compression if compress is True else None
+
+            with compressed_writer(
+                buffer, compression, self.compression_level
+            ) as writer:
+                if text is True:
+                    text_writer = TextIOWrapper(
+                        writer, encoding="utf-8", newline="", write_through=True
+                    )
+
+                    write_func(text_writer)
+
+                    text_writer.flush()
+
+                    text_writer.detach()
+
+                else:
+                    write_func(writer)
+
+            n_bytes = buffer.tell()
+
+            self.log_writer.log(
+                log_file,
+                f"Serialized {to_fname} to {n_bytes} bytes in memory with compression as {compression}",
+            )
+
+            buffer.seek(0)
+
+            self.upload_fileobj(
+                buffer, to_fname, bucket, log_file, content_encoding=compression,
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file, bytes=n_bytes,
+            )
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def get_bucket(self, bucket, log_file):
+        """
+        Method Name :   get_bucket
+        Description :   This method gets the bucket from s3, it is only available with the s3 storage backend
+
+        Output      :   A s3 bucket name is returned based on the bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.get_bucket.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            bucket = boto3.resource("s3").Bucket(bucket)
+
+            self.log_writer.log(
+                log_file, f"Got {bucket} bucket",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
+
+            return bucket
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def copy_data(self, from_fname, from_bucket, to_fname, to_bucket, log_file):
+        """
+        Method Name :   copy_data
+        Description :   This method copies the data from one bucket to another bucket
+
+        Output      :   The data is copied from one bucket to another
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.copy_data.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            copy_source = {"Bucket": from_bucket, "Key": from_fname}
+
+            self.s3_client.copy(copy_source, to_bucket, to_fname)
+
+            self.prefix_index.invalidate(to_bucket, to_fname)
+
+            self.log_writer.log(
+                log_file,
+                f"Copied data from bucket {from_bucket} to bucket {to_bucket}",
+            )
 
-                self.log_writer.exception_log(
-                    e, self.class_name, method_name, log_file,
-                )
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
 
-    def put_object(self, object, bucket, log_file):
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def delete_file(self, fname, bucket, log_file):
         """
-        Method Name :   put_object
-        Description :   This method puts an object in s3 bucket
+        Method Name :   delete_file
+        Description :   This method delete the file from s3 bucket
 
-        Output      :   An object is put in s3 bucket
+        Output      :   The file is deleted from s3 bucket
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
         Revisions   :   moved setup to cloud
         """
-        method_name = self.put_object.__name__
+        method_name = self.delete_file.__name__
 
         self.log_writer.start_log(
             "start", self.class_name, method_name, log_file,
         )
 
         try:
-            self.s3_client.put_object(bucket, (object + "/"))
+            self.s3_client.delete_object(Bucket=bucket, Key=fname)
+
+            self.prefix_index.invalidate(bucket, fname)
 
             self.log_writer.log(
-                log_file, f"Created {object} folder in {bucket} bucket",
+                log_file, f"Deleted {fname} from bucket {bucket}",
             )
 
             self.log_writer.start_log(
@@ -381,234 +1262,320 @@ class S3_Operation:
                 e, self.class_name, method_name, log_file,
             )
 
-    def upload_file(self, from_fname, to_fname, bucket, log_file, remove=True):
+    def move_data(self, from_fname, from_bucket, to_fname, to_bucket, log_file):
         """
-        Method Name :   upload_file
-        Description :   This method uploades a file to s3 bucket with kwargs
+        Method Name :   move_data
+        Description :   This method moves the data from one bucket to other bucket
 
-        Output      :   A file is uploaded to s3 bucket
+        Output      :   The data is moved from one bucket to another
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
         Revisions   :   moved setup to cloud
         """
-        method_name = self.upload_file.__name__
+        method_name = self.move_data.__name__
 
         self.log_writer.start_log(
             "start", self.class_name, method_name, log_file,
         )
 
         try:
-            self.log_writer.log(
-                log_file, f"Uploading {from_fname} to s3 bucket {bucket}",
+            self.copy_data(
+                from_fname, from_bucket, to_fname, to_bucket, log_file,
             )
 
-            self.s3_resource.meta.client.upload_file(from_fname, bucket, to_fname)
+            self.delete_file(
+                from_fname, from_bucket, log_file,
+            )
 
             self.log_writer.log(
-                log_file, f"Uploaded {from_fname} to s3 bucket {bucket}",
+                log_file,
+                f"Moved {from_fname} from bucket {from_bucket} to {to_bucket}",
             )
 
-            if remove is True:
-                self.log_writer.log(
-                    log_file, f"Option remove is set {remove}..deleting the file",
-                )
-
-                os.remove(from_fname)
-
-                self.log_writer.log(
-                    log_file, f"Removed the local copy of {from_fname}",
-                )
-
-                self.log_writer.start_log(
-                    "exit", self.class_name, method_name, log_file,
-                )
-
-            else:
-                self.log_writer.log(
-                    log_file, f"Option remove is set {remove}, not deleting the file",
-                )
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
+            )
 
         except Exception as e:
             self.log_writer.exception_log(
                 e, self.class_name, method_name, log_file,
             )
 
-    def get_bucket(self, bucket, log_file):
+    def copy_many(self, pairs, from_bucket, to_bucket, log_file):
         """
-        Method Name :   get_bucket
-        Description :   This method gets the bucket from s3 
+        Method Name :   copy_many
+        Description :   This method copies a list of (from_fname, to_fname) pairs from one bucket to another bucket,
+                        the server side copies are run concurrently
 
-        Output      :   A s3 bucket name is returned based on the bucket
+        Output      :   A manifest with one dict of from, to, copied and error per pair is returned
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
         Revisions   :   moved setup to cloud
         """
-        method_name = self.get_bucket.__name__
+        method_name = self.copy_many.__name__
 
         self.log_writer.start_log(
             "start", self.class_name, method_name, log_file,
         )
 
+        def copy_pair(pair):
+            from_fname, to_fname = pair
+
+            result = {
+                "from": from_fname,
+                "to": to_fname,
+                "copied": False,
+                "error": None,
+            }
+
+            try:
+                self.s3_client.copy_object(
+                    CopySource={"Bucket": from_bucket, "Key": from_fname},
+                    Bucket=to_bucket,
+                    Key=to_fname,
+                )
+
+                result["copied"] = True
+
+            except ClientError as e:
+                result["error"] = str(e)
+
+            return result
+
         try:
-            bucket = self.s3_resource.Bucket(bucket)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                manifest = list(executor.map(copy_pair, pairs))
+
+            for r in manifest:
+                self.prefix_index.invalidate(to_bucket, r["to"])
+
+            failed = [r["from"] for r in manifest if r["copied"] is False]
 
             self.log_writer.log(
-                log_file, f"Got {bucket} bucket",
+                log_file,
+                f"Copied {len(manifest) - len(failed)} of {len(manifest)} files from bucket {from_bucket} to bucket {to_bucket}",
             )
 
+            if failed:
+                self.log_writer.log(
+                    log_file, f"Failed to copy {failed} from bucket {from_bucket}",
+                )
+
+            self.get_retry_metrics(log_file)
+
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, log_file,
             )
 
-            return bucket
+            return manifest
 
         except Exception as e:
             self.log_writer.exception_log(
                 e, self.class_name, method_name, log_file,
             )
 
-    def copy_data(self, from_fname, from_bucket, to_fname, to_bucket, log_file):
+    def check_manifest(self, manifest):
         """
-        Method Name :   copy_data
-        Description :   This method copies the data from one bucket to another bucket
+        Method Name :   check_manifest
+        Description :   This method checks the manifest returned by copy_many or move_many, so that a file which
+                        could not be routed stops the run instead of being left in the wrong folder
 
-        Output      :   The data is copied from one bucket to another
+        Output      :   The manifest is returned as it is
+        On Failure  :   Raise an exception naming the files which were not copied or not deleted
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        failed = [
+            f"{r['from']} : {r['error']}"
+            for r in manifest
+            if r["copied"] is False or r.get("deleted", True) is False
+        ]
+
+        if failed:
+            raise Exception(f"Failed to route {len(failed)} files : {failed}")
+
+        return manifest
+
+    def delete_many(self, fnames, bucket, log_file):
+        """
+        Method Name :   delete_many
+        Description :   This method deletes a list of files from s3 bucket using multi-object delete requests
+                        of up to 1000 keys each
+
+        Output      :   A dict of file name and error message for the files which could not be deleted
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
         Revisions   :   moved setup to cloud
         """
-        method_name = self.copy_data.__name__
+        method_name = self.delete_many.__name__
 
         self.log_writer.start_log(
             "start", self.class_name, method_name, log_file,
         )
 
         try:
-            copy_source = {"Bucket": from_bucket, "Key": from_fname}
+            errors = {}
+
+            for i in range(0, len(fnames), self.max_delete_keys):
+                batch = fnames[i : i + self.max_delete_keys]
 
-            self.s3_resource.meta.client.copy(copy_source, to_bucket, to_fname)
+                response = self.s3_client.delete_objects(
+                    Bucket=bucket,
+                    Delete={"Objects": [{"Key": f} for f in batch], "Quiet": True},
+                )
+
+                for err in response.get("Errors", []):
+                    errors[err["Key"]] = err.get("Message", err.get("Code"))
+
+                for f in batch:
+                    self.prefix_index.invalidate(bucket, f)
 
             self.log_writer.log(
                 log_file,
-                f"Copied data from bucket {from_bucket} to bucket {to_bucket}",
+                f"Deleted {len(fnames) - len(errors)} of {len(fnames)} files from bucket {bucket}",
             )
 
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, log_file,
             )
 
+            return errors
+
         except Exception as e:
             self.log_writer.exception_log(
                 e, self.class_name, method_name, log_file,
             )
 
-    def delete_file(self, fname, bucket, log_file):
+    def move_many(self, pairs, from_bucket, to_bucket, log_file):
         """
-        Method Name :   delete_file
-        Description :   This method delete the file from s3 bucket
+        Method Name :   move_many
+        Description :   This method moves a list of (from_fname, to_fname) pairs from one bucket to another bucket.
+                        Only the files which were copied successfully are deleted from the source bucket
 
-        Output      :   The file is deleted from s3 bucket
+        Output      :   A manifest with one dict of from, to, copied, deleted and error per pair is returned
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
         Revisions   :   moved setup to cloud
         """
-        method_name = self.delete_file.__name__
+        method_name = self.move_many.__name__
 
         self.log_writer.start_log(
             "start", self.class_name, method_name, log_file,
         )
 
         try:
-            self.s3_resource.Object(bucket, fname).delete()
+            manifest = self.copy_many(pairs, from_bucket, to_bucket, log_file)
+
+            copied = [r["from"] for r in manifest if r["copied"] is True]
+
+            errors = self.delete_many(copied, from_bucket, log_file)
+
+            for r in manifest:
+                r["deleted"] = r["copied"] is True and r["from"] not in errors
+
+                if r["from"] in errors:
+                    r["error"] = errors[r["from"]]
 
             self.log_writer.log(
-                log_file, f"Deleted {fname} from bucket {bucket}",
+                log_file,
+                f"Moved {len(copied) - len(errors)} of {len(manifest)} files from bucket {from_bucket} to {to_bucket}",
             )
 
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, log_file,
             )
 
+            return manifest
+
         except Exception as e:
             self.log_writer.exception_log(
                 e, self.class_name, method_name, log_file,
             )
 
-    def move_data(self, from_fname, from_bucket, to_fname, to_bucket, log_file):
+    def get_files_from_folder(self, folder_name, bucket, log_file, fresh=False):
         """
-        Method Name :   move_data
-        Description :   This method moves the data from one bucket to other bucket
+        Method Name :   get_files_from_folder
+        Description :   This method gets the files a folder in s3 bucket. With fresh, the folder is listed again
+                        instead of served from the cached prefix index
 
-        Output      :   The data is moved from one bucket to another
+        Output      :   A list of files is returned
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
         Revisions   :   moved setup to cloud
         """
-        method_name = self.move_data.__name__
+        method_name = self.get_files_from_folder.__name__
 
         self.log_writer.start_log(
             "start", self.class_name, method_name, log_file,
         )
 
         try:
-            self.copy_data(
-                from_bucket, from_fname, to_bucket, to_fname, log_file,
+            lst = self.prefix_index.list_objects(
+                self.s3_client, bucket, folder_name, fresh=fresh
             )
 
-            self.delete_file(
-                from_bucket, from_fname, log_file,
-            )
+            list_of_files = [object.key for object in lst]
 
             self.log_writer.log(
-                log_file,
-                f"Moved {from_fname} from bucket {from_bucket} to {to_bucket}",
+                log_file, f"Got list of files from bucket {bucket}",
             )
 
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, log_file,
             )
 
+            return list_of_files
+
         except Exception as e:
             self.log_writer.exception_log(
                 e, self.class_name, method_name, log_file,
             )
 
-    def get_files_from_folder(self, folder_name, bucket, log_file):
+    def get_files_meta_from_folder(self, folder_name, bucket, log_file):
         """
-        Method Name :   get_files_from_folder
-        Description :   This method gets the files a folder in s3 bucket
+        Method Name :   get_files_meta_from_folder
+        Description :   This method gets the files of a folder in s3 bucket along with their ETag and size. The
+                        folder is always listed again, as the listing is used to detect new or changed files
 
-        Output      :   A list of files is returned
+        Output      :   A list of dict of key, etag and size is returned
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
         Revisions   :   moved setup to cloud
         """
-        method_name = self.get_files_from_folder.__name__
+        method_name = self.get_files_meta_from_folder.__name__
 
         self.log_writer.start_log(
             "start", self.class_name, method_name, log_file,
         )
 
         try:
-            lst = self.get_file_object(folder_name, bucket, log_file)
+            lst = self.prefix_index.list_objects(
+                self.s3_client, bucket, folder_name, fresh=True
+            )
 
-            list_of_files = [object.key for object in lst]
+            files_meta = [
+                {"key": obj.key, "etag": obj.e_tag, "size": obj.size}
+                for obj in lst
+                if not obj.key.endswith("/")
+            ]
 
             self.log_writer.log(
-                log_file, f"Got list of files from bucket {bucket}",
+                log_file,
+                f"Got {len(files_meta)} files with etag and size from {folder_name} folder of bucket {bucket}",
             )
 
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, log_file,
             )
 
-            return list_of_files
+            return files_meta
 
         except Exception as e:
             self.log_writer.exception_log(
@@ -618,7 +1585,8 @@ class S3_Operation:
     def get_file_object(self, fname, bucket, log_file):
         """
         Method Name :   get_file_object
-        Description :   This method gets the file object from s3 bucket
+        Description :   This method gets the file object from s3 bucket. The objects are looked up in the cached
+                        prefix index instead of listing the bucket on every call
 
         Output      :   A file object is returned
         On Failure  :   Write an exception log and then raise an exception
@@ -633,9 +1601,7 @@ class S3_Operation:
         )
 
         try:
-            bucket = self.get_bucket(bucket, log_file,)
-
-            lst_objs = [object for object in bucket.objects.filter(Prefix=fname)]
+            lst_objs = self.prefix_index.list_objects(self.s3_client, bucket, fname)
 
             self.log_writer.log(
                 log_file, f"Got {fname} from bucket {bucket}",
@@ -659,9 +1625,10 @@ class S3_Operation:
     def load_model(self, model_name, bucket, log_file, model_dir=None):
         """
         Method Name :   load_model
-        Description :   This method loads the model from s3 bucket
+        Description :   This method loads the model from s3 bucket. With model_cache enabled in params.yaml, the
+                        model is served from the process wide model cache and only downloaded when its ETag changes
 
-        Output      :   A pandas series object consisting of runs for the particular experiment id
+        Output      :   The deserialized model is returned
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -683,14 +1650,31 @@ class S3_Operation:
             model_file = func()
 
             self.log_writer.log(
-                log_file == log_file, f"Got {model_file} as model file",
+                log_file, f"Got {model_file} as model file",
             )
 
-            f_obj = self.get_file_object(model_name, bucket, log_file)
+            if self.model_cache_enabled is True:
+                model_cache = get_model_cache(self.config)
+
+                model = model_cache.get_model(
+                    self.s3_client,
+                    bucket,
+                    model_file,
+                    lambda data, content_encoding: pickle.loads(
+                        decompress(data, get_codec(content_encoding))
+                    ),
+                )
+
+                self.log_writer.log(
+                    log_file, f"Model cache stats are {model_cache.get_stats()}",
+                )
+
+            else:
+                f_obj = self.get_file_object(model_file, bucket, log_file)
 
-            model_obj = self.read_object(f_obj, log_file, decode=False)
+                model_obj = self.read_object(f_obj, log_file, decode=False)
 
-            model = pickle.loads(model_obj)
+                model = pickle.loads(model_obj)
 
             self.log_writer.log(
                 log_file, f"Loaded {model_name} from bucket {bucket}",
@@ -725,7 +1709,7 @@ class S3_Operation:
         )
 
         try:
-            model_name = self.model_utils.get_model_name(model, log_file)
+            model_name = model.__class__.__name__
 
             func = (
                 lambda: model_name + self.file_format
@@ -735,36 +1719,205 @@ class S3_Operation:
 
             model_file = func()
 
-            with open(file=model_file, mode="wb") as f:
-                pickle.dump(model, f)
+            bucket_model_path = model_dir + "/" + model_file
 
             self.log_writer.log(
-                log_file, f"Saved {model_name} model as {model_file} name",
+                log_file, f"Uploading {model_file} to {model_bucket} bucket",
             )
 
-            bucket_model_path = model_dir + "/" + model_file
+            if self.in_memory_upload is True:
+                self.upload_from_memory(
+                    lambda f: pickle.dump(model, f),
+                    bucket_model_path,
+                    model_bucket,
+                    log_file,
+                )
+
+            else:
+                with open(file=model_file, mode="wb") as f:
+                    pickle.dump(model, f)
+
+                self.log_writer.log(
+                    log_file, f"Saved {model_name} model as {model_file} name",
+                )
+
+                self.upload_file(
+                    model_file, bucket_model_path, model_bucket, log_file,
+                )
 
             self.log_writer.log(
-                log_file, f"Uploading {model_file} to {model_bucket} bucket",
+                log_file, f"Uploaded  {model_file} to {model_bucket} bucket",
             )
 
-            self.upload_file(
-                model_file, bucket_model_path, model_bucket, log_file,
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
             )
 
+        except Exception as e:
             self.log_writer.log(
-                log_file, f"Uploaded  {model_file} to {model_bucket} bucket",
+                log_file, f"Model file {model_name} could not be saved",
+            )
+
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def upload_df(self, data_frame, bucket_fname, bucket, log_file, file_format=None):
+        """
+        Method Name :   upload_df
+        Description :   This method uploads a dataframe to s3 bucket in the storage format of params.yaml, or in
+                        file_format if given. The extension of bucket_fname is replaced by the one of the format,
+                        and for the columnar formats the numeric columns are stored typed
+
+        Output      :   The name of the uploaded file is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.upload_df.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            file_format = check_file_format(
+                self.storage_format if file_format is None else file_format
+            )
+
+            key = get_fname_for_format(bucket_fname, file_format)
+
+            if file_format == "csv":
+                self.upload_df_as_csv(data_frame, key, key, bucket, log_file)
+
+            else:
+                typed_df = coerce_numeric_columns(data_frame, self.na_values)
+
+                self.upload_from_memory(
+                    lambda f: write_df(typed_df, f, file_format),
+                    key,
+                    bucket,
+                    log_file,
+                    compress=False,
+                )
+
+            self.log_writer.log(
+                log_file, f"Uploaded dataframe as {key} to {bucket} bucket",
             )
 
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, log_file,
             )
 
+            return key
+
         except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, log_file,
+            )
+
+    def upload_df_chunks(
+        self, chunks, bucket_fname, bucket, log_file, file_format=None
+    ):
+        """
+        Method Name :   upload_df_chunks
+        Description :   This method streams an iterable of dataframes to s3 bucket as one file in the storage
+                        format of params.yaml, or in file_format if given. The chunks are serialized into a pipe
+                        which is uploaded as it fills, so that only one chunk is held in memory at a time. An
+                        object left behind by a failed write is deleted
+
+        Output      :   The name of the uploaded file is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.upload_df_chunks.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, log_file,
+        )
+
+        try:
+            file_format = check_file_format(
+                self.storage_format if file_format is None else file_format
+            )
+
+            key = get_fname_for_format(bucket_fname, file_format)
+
+            compression = self.compression if file_format == "csv" else None
+
+            extra_args = {} if compression is None else {"ContentEncoding": compression}
+
+            read_fd, write_fd = os.pipe()
+
+            reader, writer = os.fdopen(read_fd, "rb"), os.fdopen(write_fd, "wb")
+
+            upload_errors = []
+
+            def upload():
+                try:
+                    self.s3_client.upload_fileobj(
+                        reader,
+                        bucket,
+                        key,
+                        ExtraArgs=extra_args,
+                        Config=self.transfer_config,
+                    )
+
+                except Exception as e:
+                    upload_errors.append(e)
+
+                finally:
+                    reader.close()
+
+            upload_thread = threading.Thread(target=upload, daemon=True)
+
+            upload_thread.start()
+
+            try:
+                with compressed_writer(
+                    writer, compression, self.compression_level
+                ) as f:
+                    rows = write_df_chunks(chunks, f, file_format, self.na_values)
+
+            except Exception as e:
+                write_error = e
+
+            else:
+                write_error = None
+
+            try:
+                writer.close()
+
+            except OSError:
+                pass
+
+            upload_thread.join()
+
+            self.prefix_index.invalidate(bucket, key)
+
+            if upload_errors:
+                raise upload_errors[0]
+
+            if write_error is not None:
+                self.s3_client.delete_object(Bucket=bucket, Key=key)
+
+                raise write_error
+
             self.log_writer.log(
-                log_file, f"Model file {model_name} could not be saved",
+                log_file,
+                f"Streamed {rows} rows as {key} to {bucket} bucket with compression as {compression}",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, log_file,
             )
 
+            return key
+
+        except Exception as e:
             self.log_writer.exception_log(
                 e, self.class_name, method_name, log_file,
             )
@@ -772,7 +1925,8 @@ class S3_Operation:
     def upload_df_as_csv(self, data_frame, local_fname, bucket_fname, bucket, log_file):
         """
         Method Name :   upload_df_as_csv
-        Description :   This method uploades a dataframe as csv file to s3 bucket
+        Description :   This method uploades a dataframe as csv file to s3 bucket. With s3_upload in_memory set
+                        in params.yaml, the csv is serialized in memory and local_fname is not used
 
         Output      :   A dataframe is uploaded as csv file to s3 bucket
         On Failure  :   Write an exception log and then raise an exception
@@ -787,15 +1941,26 @@ class S3_Operation:
         )
 
         try:
-            data_frame.to_csv(local_fname, index=None, header=True)
+            if self.in_memory_upload is True:
+                self.upload_from_memory(
+                    lambda f: data_frame.to_csv(f, index=None, header=True),
+                    bucket_fname,
+                    bucket,
+                    log_file,
+                    text=True,
+                )
 
-            self.log_writer.log(
-                log_file, f"Created a local copy of dataframe with name {local_fname}",
-            )
+            else:
+                data_frame.to_csv(local_fname, index=None, header=True)
 
-            self.upload_file(
-                local_fname, bucket_fname, bucket, log_file,
-            )
+                self.log_writer.log(
+                    log_file,
+                    f"Created a local copy of dataframe with name {local_fname}",
+                )
+
+                self.upload_file(
+                    local_fname, bucket_fname, bucket, log_file,
+                )
 
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, log_file,
@@ -0,0 +1,360 @@
+import json
+import mmap
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+FOLDER_MARKER = ".s3folder"
+
+META_SUFFIX = ".s3meta"
+
+
+def client_error(code, message, operation_name):
+    return ClientError(
+        {
+            "Error": {"Code": code, "Message": message},
+            "ResponseMetadata": {"HTTPStatusCode": int(code) if code.isdigit() else 404},
+        },
+        operation_name,
+    )
+
+
+class Mapped_Body:
+    """
+    Description :   This class exposes a memory mapped local file, or a byte range of it, with the read, iter_chunks
+                    and close methods of a botocore StreamingBody. The file and its mapping are closed as soon as
+                    the body is read to the end, or on close for a body which is not read to the end
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(self, path, start=0, end=None):
+        self.file = open(path, "rb")
+
+        size = os.fstat(self.file.fileno()).st_size
+
+        self.mm = (
+            mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        )
+
+        self.view = memoryview(self.mm if self.mm is not None else b"")[start:end]
+
+        self.size = len(self.view)
+
+        self.pos = 0
+
+        self.closed = False
+
+    def read(self, amt=None):
+        if self.closed is True:
+            if self.pos >= self.size:
+                return b""
+
+            raise ValueError("I/O operation on closed file")
+
+        end = self.size if amt is None or amt < 0 else self.pos + amt
+
+        data = self.view[self.pos : end].tobytes()
+
+        self.pos += len(data)
+
+        if self.pos >= self.size:
+            self.close()
+
+        return data
+
+    def iter_chunks(self, chunk_size=1024 * 1024):
+        while True:
+            data = self.read(chunk_size)
+
+            if not data:
+                break
+
+            yield data
+
+    def __iter__(self):
+        return self.iter_chunks()
+
+    def readable(self):
+        return True
+
+    def close(self):
+        if self.closed is True:
+            return
+
+        self.closed = True
+
+        self.view.release()
+
+        if self.mm is not None:
+            self.mm.close()
+
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Local_Storage_Client:
+    """
+    Description :   This class is a storage backend which keeps the buckets as directories under a local root
+                    directory. It implements the subset of the boto3 s3 client interface used by S3_Operation, so
+                    that the whole pipeline can run against local disk without a network hop
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+        self.lock = threading.Lock()
+
+        os.makedirs(self.root, exist_ok=True)
+
+    def get_path(self, bucket, key):
+        """
+        Method Name :   get_path
+        Description :   This method maps bucket and key to a path under the root directory, keys ending with a slash
+                        are folder markers
+
+        Output      :   The local path of the object
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        parts = [p for p in key.split("/") if p]
+
+        if bucket in ("", ".", "..") or "/" in bucket or ".." in parts:
+            raise client_error("InvalidArgument", f"Invalid key {bucket}/{key}", "Path")
+
+        if key.endswith("/") or not parts:
+            parts.append(FOLDER_MARKER)
+
+        return os.path.join(self.root, bucket, *parts)
+
+    def get_key(self, bucket, path):
+        rel = os.path.relpath(path, os.path.join(self.root, bucket)).replace(os.sep, "/")
+
+        if rel == FOLDER_MARKER or rel.endswith("/" + FOLDER_MARKER):
+            return rel[: -len(FOLDER_MARKER)]
+
+        return rel
+
+    def get_etag(self, stat):
+        return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+    def read_meta(self, path):
+        try:
+            with open(path + META_SUFFIX) as f:
+                return json.load(f)
+
+        except (OSError, ValueError):
+            return {}
+
+    def stat_object(self, bucket, key, operation_name):
+        path = self.get_path(bucket, key)
+
+        try:
+            stat = os.stat(path)
+
+        except OSError:
+            raise client_error("404", f"{bucket}/{key} does not exist", operation_name)
+
+        return path, stat
+
+    def head_object(self, Bucket, Key, **kwargs):
+        path, stat = self.stat_object(Bucket, Key, "HeadObject")
+
+        response = {
+            "ContentLength": stat.st_size,
+            "ETag": self.get_etag(stat),
+            "LastModified": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+        }
+
+        meta = self.read_meta(path)
+
+        if meta.get("ContentEncoding") is not None:
+            response["ContentEncoding"] = meta["ContentEncoding"]
+
+        return response
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None, Range=None, **kwargs):
+        path, stat = self.stat_object(Bucket, Key, "GetObject")
+
+        etag = self.get_etag(stat)
+
+        if IfNoneMatch is not None and IfNoneMatch == etag:
+            raise client_error("304", "Not Modified", "GetObject")
+
+        start, end = 0, None
+
+        if Range is not None:
+            first, last = Range.replace("bytes=", "").split("-")
+
+            start = int(first)
+
+            end = int(last) + 1 if last else None
+
+        response = self.head_object(Bucket, Key)
+
+        body = Mapped_Body(path, start, end)
+
+        response["Body"] = body
+
+        response["ContentLength"] = body.size
+
+        if Range is not None:
+            response["ContentRange"] = (
+                f"bytes {start}-{start + body.size - 1}/{stat.st_size}"
+            )
+
+        return response
+
+    def write_object(self, bucket, key, fileobj, content_encoding=None):
+        path = self.get_path(bucket, key)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        with open(tmp_path, "wb") as f:
+            if isinstance(fileobj, (bytes, bytearray)):
+                f.write(fileobj)
+
+            else:
+                shutil.copyfileobj(fileobj, f, 1024 * 1024)
+
+        os.replace(tmp_path, path)
+
+        if content_encoding is not None:
+            with open(path + META_SUFFIX, "w") as f:
+                json.dump({"ContentEncoding": content_encoding}, f)
+
+        elif os.path.exists(path + META_SUFFIX):
+            os.remove(path + META_SUFFIX)
+
+        return {"ETag": self.get_etag(os.stat(path))}
+
+    def put_object(self, Bucket, Key, Body=b"", ContentEncoding=None, **kwargs):
+        if isinstance(Body, str):
+            Body = Body.encode()
+
+        return self.write_object(Bucket, Key, Body, ContentEncoding)
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None, Config=None, **kwargs):
+        extra_args = ExtraArgs or {}
+
+        self.write_object(Bucket, Key, Fileobj, extra_args.get("ContentEncoding"))
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Config=None, **kwargs):
+        with open(Filename, "rb") as f:
+            self.upload_fileobj(f, Bucket, Key, ExtraArgs)
+
+    def copy_object(self, CopySource, Bucket, Key, **kwargs):
+        path, _ = self.stat_object(CopySource["Bucket"], CopySource["Key"], "CopyObject")
+
+        meta = self.read_meta(path)
+
+        with open(path, "rb") as f:
+            response = self.write_object(Bucket, Key, f, meta.get("ContentEncoding"))
+
+        return {"CopyObjectResult": response}
+
+    def copy(self, CopySource, Bucket, Key, **kwargs):
+        self.copy_object(CopySource, Bucket, Key)
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        path = self.get_path(Bucket, Key)
+
+        for p in (path, path + META_SUFFIX):
+            try:
+                os.remove(p)
+
+            except OSError:
+                pass
+
+        return {}
+
+    def delete_objects(self, Bucket, Delete, **kwargs):
+        deleted = []
+
+        for obj in Delete["Objects"]:
+            self.delete_object(Bucket, obj["Key"])
+
+            deleted.append({"Key": obj["Key"]})
+
+        return {} if Delete.get("Quiet") else {"Deleted": deleted}
+
+    def list_objects_v2(
+        self, Bucket, Prefix="", MaxKeys=1000, ContinuationToken=None, **kwargs
+    ):
+        """
+        Method Name :   list_objects_v2
+        Description :   This method lists the objects of the bucket directory in key order, walking only the deepest
+                        directory which contains the prefix
+
+        Output      :   A list_objects_v2 response
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        bucket_dir = os.path.join(self.root, Bucket)
+
+        if not os.path.isdir(bucket_dir):
+            raise client_error("NoSuchBucket", f"{Bucket} does not exist", "ListObjectsV2")
+
+        base_dir = os.path.join(bucket_dir, *Prefix.split("/")[:-1])
+
+        keys = []
+
+        for dirpath, _, fnames in os.walk(base_dir):
+            for fname in fnames:
+                if fname.endswith(META_SUFFIX) or fname.endswith(".tmp"):
+                    continue
+
+                key = self.get_key(Bucket, os.path.join(dirpath, fname))
+
+                if key.startswith(Prefix) and (
+                    ContinuationToken is None or key > ContinuationToken
+                ):
+                    keys.append(key)
+
+        keys.sort()
+
+        page = keys[:MaxKeys]
+
+        contents = []
+
+        for key in page:
+            stat = os.stat(self.get_path(Bucket, key))
+
+            contents.append(
+                {
+                    "Key": key,
+                    "Size": stat.st_size,
+                    "ETag": self.get_etag(stat),
+                    "LastModified": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+                }
+            )
+
+        response = {
+            "Contents": contents,
+            "KeyCount": len(contents),
+            "IsTruncated": len(keys) > MaxKeys,
+        }
+
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1]
+
+        return response
+
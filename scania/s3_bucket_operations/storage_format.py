@@ -0,0 +1,190 @@
+import os
+from io import TextIOWrapper
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+FILE_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "feather": ".arrow"}
+
+
+def check_file_format(file_format):
+    """
+    Method Name :   check_file_format
+    Description :   This method checks whether the storage format is supported
+
+    Output      :   The file format is returned as it is
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if file_format not in FILE_EXTENSIONS:
+        raise ValueError(
+            f"Unsupported storage format {file_format}, use one of {list(FILE_EXTENSIONS)}"
+        )
+
+    return file_format
+
+
+def get_fname_for_format(fname, file_format):
+    """
+    Method Name :   get_fname_for_format
+    Description :   This method replaces the extension of fname with the one of the storage format, so that the
+                    csv file names in params.yaml can be used for every format
+
+    Output      :   The file name with the extension of the storage format
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    return os.path.splitext(fname)[0] + FILE_EXTENSIONS[check_file_format(file_format)]
+
+
+def coerce_numeric_columns(data_frame, na_values):
+    """
+    Method Name :   coerce_numeric_columns
+    Description :   This method converts the text columns, whose values are all numbers apart from the na_values
+                    tokens, to float columns with NaN in place of the tokens. Other columns are left as they are
+
+    Output      :   A dataframe with typed numeric columns
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    data_frame = data_frame.copy()
+
+    for col in data_frame.columns:
+        if pd.api.types.is_numeric_dtype(data_frame[col]):
+            continue
+
+        values = data_frame[col].replace(na_values, np.nan)
+
+        try:
+            data_frame[col] = pd.to_numeric(values)
+
+        except (ValueError, TypeError):
+            continue
+
+    return data_frame
+
+
+def write_df(data_frame, f, file_format):
+    """
+    Method Name :   write_df
+    Description :   This method writes the dataframe to the binary file object f in the storage format
+
+    Output      :   The dataframe is written to f
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if file_format == "parquet":
+        data_frame.to_parquet(f, index=False)
+
+    elif file_format == "feather":
+        data_frame.reset_index(drop=True).to_feather(f)
+
+    else:
+        raise ValueError(f"write_df does not handle {file_format}, use a text stream")
+
+
+def write_df_chunks(chunks, f, file_format, na_values):
+    """
+    Method Name :   write_df_chunks
+    Description :   This method writes an iterable of dataframes to the binary file object f as one file in the
+                    storage format, one chunk at a time. The columns of the first chunk define the file, columns
+                    missing from a later chunk are written empty. For the columnar formats each chunk becomes a
+                    row group or record batch, with the numeric columns typed as float64 so that the chunks share
+                    one schema
+
+    Output      :   The number of rows written to f
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    rows, writer, schema, columns = 0, None, None, None
+
+    if file_format == "csv":
+        writer = TextIOWrapper(f, encoding="utf-8", newline="", write_through=True)
+
+    try:
+        for chunk in chunks:
+            if columns is None:
+                columns = list(chunk.columns)
+
+            elif list(chunk.columns) != columns:
+                extra = [col for col in chunk.columns if col not in columns]
+
+                if extra:
+                    raise ValueError(f"Columns {extra} are not in the first chunk")
+
+                chunk = chunk.reindex(columns=columns)
+
+            if file_format == "csv":
+                chunk.to_csv(writer, index=False, header=rows == 0)
+
+            else:
+                chunk = coerce_numeric_columns(chunk, na_values)
+
+                for col in chunk.columns:
+                    if pd.api.types.is_numeric_dtype(
+                        chunk[col]
+                    ) and not pd.api.types.is_bool_dtype(chunk[col]):
+                        chunk[col] = chunk[col].astype("float64")
+
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+
+                if writer is None:
+                    schema = table.schema
+
+                    writer = (
+                        pq.ParquetWriter(f, schema)
+                        if file_format == "parquet"
+                        else pa.ipc.new_file(f, schema)
+                    )
+
+                writer.write_table(table.cast(schema))
+
+            rows += len(chunk)
+
+    finally:
+        if file_format == "csv":
+            writer.flush()
+
+            writer.detach()
+
+        elif writer is not None:
+            writer.close()
+
+    if file_format != "csv" and writer is None:
+        write_df(pd.DataFrame(), f, file_format)
+
+    return rows
+
+
+def read_df(f, file_format, columns=None):
+    """
+    Method Name :   read_df
+    Description :   This method reads a dataframe in the storage format from the file object f, only the given
+                    columns are read when columns is not None
+
+    Output      :   A pandas dataframe
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if file_format == "csv":
+        return pd.read_csv(f, usecols=columns)
+
+    elif file_format == "parquet":
+        return pd.read_parquet(f, columns=columns)
+
+    else:
+        return pd.read_feather(f, columns=columns)
@@ -0,0 +1,210 @@
+import json
+import uuid
+from datetime import datetime
+
+from scania.s3_bucket_operations.s3_operations import S3_Operation
+from utils.logger import App_Logger
+
+
+class Ingestion_Manifest:
+    """
+    Description :   This class keeps the ingestion manifest of the raw batch files in s3 bucket. For every raw file
+                    ingested, the manifest stores its key, ETag, size, validation verdict and the id of the run
+                    which processed it, so that a run only processes the files which are new or have changed
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(self, manifest_file, bucket, log_file):
+        self.manifest_file = manifest_file
+
+        self.bucket = bucket
+
+        self.log_file = log_file
+
+        self.class_name = self.__class__.__name__
+
+        self.log_writer = App_Logger()
+
+        self.s3 = S3_Operation()
+
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S_") + uuid.uuid4().hex[:8]
+
+        self.entries = {}
+
+    def load(self):
+        """
+        Method Name :   load
+        Description :   This method loads the manifest from s3 bucket, an empty manifest is used if there is none
+
+        Output      :   The manifest entries are loaded
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.load.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, self.log_file,
+        )
+
+        try:
+            files = self.s3.get_files_from_folder(
+                self.manifest_file, self.bucket, self.log_file, fresh=True
+            )
+
+            if self.manifest_file in files:
+                self.entries = self.s3.read_json(
+                    self.manifest_file, self.bucket, self.log_file
+                )
+
+            else:
+                self.entries = {}
+
+            self.log_writer.log(
+                self.log_file,
+                f"Loaded {len(self.entries)} entries from {self.manifest_file} manifest",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, self.log_file,
+            )
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, self.log_file,
+            )
+
+    def get_changed_files(self, files_meta):
+        """
+        Method Name :   get_changed_files
+        Description :   This method compares the listed raw files against the manifest by ETag and size
+
+        Output      :   A list of names of the raw files which are new or have changed
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.get_changed_files.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, self.log_file,
+        )
+
+        try:
+            fnames = []
+
+            for meta in files_meta:
+                entry = self.entries.get(meta["key"])
+
+                if (
+                    entry is None
+                    or entry["etag"] != meta["etag"]
+                    or entry["size"] != meta["size"]
+                ):
+                    fnames.append(meta["key"].split("/")[-1])
+
+            self.log_writer.log(
+                self.log_file,
+                f"Got {len(fnames)} new or changed files out of {len(files_meta)} raw files",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, self.log_file,
+            )
+
+            return fnames
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, self.log_file,
+            )
+
+    def record(self, files_meta, fnames, good_fnames):
+        """
+        Method Name :   record
+        Description :   This method records the raw files processed in this run with their verdict, good if the
+                        file is still in the good data folder after validation, bad otherwise
+
+        Output      :   The manifest entries are updated
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.record.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, self.log_file,
+        )
+
+        try:
+            for meta in files_meta:
+                fname = meta["key"].split("/")[-1]
+
+                if fname not in fnames:
+                    continue
+
+                self.entries[meta["key"]] = {
+                    "etag": meta["etag"],
+                    "size": meta["size"],
+                    "verdict": "good" if fname in good_fnames else "bad",
+                    "run_id": self.run_id,
+                }
+
+            self.log_writer.log(
+                self.log_file,
+                f"Recorded {len(fnames)} files for run {self.run_id}, {len(good_fnames)} of them are good",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, self.log_file,
+            )
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, self.log_file,
+            )
+
+    def save(self):
+        """
+        Method Name :   save
+        Description :   This method uploads the manifest to s3 bucket
+
+        Output      :   The manifest is stored in s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.save.__name__
+
+        self.log_writer.start_log(
+            "start", self.class_name, method_name, self.log_file,
+        )
+
+        try:
+            self.s3.upload_from_memory(
+                lambda f: json.dump(self.entries, f, indent=1, sort_keys=True),
+                self.manifest_file,
+                self.bucket,
+                self.log_file,
+                text=True,
+            )
+
+            self.log_writer.log(
+                self.log_file,
+                f"Saved {len(self.entries)} entries to {self.manifest_file} manifest",
+            )
+
+            self.log_writer.start_log(
+                "exit", self.class_name, method_name, self.log_file,
+            )
+
+        except Exception as e:
+            self.log_writer.exception_log(
+                e, self.class_name, method_name, self.log_file,
+            )
@@ -1,6 +1,7 @@
 from scania.data_transform.data_transformation_pred import Data_Transform_Pred
 from scania.data_type_valid.data_type_valid_pred import DB_Operation_Pred
 from scania.raw_data_validation.pred_data_validation import Raw_Pred_Data_Validation
+from scania.validation_insertion.ingestion_manifest import Ingestion_Manifest
 from utils.logger import App_Logger
 from utils.read_params import read_params
 
@@ -35,6 +36,14 @@ class Pred_Validation:
 
         self.log_writer = App_Logger()
 
+        self.manifest_enabled = self.config["ingestion_manifest"]["enabled"]
+
+        self.manifest = Ingestion_Manifest(
+            self.config["ingestion_manifest"]["pred"],
+            self.raw_data.pred_data_bucket,
+            self.pred_main_log,
+        )
+
     def prediction_validation(self):
         """
         Method Name :   prediction_validation
@@ -62,13 +71,40 @@ class Pred_Validation:
 
             regex = self.raw_data.get_regex_pattern()
 
+            fnames = None
+
+            if self.manifest_enabled is True:
+                self.manifest.load()
+
+                files_meta = self.raw_data.s3.get_files_meta_from_folder(
+                    self.raw_data.raw_pred_data_dir,
+                    self.raw_data.raw_data_bucket,
+                    self.pred_main_log,
+                )
+
+                fnames = self.manifest.get_changed_files(files_meta)
+
+                if not fnames:
+                    self.log_writer.log(
+                        self.pred_main_log,
+                        "No new or changed raw files since the last run, skipping ingestion",
+                    )
+
+                    self.log_writer.start_log(
+                        "exit", self.class_name, method_name, self.pred_main_log,
+                    )
+
+                    return
+
             self.raw_data.validate_raw_fname(
-                regex, LengthOfDateStampInFile, LengthOfTimeStampInFile
+                regex, LengthOfDateStampInFile, LengthOfTimeStampInFile, fnames=fnames
             )
 
-            self.raw_data.validate_col_length(NumberofColumns=noofcolumns)
+            self.raw_data.validate_col_length(
+                NumberofColumns=noofcolumns, fnames=fnames
+            )
 
-            self.raw_data.validate_missing_values_in_col()
+            self.raw_data.validate_missing_values_in_col(fnames=fnames)
 
             self.log_writer.log(
                 self.pred_main_log, "Raw Data Validation Completed !!",
@@ -78,15 +114,16 @@ class Pred_Validation:
                 self.pred_main_log, "Starting Data Transformation",
             )
 
-            self.data_transform.add_quotes_to_string()
+            self.data_transform.add_quotes_to_string(fnames=fnames)
 
             self.log_writer.log(
                 self.pred_main_log, "Data Transformation completed !!",
             )
 
             self.db_operation.insert_good_data_as_record(
-                db_name=self.good_data_db_name,
-                collection_name=self.good_data_collection_name,
+                good_data_db_name=self.good_data_db_name,
+                good_data_collection_name=self.good_data_collection_name,
+                fnames=fnames,
             )
 
             self.log_writer.log(
@@ -94,10 +131,23 @@ class Pred_Validation:
             )
 
             self.db_operation.export_collection_to_csv(
-                db_name=self.good_data_db_name,
-                collection_name=self.good_data_collection_name,
+                good_data_db_name=self.good_data_db_name,
+                good_data_collection_name=self.good_data_collection_name,
             )
 
+            if self.manifest_enabled is True:
+                good_files = self.raw_data.s3.get_files_from_folder(
+                    self.raw_data.good_pred_data_dir,
+                    self.raw_data.pred_data_bucket,
+                    self.pred_main_log,
+                )
+
+                good_fnames = set(f.split("/")[-1] for f in good_files) & set(fnames)
+
+                self.manifest.record(files_meta, fnames, good_fnames)
+
+                self.manifest.save()
+
             self.log_writer.start_log(
                 "exit", self.class_name, method_name, self.pred_main_log,
             )
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+import yaml
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT_DIR)
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+
+@pytest.fixture(scope="session")
+def workdir(tmp_path_factory):
+    """
+    Runs the session in a temporary directory holding a copy of params.yaml, so that the logs of the code
+    under test stay out of the repository. Log shipping and tracing are turned off
+    """
+    path = tmp_path_factory.mktemp("work")
+
+    with open(os.path.join(ROOT_DIR, "params.yaml")) as f:
+        config = yaml.safe_load(f)
+
+    config["log_shipping"]["enabled"] = False
+
+    config["tracing"]["enabled"] = False
+
+    with open(os.path.join(str(path), "params.yaml"), "w") as f:
+        yaml.safe_dump(config, f)
+
+    os.makedirs(os.path.join(str(path), "logs"), exist_ok=True)
+
+    os.chdir(str(path))
+
+    return path
+
+
+@pytest.fixture(scope="session")
+def s3_mock(workdir):
+    """
+    Mocks s3 with moto for the whole session, as the storage clients are shared by the process
+    """
+    moto = pytest.importorskip("moto")
+
+    mock = moto.mock_aws() if hasattr(moto, "mock_aws") else moto.mock_s3()
+
+    mock.start()
+
+    yield
+
+    mock.stop()
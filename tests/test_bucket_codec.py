@@ -0,0 +1,137 @@
+import bson
+import numpy as np
+import pandas as pd
+from scania.mongo_db_operations.bucket_codec import (
+    BLOCK_FIELD,
+    decode_block,
+    encode_block,
+    get_block_rows,
+)
+
+NA_VALUES = ["na"]
+
+
+def round_trip(data_frame):
+    doc = encode_block(data_frame, NA_VALUES, meta={"file": "a.csv"})
+
+    return doc, decode_block(bson.decode(bson.encode(doc)))
+
+
+def test_round_trip_of_mixed_dtypes():
+    df = pd.DataFrame(
+        {
+            "int": [1, 2, 3],
+            "int8": pd.Series([1, -2, 3], dtype="int8"),
+            "float": [1.5, np.nan, -3.0],
+            "bool": [True, False, True],
+            "text": ["x", None, "z"],
+            "number_text": ["1", "na", "2.5"],
+            "all_nan": [np.nan] * 3,
+        }
+    )
+
+    doc, out = round_trip(df)
+
+    kinds = {col: spec["kind"] for col, spec in doc["data"].items()}
+
+    assert kinds == {
+        "int": "float",
+        "int8": "float",
+        "float": "float",
+        "bool": "list",
+        "text": "list",
+        "number_text": "float_token",
+        "all_nan": "float",
+    }
+
+    assert doc[BLOCK_FIELD] == {"n_rows": 3, "columns": list(df.columns), "file": "a.csv"}
+
+    assert list(out.columns) == list(df.columns)
+
+    pd.testing.assert_series_equal(out["int"], df["int"])
+
+    pd.testing.assert_series_equal(out["int8"], df["int8"])
+
+    pd.testing.assert_series_equal(out["float"], df["float"])
+
+    pd.testing.assert_series_equal(out["all_nan"], df["all_nan"])
+
+    assert out["bool"].tolist() == [True, False, True]
+
+    assert out["text"].tolist() == ["x", None, "z"]
+
+    assert out["number_text"].tolist() == [1.0, "na", 2.5]
+
+
+def test_nan_and_null_stats():
+    df = pd.DataFrame(
+        {
+            "float": [1.0, np.nan, 3.0],
+            "number_text": [None, "na", "4"],
+            "all_nan": [np.nan] * 3,
+        }
+    )
+
+    doc, out = round_trip(df)
+
+    assert doc["data"]["float"]["nulls"] == 1
+
+    assert doc["data"]["float"]["count"] == 2
+
+    assert doc["data"]["float"]["sum"] == 4.0
+
+    assert doc["data"]["float"]["min"] == 1.0
+
+    assert doc["data"]["number_text"]["nulls"] == 2
+
+    assert doc["data"]["all_nan"]["count"] == 0
+
+    assert doc["data"]["all_nan"]["min"] is None
+
+    assert out["number_text"].tolist() == [None, "na", 4.0]
+
+    assert out["all_nan"].isna().all()
+
+
+def test_int_column_with_nulls_stays_float():
+    df = pd.DataFrame({"int": pd.Series([1, None, 3], dtype="float64")})
+
+    _, out = round_trip(df)
+
+    pd.testing.assert_series_equal(out["int"], df["int"])
+
+
+def test_round_trip_of_empty_frames():
+    df = pd.DataFrame(
+        {"float": pd.Series([], dtype="float64"), "text": pd.Series([], dtype=object)}
+    )
+
+    doc, out = round_trip(df)
+
+    assert doc[BLOCK_FIELD]["n_rows"] == 0
+
+    assert list(out.columns) == ["float", "text"]
+
+    assert len(out) == 0
+
+    _, out = round_trip(pd.DataFrame())
+
+    assert out.shape == (0, 0)
+
+
+def test_decode_leaves_out_projected_columns():
+    df = pd.DataFrame({"a": [1.0, 2.0], "b": ["x", "y"]})
+
+    doc = encode_block(df, NA_VALUES)
+
+    del doc["data"]["b"]
+
+    assert list(decode_block(doc).columns) == ["a"]
+
+
+def test_block_rows_stay_below_the_document_limit():
+    assert get_block_rows(1000, 171) == 1000
+
+    assert get_block_rows(10 ** 6, 171) * 171 * 8 <= 12 * 1024 * 1024
+
+    assert get_block_rows(1000, 0) == 1000
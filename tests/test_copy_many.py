@@ -0,0 +1,46 @@
+import pytest
+
+BUCKET = "scania-test-copy-many"
+
+
+@pytest.fixture(scope="module")
+def s3(s3_mock):
+    import boto3
+    from scania.s3_bucket_operations.s3_operations import S3_Operation
+
+    boto3.client("s3").create_bucket(Bucket=BUCKET)
+
+    return S3_Operation()
+
+
+def test_move_many_routes_files_and_passes_the_check(s3):
+    for i in range(3):
+        s3.s3_client.put_object(Bucket=BUCKET, Key=f"good/f{i}.csv", Body=b"a\n")
+
+    pairs = [(f"good/f{i}.csv", f"bad/f{i}.csv") for i in range(3)]
+
+    manifest = s3.check_manifest(s3.move_many(pairs, BUCKET, BUCKET, "test_log"))
+
+    assert all(r["copied"] and r["deleted"] for r in manifest)
+
+    assert s3.get_files_from_folder("good", BUCKET, "test_log", fresh=True) == []
+
+    assert len(s3.get_files_from_folder("bad", BUCKET, "test_log", fresh=True)) == 3
+
+
+def test_check_manifest_raises_for_files_which_were_not_copied(s3):
+    s3.s3_client.put_object(Bucket=BUCKET, Key="raw/ok.csv", Body=b"a\n")
+
+    pairs = [("raw/ok.csv", "good/ok.csv"), ("raw/missing.csv", "good/missing.csv")]
+
+    manifest = s3.move_many(pairs, BUCKET, BUCKET, "test_log")
+
+    assert [r["copied"] for r in manifest] == [True, False]
+
+    assert manifest[1]["deleted"] is False
+
+    with pytest.raises(Exception, match="raw/missing.csv"):
+        s3.check_manifest(manifest)
+
+    with pytest.raises(Exception, match="raw/missing.csv"):
+        s3.check_manifest(s3.copy_many(pairs[1:], BUCKET, BUCKET, "test_log"))
@@ -0,0 +1,106 @@
+import gzip
+
+import pytest
+
+BUCKET = "scania-test-peek-header"
+
+
+class Counting_Client:
+    """
+    Passes the calls through to the storage client, recording the range of every get_object
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+        self.ranges = []
+
+    def get_object(self, **kwargs):
+        self.ranges.append(kwargs.get("Range"))
+
+        return self.client.get_object(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+@pytest.fixture(scope="module")
+def bucket(s3_mock):
+    import boto3
+
+    boto3.client("s3").create_bucket(Bucket=BUCKET)
+
+    return BUCKET
+
+
+@pytest.fixture
+def s3(bucket):
+    from scania.s3_bucket_operations.s3_operations import S3_Operation
+
+    s3 = S3_Operation()
+
+    s3.peek_bytes = 64
+
+    s3.s3_client = Counting_Client(s3.s3_client)
+
+    return s3
+
+
+def put_csv(s3, key, body, **kwargs):
+    s3.s3_client.client.put_object(Bucket=BUCKET, Key=key, Body=body, **kwargs)
+
+
+def test_get_header_end(s3):
+    assert s3.get_header_end(b"a,b\n1,2\n") == (0, 3)
+
+    assert s3.get_header_end(b"\r\n\na,b\r\n1,2") == (3, 7)
+
+    assert s3.get_header_end(b'"a\nb",c\n1,2\n') == (0, 7)
+
+    assert s3.get_header_end(b"a,b,c") == (0, None)
+
+    assert s3.get_header_end(b'"a\nb",c') == (0, None)
+
+    assert s3.get_header_end(b"") == (0, None)
+
+
+def test_peek_header_longer_than_the_first_range(s3):
+    columns = [f"sensor_{i:03d}" for i in range(200)]
+
+    put_csv(s3, "long.csv", ",".join(columns) + "\n" + ",".join(["1"] * 200) + "\n")
+
+    assert s3.peek_header("long.csv", BUCKET, "test_log") == (columns, 200)
+
+    assert len(s3.s3_client.ranges) > 1
+
+    assert s3.s3_client.ranges[0] == "bytes=0-63"
+
+
+def test_peek_header_with_crlf_and_quoted_newline(s3):
+    put_csv(s3, "crlf.csv", '\r\n"x\r\ny",b,c\r\n1,2,3\r\n')
+
+    assert s3.peek_header("crlf.csv", BUCKET, "test_log") == (["x\r\ny", "b", "c"], 3)
+
+    put_csv(s3, "plain_crlf.csv", "a,b\r\n1,2\r\n")
+
+    assert s3.peek_header("plain_crlf.csv", BUCKET, "test_log") == (["a", "b"], 2)
+
+
+def test_peek_header_of_gzip_encoded_object(s3):
+    columns = [f"col_{i}" for i in range(100)]
+
+    data = (",".join(columns) + "\n" + ",".join(["0.5"] * 100) + "\n") * 50
+
+    put_csv(s3, "gz.csv", gzip.compress(data.encode()), ContentEncoding="gzip")
+
+    assert s3.peek_header("gz.csv", BUCKET, "test_log") == (columns, 100)
+
+
+def test_peek_header_without_newline_or_data(s3):
+    put_csv(s3, "single.csv", "p,q,r")
+
+    assert s3.peek_header("single.csv", BUCKET, "test_log") == (["p", "q", "r"], 3)
+
+    put_csv(s3, "empty.csv", "")
+
+    assert s3.peek_header("empty.csv", BUCKET, "test_log") == ([], 0)
@@ -0,0 +1,130 @@
+import pytest
+from scania.s3_bucket_operations.prefix_index import Prefix_Index, Prefix_Index_Cache
+
+BUCKET = "scania-test-prefix-index"
+
+RAW_BUCKET = "scania-test-prefix-index-raw"
+
+N_KEYS = 1205
+
+
+class Counting_Client:
+    """
+    Passes the calls through to the storage client, counting the list_objects_v2 pages
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+        self.pages = 0
+
+    def list_objects_v2(self, **kwargs):
+        self.pages += 1
+
+        return self.client.list_objects_v2(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+def get_key(i):
+    return f"good/file_{i:05d}.csv"
+
+
+@pytest.fixture(scope="module")
+def s3_client(s3_mock):
+    import boto3
+
+    client = boto3.client("s3")
+
+    for bucket in (BUCKET, RAW_BUCKET):
+        client.create_bucket(Bucket=bucket)
+
+    for i in range(N_KEYS):
+        client.put_object(Bucket=BUCKET, Key=get_key(i), Body=b"a,b\n")
+
+    client.put_object(Bucket=BUCKET, Key="good/notes.txt", Body=b"")
+
+    client.put_object(Bucket=BUCKET, Key="other/file.csv", Body=b"")
+
+    return client
+
+
+def test_index_pages_across_more_than_1000_keys(s3_client):
+    client = Counting_Client(s3_client)
+
+    index = Prefix_Index(client, BUCKET, "good/", page_size=1000)
+
+    entries = list(index.iter_entries("good/", ".csv"))
+
+    assert [entry[0] for entry in entries] == [get_key(i) for i in range(N_KEYS)]
+
+    assert client.pages == 2
+
+    assert index.complete is True
+
+    assert len(index.keys) == N_KEYS + 1
+
+    key, size, etag, mtime = entries[-1]
+
+    assert size == 4 and etag.startswith('"') and mtime > 0
+
+    assert list(index.iter_entries("good/file_00010")) == [
+        entry for entry in entries if entry[0].startswith("good/file_00010")
+    ]
+
+    assert client.pages == 2
+
+
+def test_index_lists_only_the_pages_a_lookup_needs(s3_client):
+    client = Counting_Client(s3_client)
+
+    index = Prefix_Index(client, BUCKET, "good/", page_size=500)
+
+    assert [entry[0] for entry in index.iter_entries(get_key(42))] == [get_key(42)]
+
+    assert client.pages == 1
+
+    assert index.complete is False
+
+    assert [entry[0] for entry in index.iter_entries(get_key(1100))] == [get_key(1100)]
+
+    assert client.pages == 3
+
+    assert list(index.iter_entries("good/missing")) == []
+
+    assert client.pages == 3
+
+
+def test_cache_serves_covered_prefixes_and_bypasses_uncached_buckets(s3_client):
+    client = Counting_Client(s3_client)
+
+    cache = Prefix_Index_Cache(ttl_seconds=300, page_size=1000, uncached_buckets=[RAW_BUCKET])
+
+    assert len(cache.list_objects(client, BUCKET, "good/file_0000")) == 10
+
+    assert len(cache.list_objects(client, BUCKET, "good/file_00001")) == 1
+
+    assert client.pages == 1
+
+    s3_client.put_object(Bucket=BUCKET, Key="good/file_00001_new.csv", Body=b"")
+
+    assert len(cache.list_objects(client, BUCKET, "good/file_00001")) == 1
+
+    assert len(cache.list_objects(client, BUCKET, "good/file_00001", fresh=True)) == 2
+
+    s3_client.delete_object(Bucket=BUCKET, Key="good/file_00001_new.csv")
+
+    cache.invalidate(BUCKET, "good/file_00001_new.csv")
+
+    assert len(cache.list_objects(client, BUCKET, "good/file_00001")) == 1
+
+    assert cache.list_objects(client, RAW_BUCKET, "raw/") == []
+
+    s3_client.put_object(Bucket=RAW_BUCKET, Key="raw/new.csv", Body=b"")
+
+    assert [obj.key for obj in cache.list_objects(client, RAW_BUCKET, "raw/")] == [
+        "raw/new.csv"
+    ]
+
+    assert all(idx_bucket != RAW_BUCKET for idx_bucket, _ in cache.indexes)
@@ -0,0 +1,276 @@
+import threading
+from io import BytesIO
+
+import pytest
+from botocore.exceptions import ClientError
+from scania.s3_bucket_operations import retry_controller
+from scania.s3_bucket_operations.retry_controller import (
+    Managed_Client,
+    Retry_Controller,
+    classify_error,
+)
+
+
+def client_error(code, status):
+    return ClientError(
+        {
+            "Error": {"Code": code, "Message": code},
+            "ResponseMetadata": {"HTTPStatusCode": status},
+        },
+        "PutObject",
+    )
+
+
+def get_controller(**kwargs):
+    settings = {
+        "max_attempts": 4,
+        "base_delay": 0.1,
+        "max_delay": 1.0,
+        "initial_limit": 4,
+        "min_limit": 1,
+        "max_limit": 8,
+        "increase": 1,
+        "decrease_factor": 0.5,
+    }
+
+    settings.update(kwargs)
+
+    return Retry_Controller(**settings)
+
+
+class Stub_Client:
+    """
+    Fails put_object with the queued errors before succeeding, recording the body read by every attempt
+    """
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+
+        self.bodies = []
+
+        self.region = "us-east-1"
+
+    def put_object(self, Bucket, Key, Body):
+        self.bodies.append(Body.read())
+
+        if self.errors:
+            raise self.errors.pop(0)
+
+        return {"ETag": '"etag"'}
+
+    def get_paginator(self, name):
+        return name
+
+
+class Pipe_Body:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        data, self.data = self.data, b""
+
+        return data
+
+    def seekable(self):
+        return False
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    slept = []
+
+    monkeypatch.setattr(retry_controller.time, "sleep", slept.append)
+
+    return slept
+
+
+def test_classify_error():
+    assert classify_error(client_error("SlowDown", 503)) == "throttle"
+
+    assert classify_error(client_error("Unknown", 503)) == "throttle"
+
+    assert classify_error(client_error("InternalError", 500)) == "transient"
+
+    assert classify_error(client_error("AccessDenied", 403)) is None
+
+    assert classify_error(ValueError("bad")) is None
+
+
+def test_release_increases_additively_and_decreases_multiplicatively():
+    controller = get_controller()
+
+    controller.acquire()
+
+    controller.release("success")
+
+    assert controller.limit == pytest.approx(4.25)
+
+    controller.acquire()
+
+    controller.release("throttle")
+
+    assert controller.limit == pytest.approx(2.125)
+
+    for _ in range(5):
+        controller.acquire()
+
+        controller.release("throttle")
+
+    assert controller.limit == 1
+
+    assert controller.get_metrics()["limit_decreases"] == 6
+
+    assert controller.inflight == 0
+
+
+def test_limit_is_capped_at_max_limit():
+    controller = get_controller(initial_limit=8)
+
+    for _ in range(20):
+        controller.acquire()
+
+        controller.release("success")
+
+    assert controller.limit == 8
+
+
+def test_acquire_waits_for_a_free_slot():
+    controller = get_controller(initial_limit=1)
+
+    controller.acquire()
+
+    acquired = threading.Event()
+
+    def acquire():
+        controller.acquire()
+
+        acquired.set()
+
+    thread = threading.Thread(target=acquire)
+
+    thread.start()
+
+    assert acquired.wait(0.2) is False
+
+    controller.release(None)
+
+    assert acquired.wait(5) is True
+
+    thread.join()
+
+    assert controller.get_metrics()["max_inflight"] == 1
+
+
+def test_get_delay_is_full_jitter_capped_at_max_delay(monkeypatch):
+    controller = get_controller()
+
+    monkeypatch.setattr(retry_controller.random, "uniform", lambda low, high: (low, high))
+
+    assert controller.get_delay(0) == (0, pytest.approx(0.1))
+
+    assert controller.get_delay(3) == (0, pytest.approx(0.8))
+
+    assert controller.get_delay(10) == (0, 1.0)
+
+
+def test_call_retries_throttling_and_rewinds_seekable_body(delays):
+    controller = get_controller()
+
+    client = Stub_Client([client_error("SlowDown", 503), client_error("503", 503)])
+
+    body = BytesIO(b"header\nrow")
+
+    body.read(3)
+
+    result = controller.call(client.put_object, Bucket="b", Key="k", Body=body)
+
+    assert result == {"ETag": '"etag"'}
+
+    assert client.bodies == [b"der\nrow"] * 3
+
+    assert len(delays) == 2
+
+    assert all(0 <= delay <= 1.0 for delay in delays)
+
+    metrics = controller.get_metrics()
+
+    assert metrics["calls"] == 1
+
+    assert metrics["retries"] == 2
+
+    assert metrics["throttles"] == 2
+
+    assert metrics["successes"] == 1
+
+    assert metrics["limit"] < 4
+
+    assert metrics["inflight"] == 0
+
+
+def test_call_does_not_retry_non_seekable_body(delays):
+    controller = get_controller()
+
+    client = Stub_Client([client_error("SlowDown", 503)])
+
+    with pytest.raises(ClientError):
+        controller.call(client.put_object, Bucket="b", Key="k", Body=Pipe_Body(b"data"))
+
+    assert client.bodies == [b"data"]
+
+    assert delays == []
+
+    assert controller.get_metrics()["failures"] == 1
+
+
+def test_call_does_not_retry_fatal_errors(delays):
+    controller = get_controller()
+
+    client = Stub_Client([client_error("AccessDenied", 403)])
+
+    with pytest.raises(ClientError):
+        controller.call(client.put_object, Bucket="b", Key="k", Body=BytesIO(b"data"))
+
+    assert len(client.bodies) == 1
+
+    assert delays == []
+
+
+def test_call_gives_up_after_max_attempts(delays):
+    controller = get_controller(max_attempts=3)
+
+    client = Stub_Client([client_error("SlowDown", 503)] * 5)
+
+    with pytest.raises(ClientError):
+        controller.call(client.put_object, Bucket="b", Key="k", Body=BytesIO(b"data"))
+
+    assert client.bodies == [b"data"] * 3
+
+    assert len(delays) == 2
+
+    metrics = controller.get_metrics()
+
+    assert metrics["failures"] == 1
+
+    assert metrics["retries"] == 2
+
+
+def test_managed_client_routes_calls_through_the_controller(delays):
+    controller = get_controller()
+
+    client = Stub_Client([client_error("SlowDown", 503)])
+
+    managed = Managed_Client(client, controller)
+
+    assert managed.put_object(Bucket="b", Key="k", Body=BytesIO(b"data")) == {
+        "ETag": '"etag"'
+    }
+
+    assert client.bodies == [b"data"] * 2
+
+    assert managed.put_object.__name__ == "put_object"
+
+    assert managed.get_paginator == client.get_paginator
+
+    assert managed.region == "us-east-1"
+
+    assert controller.get_metrics()["retries"] == 1
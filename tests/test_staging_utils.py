@@ -0,0 +1,19 @@
+from scania.mongo_db_operations.staging_utils import get_columns_to_drop
+
+PROFILE = {
+    "class": {"null_ratio": 0.0, "zero_variance": True},
+    "sparse": {"null_ratio": 0.7, "zero_variance": False},
+    "constant": {"null_ratio": 0.0, "zero_variance": True},
+    "sensor": {"null_ratio": 0.1, "zero_variance": False},
+}
+
+
+def test_columns_to_drop_keep_zero_variance_by_default():
+    assert get_columns_to_drop(PROFILE, 0.6, ["class"]) == ["sparse"]
+
+
+def test_columns_to_drop_with_zero_variance():
+    assert get_columns_to_drop(PROFILE, 0.6, ["class"], drop_zero_variance=True) == [
+        "sparse",
+        "constant",
+    ]
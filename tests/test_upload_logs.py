@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+BUCKET = "scania-test-upload-logs"
+
+
+@pytest.fixture(scope="module")
+def main_utils(s3_mock):
+    import boto3
+    from utils import main_utils
+
+    boto3.client("s3").create_bucket(Bucket=BUCKET)
+
+    return main_utils
+
+
+@pytest.fixture
+def sync_logs(main_utils, monkeypatch, tmp_path):
+    monkeypatch.setattr(main_utils.App_Logger, "ship_logs", lambda self: False)
+
+    return str(tmp_path)
+
+
+def write(log_path, name, text):
+    with open(os.path.join(log_path, name), "w") as f:
+        f.write(text)
+
+
+def get_uploaded(main_utils):
+    objs = main_utils.s3.s3_client.list_objects_v2(Bucket=BUCKET).get("Contents", [])
+
+    return sorted(obj["Key"].split("/")[-1] for obj in objs)
+
+
+def test_sync_upload_removes_the_uploaded_logs(main_utils, sync_logs):
+    write(sync_logs, "train_main_log.txt", "a\n")
+
+    write(sync_logs, "export_csv_log.txt", "b\n")
+
+    main_utils.upload_logs(sync_logs, BUCKET)
+
+    assert os.listdir(sync_logs) == []
+
+    assert "train_main_log.txt" in get_uploaded(main_utils)
+
+
+def test_failed_upload_is_retried_before_the_log_is_renamed_again(
+    main_utils, sync_logs, monkeypatch
+):
+    write(sync_logs, "pred_main_log.txt", "a\n")
+
+    def fail(*args, **kwargs):
+        raise Exception("upload failed")
+
+    with monkeypatch.context() as m:
+        m.setattr(main_utils.s3, "upload_file", fail)
+
+        with pytest.raises(Exception):
+            main_utils.upload_logs(sync_logs, BUCKET)
+
+    assert os.listdir(sync_logs) == ["pred_main_log.txt.uploading"]
+
+    write(sync_logs, "pred_main_log.txt", "b\n")
+
+    main_utils.upload_logs(sync_logs, BUCKET)
+
+    assert os.listdir(sync_logs) == ["pred_main_log.txt"]
+
+    main_utils.upload_logs(sync_logs, BUCKET)
+
+    assert os.listdir(sync_logs) == []
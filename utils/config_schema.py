@@ -0,0 +1,221 @@
+NUMBER = (int, float)
+
+OPTIONAL_INT = (int, type(None))
+
+BUCKETS = {
+    "input_files_bucket": str,
+    "scania_model_bucket": str,
+    "scania-mlflow_bucket": str,
+    "scania_pred_data_bucket": str,
+    "scania_train_data_bucket": str,
+    "scania_raw_data_bucket": str,
+}
+
+DB_LOGS = {
+    "col_validation": str,
+    "data_transform": str,
+    "export_csv": str,
+    "general": str,
+    "db_insert": str,
+    "missing_values_in_col": str,
+    "name_validation": str,
+    "values_from_schema": str,
+}
+
+CONFIG_SCHEMA = {
+    "base": {"random_state": int, "target_col": str, "test_size": NUMBER},
+    "app": {"host": str, "port": int},
+    "data": {
+        "raw_data": {"train_batch": str, "pred_batch": str},
+        "train": {"good_data_dir": str, "bad_data_dir": str},
+        "pred": {"good_data_dir": str, "bad_data_dir": str},
+    },
+    "mongodb": {
+        "scania_data_db_name": str,
+        "scania_train_data_collection": str,
+        "scania_pred_data_collection": str,
+        "insert_batch_size": int,
+        "insert_workers": int,
+        "export_batch_size": int,
+        "export_chunk_rows": int,
+        "stream_export": bool,
+        "insert_mode": str,
+        "file_registry_suffix": str,
+        "layout": str,
+        "bucket_rows": int,
+        "profile_export": bool,
+        "null_threshold": NUMBER,
+        "staging_backend": str,
+        "local_staging_dir": str,
+    },
+    "kmeans_cluster": {
+        "init": str,
+        "max_clusters": int,
+        "knee": {"curve": str, "direction": str},
+    },
+    "pca_model": {"n_components": int},
+    "s3_bucket": BUCKETS,
+    "storage": {"backend": str, "local_root": str},
+    "s3_client": {
+        "max_pool_connections": int,
+        "tcp_keepalive": bool,
+        "connect_timeout": NUMBER,
+        "read_timeout": NUMBER,
+        "retries": {"max_attempts": int, "mode": str},
+    },
+    "s3_retry": {
+        "enabled": bool,
+        "max_attempts": int,
+        "base_delay": NUMBER,
+        "max_delay": NUMBER,
+        "initial_limit": int,
+        "min_limit": int,
+        "max_limit": int,
+        "increase": int,
+        "decrease_factor": NUMBER,
+    },
+    "s3_read": {"stream": bool, "peek_bytes": int},
+    "s3_concurrency": {"max_workers": int, "max_inflight_bytes": int},
+    "s3_upload": {
+        "in_memory": bool,
+        "multipart_threshold": int,
+        "multipart_chunksize": int,
+        "max_concurrency": int,
+        "compression": (str, type(None)),
+        "compression_level": OPTIONAL_INT,
+    },
+    "storage_format": {"format": str, "na_values": list},
+    "ingestion_manifest": {"enabled": bool, "train": str, "pred": str},
+    "control_file_cache": {"ttl_seconds": NUMBER, "preload": bool, "preload_log": str},
+    "s3_prefix_index": {
+        "ttl_seconds": NUMBER,
+        "page_size": int,
+        "uncached_buckets": list,
+    },
+    "model_cache": {
+        "enabled": bool,
+        "max_models": int,
+        "cache_dir": str,
+        "max_disk_bytes": int,
+        "revalidate_seconds": NUMBER,
+    },
+    "models_dir": {"trained": str, "stag": str, "prod": str},
+    "model_utils": {"verbose": int, "cv": int, "n_jobs": int, "save_format": str},
+    "model_params": {"RandomForestClassifier": dict, "AdaBoostClassifier": dict},
+    "mlflow_config": {
+        "experiment_name": str,
+        "run_name": str,
+        "serialization_format": str,
+    },
+    "train_db_log": {
+        **DB_LOGS,
+        "model_training": str,
+        "load_prod_model": str,
+        "train_main": str,
+    },
+    "pred_db_log": {**DB_LOGS, "pred_main": str},
+    "schema_file": {"train_schema_file": str, "pred_schema_file": str},
+    "elbow_plot_fig": str,
+    "null_values_csv_file": str,
+    "pred_output_file": str,
+    "regex_file": str,
+    "export_csv_file": {"train": str, "pred": str},
+    "templates": {"dir": str, "index_html_file": str},
+    "log_writer": {
+        "async": bool,
+        "batch_size": int,
+        "queue_size": int,
+        "level": str,
+        "max_value_chars": int,
+    },
+    "tracing": {
+        "enabled": bool,
+        "trace_dir": str,
+        "format": str,
+        "max_spans": int,
+        "summary_rows": int,
+    },
+    "log_rotation": {
+        "max_bytes": int,
+        "max_seconds": NUMBER,
+        "compression": (str, type(None)),
+        "segment_dir": str,
+        "max_disk_bytes": int,
+    },
+    "log_shipping": {
+        "enabled": bool,
+        "bucket": str,
+        "prefix": str,
+        "batch_size": int,
+        "interval_seconds": NUMBER,
+        "close_timeout": NUMBER,
+    },
+}
+
+
+def get_type_name(expected):
+    if isinstance(expected, tuple):
+        return " or ".join(get_type_name(t) for t in expected)
+
+    return "null" if expected is type(None) else expected.__name__
+
+
+def is_instance(value, expected):
+    """
+    Method Name :   is_instance
+    Description :   This method checks a config value against its expected type. Booleans are not taken for
+                    numbers, so that a flag cannot silently stand in for a count
+
+    Output      :   True if the value has the expected type, else False
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    types = expected if isinstance(expected, tuple) else (expected,)
+
+    if isinstance(value, bool):
+        return bool in types
+
+    return isinstance(value, types)
+
+
+def get_config_errors(config, schema=CONFIG_SCHEMA, path=""):
+    """
+    Method Name :   get_config_errors
+    Description :   This method checks the config against the schema. A dict in the schema is a section whose
+                    keys are checked in turn, anything else is the type of the value. Keys which are not in the
+                    schema are allowed
+
+    Output      :   A list of error messages, one per missing or mistyped key
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    errors = []
+
+    for key, expected in schema.items():
+        key_path = f"{path}.{key}" if path else key
+
+        if not isinstance(config, dict) or key not in config:
+            errors.append(f"{key_path} is missing")
+
+            continue
+
+        value = config[key]
+
+        if isinstance(expected, dict):
+            if not isinstance(value, dict):
+                errors.append(f"{key_path} should be a section, got {type(value).__name__}")
+
+                continue
+
+            errors.extend(get_config_errors(value, expected, key_path))
+
+        elif not is_instance(value, expected):
+            errors.append(
+                f"{key_path} should be {get_type_name(expected)}, got {type(value).__name__}"
+            )
+
+    return errors
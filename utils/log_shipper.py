@@ -0,0 +1,223 @@
+import os
+import shutil
+import socket
+import threading
+
+from scania.s3_bucket_operations.compression import check_codec, compressed_writer
+
+CODEC_EXTENSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+TMP_SUFFIX = ".tmp"
+
+
+def get_segment_files(segment_dir):
+    """
+    Method Name :   get_segment_files
+    Description :   This method lists the closed segment files under the segment directory, one sub directory per
+                    run, oldest first. Files which are still being compressed are left out
+
+    Output      :   A list of (mtime, size, run_id, path) tuples
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    segments = []
+
+    if not os.path.isdir(segment_dir):
+        return segments
+
+    for run_id in os.listdir(segment_dir):
+        run_dir = os.path.join(segment_dir, run_id)
+
+        if not os.path.isdir(run_dir):
+            continue
+
+        for fname in os.listdir(run_dir):
+            path = os.path.join(run_dir, fname)
+
+            if fname.endswith(TMP_SUFFIX):
+                continue
+
+            try:
+                stat = os.stat(path)
+
+            except FileNotFoundError:
+                continue
+
+            segments.append((stat.st_mtime, stat.st_size, run_id, path))
+
+    return sorted(segments)
+
+
+class Log_Shipper:
+    """
+    Description :   This class ships the closed log segments of the process in a background thread. Segments are
+                    compressed in place, uploaded to the storage bucket under a key scoped by host and run in
+                    batches of batch_size, and removed once uploaded. Segments which cannot be uploaded stay on disk
+                    and are retried every interval_seconds, and the oldest ones are dropped when the segments take
+                    more than max_disk_bytes. Nothing is held in memory but the listing of the segment directory
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(
+        self,
+        client,
+        bucket,
+        prefix,
+        segment_dir,
+        codec,
+        batch_size,
+        interval_seconds,
+        max_disk_bytes,
+    ):
+        self.client = client
+
+        self.bucket = bucket
+
+        self.prefix = prefix.strip("/")
+
+        self.host = socket.gethostname()
+
+        self.segment_dir = segment_dir
+
+        self.codec = check_codec(codec)
+
+        self.extension = CODEC_EXTENSIONS[self.codec]
+
+        self.batch_size = batch_size
+
+        self.interval_seconds = interval_seconds
+
+        self.max_disk_bytes = max_disk_bytes
+
+        self.uploaded, self.dropped, self.error = 0, 0, None
+
+        self.wakeup = threading.Event()
+
+        self.stopped = threading.Event()
+
+        self.thread = threading.Thread(target=self.run, name="log-shipper", daemon=True)
+
+        self.thread.start()
+
+    def get_key(self, run_id, path):
+        return "/".join([self.prefix, self.host, run_id, os.path.basename(path)])
+
+    def compress(self, path):
+        """
+        Method Name :   compress
+        Description :   This method compresses a closed segment with the codec of log_rotation, streaming it through
+                        a temporary file which then replaces it under its compressed name
+
+        Output      :   The path of the compressed segment
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if self.codec is None or path.endswith(self.extension):
+            return path
+
+        compressed_path = path + self.extension
+
+        tmp_path = compressed_path + TMP_SUFFIX
+
+        with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+            with compressed_writer(dst, self.codec) as writer:
+                shutil.copyfileobj(src, writer, 1024 * 1024)
+
+        os.replace(tmp_path, compressed_path)
+
+        os.remove(path)
+
+        return compressed_path
+
+    def ship_pending(self):
+        """
+        Method Name :   ship_pending
+        Description :   This method compresses the new segments, drops the oldest segments while they take more than
+                        max_disk_bytes, and uploads up to batch_size segments, removing each once it is uploaded
+
+        Output      :   The number of segments uploaded
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        segments = []
+
+        for mtime, _, run_id, path in get_segment_files(self.segment_dir):
+            path = self.compress(path)
+
+            segments.append((mtime, os.path.getsize(path), run_id, path))
+
+        disk_bytes = sum(size for _, size, _, _ in segments)
+
+        while disk_bytes > self.max_disk_bytes and len(segments) > 0:
+            _, size, _, path = segments.pop(0)
+
+            os.remove(path)
+
+            disk_bytes -= size
+
+            self.dropped += 1
+
+        if self.client is None:
+            return 0
+
+        shipped = 0
+
+        for _, _, run_id, path in segments[: self.batch_size]:
+            self.client.upload_file(path, self.bucket, self.get_key(run_id, path))
+
+            os.remove(path)
+
+            shipped += 1
+
+        self.uploaded += shipped
+
+        return shipped
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.interval_seconds)
+
+            self.wakeup.clear()
+
+            stopping = self.stopped.is_set()
+
+            try:
+                while self.ship_pending() == self.batch_size:
+                    pass
+
+                self.error = None
+
+            except Exception as e:
+                self.error = e
+
+            if stopping:
+                break
+
+    def wake(self):
+        self.wakeup.set()
+
+    def close(self, timeout):
+        """
+        Method Name :   close
+        Description :   This method ships the pending segments one last time and stops the background thread,
+                        waiting at most timeout seconds. Segments left over are shipped by the next process
+
+        Output      :   The shipper is stopped
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.stopped.set()
+
+        self.wakeup.set()
+
+        self.thread.join(timeout)
@@ -1,6 +1,516 @@
+import atexit
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
+from scania.s3_bucket_operations.client_registry import get_storage_client
+from utils.log_shipper import Log_Shipper
+from utils.read_params import read_params
+from utils.tracer import get_tracer
+
+LOG_LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+HEAD_ROWS = 3
+
+HEAD_COLS = 5
+
+MAX_ITEMS = 10
+
+EXCEPTION_FLUSH_SECONDS = 1.0
+
+
+def format_log_line(now, log_info):
+    date, current_time = now.strftime("%d:%m:%Y"), now.strftime("%H:%M:%S")
+
+    return date + "\t" + current_time + "\t" + log_info + "\n"
+
+
+def get_log_path(log_file):
+    return os.path.join("logs", log_file)
+
+
+def summarize_value(value, max_chars):
+    """
+    Method Name :   summarize_value
+    Description :   This method renders a value for a log record in at most max_chars characters. Dataframes,
+                    series and arrays are rendered as their shape, dtypes and first few values instead of their
+                    full repr, and long collections as their length and first MAX_ITEMS items
+
+    Output      :   A str
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if isinstance(value, pd.DataFrame):
+        columns = [str(col) for col in value.columns[:MAX_ITEMS]]
+
+        if len(value.columns) > MAX_ITEMS:
+            columns.append(f"+{len(value.columns) - MAX_ITEMS} more")
+
+        dtypes = value.dtypes.astype(str).value_counts().to_dict()
+
+        head = value.iloc[:HEAD_ROWS, :HEAD_COLS].values.tolist()
+
+        text = f"DataFrame(shape={value.shape}, dtypes={dtypes}, columns={columns}, head={head})"
+
+    elif isinstance(value, pd.Series):
+        head = value.head(MAX_ITEMS).to_dict()
+
+        text = f"Series(name={value.name}, len={len(value)}, dtype={value.dtype}, head={head})"
+
+    elif isinstance(value, np.ndarray):
+        head = value.ravel()[:MAX_ITEMS].tolist()
+
+        text = f"ndarray(shape={value.shape}, dtype={value.dtype}, head={head})"
+
+    elif isinstance(value, (list, tuple, set, dict)) and len(value) > MAX_ITEMS:
+        head = list(value)[:MAX_ITEMS]
+
+        text = f"{type(value).__name__}(len={len(value)}, head={head})"
+
+    else:
+        text = str(value)
+
+    if len(text) > max_chars:
+        text = text[:max_chars] + f"...(+{len(text) - max_chars} chars)"
+
+    return text
+
+
+def render_message(log_info, args, fields, max_chars):
+    """
+    Method Name :   render_message
+    Description :   This method renders a log record, with the summarized args put into the {} placeholders of
+                    log_info and the summarized structured fields appended as key=value pairs
+
+    Output      :   A str
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if args:
+        log_info = log_info.format(*(summarize_value(arg, max_chars) for arg in args))
+
+    if fields:
+        log_info += " | " + ", ".join(
+            f"{key}={summarize_value(value, max_chars)}" for key, value in fields.items()
+        )
+
+    return log_info
+
+
+class Log_Writer:
+    """
+    Description :   This class writes the log records of the process in a background thread. Callers put records
+                    on a bounded queue with the time they were logged, and the thread takes them off in batches
+                    of up to batch_size, groups them per log file and writes each group with one call to a file
+                    handle which is kept open. A log file is rotated into a segment of the current run under
+                    segment_dir once it reaches rotate_bytes or is rotate_seconds old, and closed segments are
+                    handed to the log shipper
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(
+        self, batch_size, queue_size, rotate_bytes, rotate_seconds, segment_dir, shipper
+    ):
+        self.batch_size = batch_size
+
+        self.rotate_bytes = rotate_bytes
+
+        self.rotate_seconds = rotate_seconds
+
+        self.segment_dir = segment_dir
+
+        self.shipper = shipper
+
+        self.process_run_id = (
+            f"process_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        )
+
+        self.run_id = self.process_run_id
+
+        self.records = queue.Queue(maxsize=queue_size)
+
+        self.files = {}
+
+        self.opened = {}
+
+        self.error = None
+
+        self.lock = threading.Lock()
+
+        self.thread = threading.Thread(target=self.run, name="log-writer", daemon=True)
+
+        self.thread.start()
+
+    def put(self, log_file, log_info):
+        self.records.put((log_file, datetime.now(), log_info))
+
+    def put_control(self, action, value):
+        """
+        Method Name :   put_control
+        Description :   This method queues an action for the background thread, which runs it after the records
+                        logged before it are written. rotate rotates every open log file into the current run,
+                        segment does the same and then starts the run value, or the run of the process if value is
+                        None, and add moves the closed file value into the current run
+
+        Output      :   The action is queued
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.records.put((None, datetime.now(), (action, value)))
+
+    def get_file(self, path):
+        """
+        Method Name :   get_file
+        Description :   This method returns the open handle of the log file, opening it in append mode on first use.
+                        A handle whose file was removed or rotated away is reopened, so that records are never
+                        written to an unlinked file
+
+        Output      :   A file object
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        f = self.files.get(path)
+
+        if f is not None and os.fstat(f.fileno()).st_nlink == 0:
+            f.close()
+
+            f = None
+
+        if f is None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+            f = self.files[path] = open(path, mode="a+")
+
+            self.opened.setdefault(path, time.monotonic())
+
+        return f
+
+    def add_segment(self, path, name=None):
+        """
+        Method Name :   add_segment
+        Description :   This method moves a closed file into the segment directory of the current run and wakes
+                        the log shipper. Empty files are removed instead
+
+        Output      :   The file is a segment of the current run
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if not os.path.exists(path):
+            return
+
+        if os.path.getsize(path) == 0:
+            os.remove(path)
+
+            return
+
+        run_dir = os.path.join(self.segment_dir, self.run_id)
+
+        os.makedirs(run_dir, exist_ok=True)
+
+        os.replace(path, os.path.join(run_dir, name or os.path.basename(path)))
+
+        if self.shipper is not None:
+            self.shipper.wake()
+
+    def rotate(self, path):
+        """
+        Method Name :   rotate
+        Description :   This method closes the log file and moves it into a segment of the current run, named after
+                        the log file and the time of rotation. The next record reopens the log file
+
+        Output      :   The log file is rotated
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        f = self.files.pop(path, None)
+
+        if f is not None:
+            f.close()
+
+        self.opened.pop(path, None)
+
+        self.add_segment(
+            path,
+            f"{os.path.basename(path)}.{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}",
+        )
+
+    def rotate_expired(self):
+        now = time.monotonic()
+
+        with self.lock:
+            for path, opened in list(self.opened.items()):
+                if now - opened >= self.rotate_seconds:
+                    self.rotate(path)
+
+    def run_control(self, action, value):
+        with self.lock:
+            if action in ("rotate", "segment"):
+                for path in list(self.files):
+                    self.rotate(path)
+
+            if action == "segment":
+                self.run_id = value or self.process_run_id
+
+            elif action == "add":
+                self.add_segment(value)
+
+    def write_lines(self, lines):
+        now = time.monotonic()
+
+        with self.lock:
+            for path, file_lines in lines.items():
+                f = self.get_file(path)
+
+                f.write("".join(file_lines))
+
+                f.flush()
+
+                if (
+                    f.tell() >= self.rotate_bytes
+                    or now - self.opened[path] >= self.rotate_seconds
+                ):
+                    self.rotate(path)
+
+    def write_batch(self, batch):
+        """
+        Method Name :   write_batch
+        Description :   This method writes a batch of records, grouped per log file in the order they were logged,
+                        and flushes the files to the os. Control records run after the records before them are
+                        written
+
+        Output      :   The records are written to their log files
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        lines = {}
+
+        for log_file, now, log_info in batch:
+            if log_file is None:
+                self.write_lines(lines)
+
+                lines = {}
+
+                self.run_control(*log_info)
+
+                continue
+
+            lines.setdefault(get_log_path(log_file), []).append(
+                format_log_line(now, log_info)
+            )
+
+        self.write_lines(lines)
+
+    def run(self):
+        check_seconds = min(self.rotate_seconds, 60)
+
+        while True:
+            try:
+                batch = [self.records.get(timeout=check_seconds)]
+
+            except queue.Empty:
+                try:
+                    self.rotate_expired()
+
+                except Exception as e:
+                    self.error = e
+
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.records.get_nowait())
+
+                except queue.Empty:
+                    break
+
+            try:
+                self.write_batch(batch)
+
+            except Exception as e:
+                self.error = e
+
+            finally:
+                for _ in batch:
+                    self.records.task_done()
+
+    def wait(self, timeout):
+        """
+        Method Name :   wait
+        Description :   This method waits at most timeout seconds until every record logged so far is written to
+                        its log file. Errors of the background thread are left for flush to raise
+
+        Output      :   True if the log files are up to date, else False
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        deadline = time.monotonic() + timeout
+
+        with self.records.all_tasks_done:
+            while self.records.unfinished_tasks > 0:
+                remaining = deadline - time.monotonic()
+
+                if remaining <= 0:
+                    return False
+
+                self.records.all_tasks_done.wait(remaining)
+
+        return True
+
+    def flush(self):
+        """
+        Method Name :   flush
+        Description :   This method waits until every record logged so far is written to its log file
+
+        Output      :   The log files are up to date
+        On Failure  :   Raise the last error of the background thread, if any
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.records.join()
+
+        error, self.error = self.error, None
+
+        if error is not None:
+            raise error
+
+    def close(self, ship_timeout):
+        """
+        Method Name :   close
+        Description :   This method flushes the pending records, rotates the log files into their last segments and
+                        gives the log shipper at most ship_timeout seconds to upload them. It runs at interpreter
+                        exit
+
+        Output      :   The log files are written, rotated and closed
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        try:
+            self.flush()
+
+        finally:
+            with self.lock:
+                for path in list(self.files):
+                    self.rotate(path)
+
+            if self.shipper is not None:
+                self.shipper.close(ship_timeout)
+
+
+log_settings = None
+
+log_settings_lock = threading.Lock()
+
+log_writer = None
+
+log_writer_checked = False
+
+log_writer_lock = threading.Lock()
+
+
+def get_log_settings():
+    """
+    Method Name :   get_log_settings
+    Description :   This method returns the log_writer section of params.yaml, read once per process
+
+    Output      :   A dict of log settings
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    global log_settings
+
+    with log_settings_lock:
+        if log_settings is None:
+            log_settings = read_params()["log_writer"]
+
+            if log_settings["level"] not in LOG_LEVELS:
+                raise ValueError(
+                    f"Unsupported log level {log_settings['level']}, use one of {list(LOG_LEVELS)}"
+                )
+
+        return log_settings
+
+
+def get_log_writer():
+    """
+    Method Name :   get_log_writer
+    Description :   This method returns the process wide log writer, creating it from the log_writer, log_rotation
+                    and log_shipping sections of params.yaml on first use, with its log shipper. None is returned
+                    when async logging is disabled
+
+    Output      :   A Log_Writer object or None
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    global log_writer, log_writer_checked
+
+    with log_writer_lock:
+        if log_writer_checked is False:
+            writer_config = get_log_settings()
+
+            if writer_config["async"] is True:
+                config = read_params()
+
+                rotation_config = config["log_rotation"]
+
+                shipping_config = config["log_shipping"]
+
+                shipper = Log_Shipper(
+                    client=get_storage_client(config)
+                    if shipping_config["enabled"] is True
+                    else None,
+                    bucket=shipping_config["bucket"],
+                    prefix=shipping_config["prefix"],
+                    segment_dir=rotation_config["segment_dir"],
+                    codec=rotation_config["compression"],
+                    batch_size=shipping_config["batch_size"],
+                    interval_seconds=shipping_config["interval_seconds"],
+                    max_disk_bytes=rotation_config["max_disk_bytes"],
+                )
+
+                log_writer = Log_Writer(
+                    batch_size=writer_config["batch_size"],
+                    queue_size=writer_config["queue_size"],
+                    rotate_bytes=rotation_config["max_bytes"],
+                    rotate_seconds=rotation_config["max_seconds"],
+                    segment_dir=rotation_config["segment_dir"],
+                    shipper=shipper,
+                )
+
+                atexit.register(log_writer.close, shipping_config["close_timeout"])
+
+            log_writer_checked = True
+
+        return log_writer
+
 
 class App_Logger:
     """
@@ -13,35 +523,67 @@ class App_Logger:
     def __init__(self):
         self.class_name = self.__class__.__name__
 
-    def log(self, log_file, log_info):
-        try:
-            self.now = datetime.now()
+        settings = get_log_settings()
 
-            self.date = self.now.strftime("%d:%m:%Y")
+        self.level = LOG_LEVELS[settings["level"]]
 
-            self.current_time = self.now.strftime("%H:%M:%S")
+        self.max_value_chars = settings["max_value_chars"]
 
-            log_file_path = os.path.join("logs", log_file)
+        self.writer = get_log_writer()
 
-            with open(file=log_file_path, mode="a+") as f:
-                f.write(
-                    str(self.date)
-                    + "\t"
-                    + str(self.current_time)
-                    + "\t"
-                    + log_info
-                    + "\n"
-                )
+        self.tracer = get_tracer()
+
+    def log(self, log_file, log_info, *args, level="info", **fields):
+        """
+        Method Name :   log
+        Description :   This method logs log_info to the log file. With args, log_info is a format string with {}
+                        placeholders, and args and the structured fields are summarized to at most max_value_chars
+                        characters each. Nothing is rendered when level is below the level of params.yaml
+
+        Output      :   A log record is written to the log file
+        On Failure  :   Raise an exception
 
-                f.close()
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        try:
+            if LOG_LEVELS[level] < self.level:
+                return
+
+            if args or fields:
+                log_info = render_message(log_info, args, fields, self.max_value_chars)
+
+            if self.writer is not None:
+                self.writer.put(log_file, log_info)
+
+                return
+
+            with open(file=get_log_path(log_file), mode="a+") as f:
+                f.write(format_log_line(datetime.now(), log_info))
 
         except Exception as e:
             raise e
 
-    def start_log(self, key, class_name, method_name, log_file):
+    def flush(self):
+        """
+        Method Name :   flush
+        Description :   This method waits until every record logged so far is written to its log file
+
+        Output      :   The log files are up to date
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if self.writer is not None:
+            self.writer.flush()
+
+    def start_log(self, key, class_name, method_name, log_file, **attrs):
         """
         Method Name :   start_log
-        Description :   This method creates an entry point log in DynamoDB
+        Description :   This method creates an entry point log in DynamoDB. When a run is traced, the start and
+                        exit logs of a method also open and close its span, and attrs like rows and bytes given to
+                        the exit log are recorded on the span
 
         Output      :   An entry point is created in DynamoDB
         On Failure  :   Write an exception log and then raise an exception
@@ -59,6 +601,13 @@ class App_Logger:
 
             self.log(log_file, log_msg)
 
+            if self.tracer is not None:
+                if key == "start":
+                    self.tracer.start_span(class_name, method_name, log_file)
+
+                else:
+                    self.tracer.end_span(class_name, method_name, attrs)
+
         except Exception as e:
             error_msg = f"Exception occured in Class : {self.class_name}, Method : {start_method_name}, Error : {str(e)}"
 
@@ -67,7 +616,9 @@ class App_Logger:
     def exception_log(self, error, class_name, method_name, log_file):
         """
         Method Name :   exception_log
-        Description :   This method creates an exception log in DynamoDB and raises Exception
+        Description :   This method creates an exception log in DynamoDB and raises Exception. The pending log
+                        records get at most EXCEPTION_FLUSH_SECONDS to be written first. A failure to log is
+                        ignored, so that the exception raised is always the one of the method
 
         Output      :   A exception log is created in DynamoDB and expection is raised
         On Failure  :   Write an exception log and then raise an exception
@@ -76,10 +627,127 @@ class App_Logger:
         Revisions   :   moved setup to cloud
         """
 
-        self.start_log("exit", class_name, method_name, log_file)
-
         exception_msg = f"Exception occured in Class : {class_name}, Method : {method_name}, Error : {str(error)}"
 
-        self.log(log_file, exception_msg)
+        try:
+            self.start_log("exit", class_name, method_name, log_file, error=True)
+
+            self.log(log_file, exception_msg)
+
+            if self.writer is not None:
+                self.writer.wait(EXCEPTION_FLUSH_SECONDS)
+
+        except Exception:
+            pass
 
         raise Exception(exception_msg)
+
+    def begin_trace(self, run_name):
+        """
+        Method Name :   begin_trace
+        Description :   This method starts tracing the spans of a run, like one call of the train route
+
+        Output      :   The spans of the methods are kept for the run
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if self.tracer is not None:
+            self.tracer.begin_run(run_name)
+
+    def export_trace(self, log_file):
+        """
+        Method Name :   export_trace
+        Description :   This method writes the trace and summary table of the traced run and logs the class methods
+                        with the most self time. Nothing is done when no run is traced
+
+        Output      :   The paths of the trace file and summary file of the run, or an empty list
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if self.tracer is None:
+            return []
+
+        exported = self.tracer.export_run()
+
+        if exported is None:
+            return []
+
+        trace_path, summary_path, summary = exported
+
+        self.log(
+            log_file,
+            "Wrote trace to {} and summary to {}, top self times are {}",
+            trace_path,
+            summary_path,
+            [
+                f"{row['class']}.{row['method']}={row['self_s']:.3f}s"
+                for row in summary[: self.tracer.summary_rows]
+            ],
+        )
+
+        return [trace_path, summary_path]
+
+    def begin_run(self, run_name):
+        """
+        Method Name :   begin_run
+        Description :   This method starts a run, like one call of the train route. The run is traced, and the log
+                        files are rotated so that the records of the run go to segments shipped under its own run id
+
+        Output      :   The run id
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        run_id = f"{run_name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+
+        self.begin_trace(run_name)
+
+        if self.writer is not None:
+            self.writer.put_control("segment", run_id)
+
+        return run_id
+
+    def end_run(self, log_file):
+        """
+        Method Name :   end_run
+        Description :   This method ends the current run, whether it succeeded or failed. The trace of the run is
+                        exported, and the trace files and log files are handed to the log shipper as segments of
+                        the run. The shipping itself happens in the background
+
+        Output      :   The run is closed
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        paths = self.export_trace(log_file)
+
+        if self.writer is not None:
+            for path in paths:
+                self.writer.put_control("add", path)
+
+            self.writer.put_control("segment", None)
+
+    def ship_logs(self):
+        """
+        Method Name :   ship_logs
+        Description :   This method rotates the open log files into segments of the current run and wakes the log
+                        shipper, without waiting for the upload
+
+        Output      :   True if the logs are shipped in the background, False if async logging is disabled
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if self.writer is None:
+            return False
+
+        self.writer.put_control("rotate", None)
+
+        return True
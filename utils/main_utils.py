@@ -1,19 +1,81 @@
 import os
+import socket
+from datetime import datetime
+
 from scania.s3_bucket_operations.s3_operations import S3_Operation
+from utils.logger import App_Logger
 
 s3 = S3_Operation()
 
+UPLOADING_SUFFIX = ".uploading"
+
+
+def preload_control_files(log_file):
+    config = s3.config
+
+    files = [
+        (config["schema_file"]["train_schema_file"], "json"),
+        (config["schema_file"]["pred_schema_file"], "json"),
+        (config["regex_file"], "regex"),
+    ]
+
+    return s3.preload_control_files(
+        files, config["s3_bucket"]["input_files_bucket"], log_file
+    )
+
 
 def upload_logs(log_path, bucket):
+    """
+    Method Name :   upload_logs
+    Description :   This method ships the logs written so far. With async logging, the log files are rotated into
+                    compressed segments which the log shipper uploads in the background under run scoped keys.
+                    Otherwise each log file is renamed, so that records logged meanwhile go to a new file, then
+                    uploaded under a key scoped by host and time and removed once uploaded. A renamed file whose
+                    upload failed is uploaded by the next call, before its log file is renamed again
+
+    Output      :   The logs are shipped to s3 bucket
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
     try:
-        log_dir = os.listdir(log_path)
+        log_writer = App_Logger()
+
+        if log_writer.ship_logs() is True:
+            return
+
+        prefix = "/".join(
+            [
+                s3.config["log_shipping"]["prefix"],
+                socket.gethostname(),
+                datetime.now().strftime("%Y%m%d_%H%M%S_%f"),
+            ]
+        )
+
+        logs = sorted(
+            log
+            for log in os.listdir(log_path)
+            if os.path.isfile(os.path.join(log_path, log))
+        )
+
+        for log in logs:
+            abs_f = os.path.join(log_path, log)
+
+            if log.endswith(UPLOADING_SUFFIX):
+                log = log[: -len(UPLOADING_SUFFIX)]
+
+            elif log + UPLOADING_SUFFIX in logs:
+                continue
 
-        for log in log_dir:
-            abs_f = log_path + "/" + log
+            else:
+                os.replace(abs_f, abs_f + UPLOADING_SUFFIX)
 
-            s3.upload_file(abs_f, abs_f, bucket, "train_upload_log.txt")
+                abs_f += UPLOADING_SUFFIX
 
-        os.removedirs(log_path)
+            s3.upload_file(
+                abs_f, prefix + "/" + log, bucket, "upload_logs_log", remove=True
+            )
 
     except Exception as e:
         raise e
@@ -22,15 +22,19 @@ class Model_Utils:
 
         self.config = read_params()
 
-        self.tuner_kwargs = self.config["model_utils"]
+        self.tuner_kwargs = {
+            key: self.config["model_utils"][key] for key in ("verbose", "cv", "n_jobs")
+        }
 
-        self.split_kwargs = self.config["base"]
+        self.split_kwargs = {
+            key: self.config["base"][key] for key in ("random_state", "test_size")
+        }
 
         self.train_model_dir = self.config["models_dir"]["trained"]
 
-        self.save_format = self.config["model_save_format"]
+        self.save_format = self.config["model_utils"]["save_format"]
 
-        self.model_bucket = self.config["s3_bucket"]["model"]
+        self.model_bucket = self.config["s3_bucket"]["scania_model_bucket"]
 
         self.exp_name = self.config["mlflow_config"]["experiment_name"]
 
@@ -109,7 +113,7 @@ class Model_Utils:
         try:
             model_name = model.__class__.__name__
 
-            model_param_grid = self.config[model_name]
+            model_param_grid = self.config["model_params"][model_name]
 
             model_grid = GridSearchCV(
                 estimator=model, param_grid=model_param_grid, **self.tuner_kwargs
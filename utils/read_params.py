@@ -1,10 +1,51 @@
+import os
+import threading
+import time
+
 import yaml
 
+from utils.config_schema import get_config_errors
+
+STAT_INTERVAL_SECONDS = 1.0
+
+RELOAD_LOG_FILE = "config_reload_log"
+
+config_cache = {}
+
+config_cache_lock = threading.Lock()
+
+
+def load_params(config_path):
+    """
+    Method Name :   load_params
+    Description :   This method parses params.yaml and validates it against the config schema, listing every
+                    missing or mistyped key at once
+
+    Output      :   The parsed config
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    with open(config_path) as f:
+        config = yaml.safe_load(f)
+
+    errors = get_config_errors(config)
+
+    if len(errors) > 0:
+        raise ValueError(f"Invalid config in {config_path} : {'; '.join(errors)}")
+
+    return config
+
 
 def read_params(config_path="params.yaml"):
     """
     Method Name :   read_params
-    Description :   This method reads the parameters from params.yaml file
+    Description :   This method reads the parameters from params.yaml file. The file is parsed and validated once
+                    per process and the same config is returned on every call, so it must not be modified. The
+                    file is checked for changes at most every STAT_INTERVAL_SECONDS and parsed again when its
+                    mtime or size changes. A changed file which fails validation is logged once to
+                    RELOAD_LOG_FILE and the last valid config is kept
 
     Output      :   Parameters are read from the params.yaml file
     On Failure  :   Write an exception log and then raise an exception
@@ -14,11 +55,60 @@ def read_params(config_path="params.yaml"):
     """
     method_name = read_params.__name__
 
+    entry = config_cache.get(config_path)
+
+    now = time.monotonic()
+
+    if entry is not None and now - entry["checked_at"] < STAT_INTERVAL_SECONDS:
+        return entry["config"]
+
     try:
-        with open(config_path) as f:
-            config = yaml.safe_load(f)
+        with config_cache_lock:
+            entry = config_cache.get(config_path)
+
+            if entry is not None and now - entry["checked_at"] < STAT_INTERVAL_SECONDS:
+                return entry["config"]
+
+            version = None
+
+            try:
+                stat = os.stat(config_path)
+
+                version = (stat.st_mtime_ns, stat.st_size)
+
+                if entry is not None and version in (entry["version"], entry["failed"]):
+                    entry["checked_at"] = now
+
+                    return entry["config"]
+
+                config = load_params(config_path)
+
+                config_cache[config_path] = {
+                    "config": config,
+                    "version": version,
+                    "failed": None,
+                    "checked_at": now,
+                }
+
+                return config
+
+            except Exception as e:
+                if entry is None:
+                    raise e
+
+                entry["failed"], entry["checked_at"] = version, now
+
+                reload_error = e
+
+        from utils.logger import App_Logger
+
+        App_Logger().log(
+            RELOAD_LOG_FILE,
+            f"Kept the last valid config, failed to reload {config_path} : {str(reload_error)}",
+            level="error",
+        )
 
-        return config
+        return entry["config"]
 
     except Exception as e:
         raise Exception(
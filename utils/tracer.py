@@ -0,0 +1,403 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from utils.read_params import read_params
+
+TRACE_FORMATS = ("chrome", "jsonl")
+
+SUMMARY_ATTRS = ("rows", "bytes")
+
+
+def get_span_summary(spans):
+    """
+    Method Name :   get_span_summary
+    Description :   This method aggregates the closed spans of a run per class and method. Total time is the wall
+                    time inside the method, counted once for recursive calls, and self time is the total time minus
+                    the time of the child spans
+
+    Output      :   A list of dicts with class, method, calls, total_s, self_s, rows and bytes, by self time
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    by_id = {span["id"]: span for span in spans}
+
+    summary = {}
+
+    for span in spans:
+        key = (span["class"], span["method"])
+
+        row = summary.setdefault(
+            key,
+            {
+                "class": span["class"],
+                "method": span["method"],
+                "calls": 0,
+                "total_s": 0.0,
+                "self_s": 0.0,
+                "rows": 0,
+                "bytes": 0,
+            },
+        )
+
+        row["calls"] += 1
+
+        row["self_s"] += span["duration"] - span["child"]
+
+        parent, nested = by_id.get(span["parent"]), False
+
+        while parent is not None:
+            if (parent["class"], parent["method"]) == key:
+                nested = True
+
+                break
+
+            parent = by_id.get(parent["parent"])
+
+        if nested is False:
+            row["total_s"] += span["duration"]
+
+        for attr in SUMMARY_ATTRS:
+            if isinstance(span["attrs"].get(attr), (int, float)):
+                row[attr] += span["attrs"][attr]
+
+    return sorted(summary.values(), key=lambda row: row["self_s"], reverse=True)
+
+
+def format_summary(summary, run_time):
+    """
+    Method Name :   format_summary
+    Description :   This method renders the span summary of a run as a fixed width text table
+
+    Output      :   A str
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    header = f"{'class.method':<60} {'calls':>8} {'total_s':>10} {'self_s':>10} {'self_%':>7} {'rows':>12} {'bytes':>14}"
+
+    lines = [header, "-" * len(header)]
+
+    for row in summary:
+        name = f"{row['class']}.{row['method']}"
+
+        share = 100 * row["self_s"] / run_time if run_time > 0 else 0.0
+
+        lines.append(
+            f"{name[:60]:<60} {row['calls']:>8} {row['total_s']:>10.3f} {row['self_s']:>10.3f} {share:>7.1f} {row['rows']:>12} {row['bytes']:>14}"
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+def get_chrome_trace(run, spans):
+    """
+    Method Name :   get_chrome_trace
+    Description :   This method converts the spans of a run to the Chrome trace event format, which can be opened
+                    in chrome://tracing or Perfetto. Times are in microseconds from the start of the run
+
+    Output      :   A dict
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    pid = os.getpid()
+
+    events = [
+        {
+            "name": f"{span['class']}.{span['method']}",
+            "cat": span["class"],
+            "ph": "X",
+            "ts": round((span["start"] - run["start"]) * 1e6, 3),
+            "dur": round(span["duration"] * 1e6, 3),
+            "pid": pid,
+            "tid": span["thread"],
+            "args": {
+                "self_ms": round((span["duration"] - span["child"]) * 1e3, 3),
+                "log_file": span["log_file"],
+                **span["attrs"],
+            },
+        }
+        for span in spans
+    ]
+
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {
+            "run": run["name"],
+            "started_at": run["started_at"],
+            "dropped_spans": run["dropped"],
+        },
+    }
+
+
+class Span_Tracer:
+    """
+    Description :   This class turns the start and exit log brackets of the methods into timed spans. Spans are
+                    timed with a monotonic clock and nested per thread, a span being the child of the span which
+                    was open on the same thread when it started. Spans are kept only while a run is traced, up to
+                    max_spans per run, and the run is exported as a trace file and a summary table of the self and
+                    total time per class and method
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    def __init__(self, trace_dir, trace_format, max_spans, summary_rows):
+        if trace_format not in TRACE_FORMATS:
+            raise ValueError(
+                f"Unsupported trace format {trace_format}, use one of {list(TRACE_FORMATS)}"
+            )
+
+        self.trace_dir = trace_dir
+
+        self.trace_format = trace_format
+
+        self.max_spans = max_spans
+
+        self.summary_rows = summary_rows
+
+        self.local = threading.local()
+
+        self.lock = threading.Lock()
+
+        self.run = None
+
+        self.next_id = 0
+
+    def get_stack(self):
+        stack = getattr(self.local, "stack", None)
+
+        if stack is None:
+            stack = self.local.stack = []
+
+        return stack
+
+    def start_span(self, class_name, method_name, log_file):
+        """
+        Method Name :   start_span
+        Description :   This method opens a span for the method on the current thread, when a run is traced
+
+        Output      :   A span is opened
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        run = self.run
+
+        if run is None:
+            return
+
+        stack = self.get_stack()
+
+        with self.lock:
+            self.next_id += 1
+
+            span_id = self.next_id
+
+        stack.append(
+            {
+                "id": span_id,
+                "parent": stack[-1]["id"] if stack else None,
+                "run": run["id"],
+                "class": class_name,
+                "method": method_name,
+                "log_file": log_file,
+                "thread": threading.get_ident(),
+                "start": time.perf_counter(),
+                "child": 0.0,
+                "attrs": {},
+            }
+        )
+
+    def end_span(self, class_name, method_name, attrs):
+        """
+        Method Name :   end_span
+        Description :   This method closes the innermost open span of the method on the current thread, with attrs
+                        like rows and bytes. Spans opened after it and never closed, because their method raised
+                        without an exception log, are closed with it and marked as unclosed
+
+        Output      :   The span is closed and recorded in the run
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        stack = self.get_stack()
+
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i]["class"] == class_name and stack[i]["method"] == method_name:
+                break
+
+        else:
+            return
+
+        now = time.perf_counter()
+
+        while len(stack) > i:
+            span = stack.pop()
+
+            if len(stack) > i:
+                span["attrs"]["unclosed"] = True
+
+            else:
+                span["attrs"].update(attrs)
+
+            span["duration"] = now - span["start"]
+
+            if len(stack) > 0:
+                stack[-1]["child"] += span["duration"]
+
+            self.record(span)
+
+    def record(self, span):
+        with self.lock:
+            run = self.run
+
+            if run is None or run["id"] != span["run"]:
+                return
+
+            if len(run["spans"]) >= self.max_spans:
+                run["dropped"] += 1
+
+            else:
+                run["spans"].append(span)
+
+    def begin_run(self, run_name):
+        """
+        Method Name :   begin_run
+        Description :   This method starts tracing a run. Spans opened from now on are kept for the run, until it
+                        is exported. A run which was already traced is replaced
+
+        Output      :   The name of the run
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        with self.lock:
+            self.next_id += 1
+
+            self.run = {
+                "id": self.next_id,
+                "name": run_name,
+                "started_at": datetime.now().strftime("%Y%m%d_%H%M%S"),
+                "start": time.perf_counter(),
+                "spans": [],
+                "dropped": 0,
+            }
+
+        return run_name
+
+    def export_run(self):
+        """
+        Method Name :   export_run
+        Description :   This method stops tracing the current run and writes its spans to the trace directory, as
+                        a Chrome trace or as one json line per span, together with the summary table of the run
+
+        Output      :   The trace path, summary path and the summary of the run, or None if no run is traced
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        with self.lock:
+            run, self.run = self.run, None
+
+        if run is None:
+            return None
+
+        run_time = time.perf_counter() - run["start"]
+
+        spans = sorted(run["spans"], key=lambda span: span["start"])
+
+        summary = get_span_summary(spans)
+
+        os.makedirs(self.trace_dir, exist_ok=True)
+
+        prefix = os.path.join(
+            self.trace_dir, f"{run['name']}_trace_{run['started_at']}"
+        )
+
+        if self.trace_format == "chrome":
+            trace_path = prefix + ".json"
+
+            with open(trace_path, "w") as f:
+                json.dump(get_chrome_trace(run, spans), f, default=str)
+
+        else:
+            trace_path = prefix + ".jsonl"
+
+            with open(trace_path, "w") as f:
+                for span in spans:
+                    record = {
+                        "id": span["id"],
+                        "parent": span["parent"],
+                        "class": span["class"],
+                        "method": span["method"],
+                        "thread": span["thread"],
+                        "log_file": span["log_file"],
+                        "start_ms": round((span["start"] - run["start"]) * 1e3, 3),
+                        "duration_ms": round(span["duration"] * 1e3, 3),
+                        "self_ms": round((span["duration"] - span["child"]) * 1e3, 3),
+                        "attrs": span["attrs"],
+                    }
+
+                    f.write(json.dumps(record, default=str) + "\n")
+
+        summary_path = prefix + "_summary.txt"
+
+        with open(summary_path, "w") as f:
+            f.write(
+                f"run {run['name']} started at {run['started_at']}, {run_time:.3f}s, {len(spans)} spans, {run['dropped']} dropped\n\n"
+            )
+
+            f.write(format_summary(summary, run_time))
+
+        return trace_path, summary_path, summary
+
+
+tracer = None
+
+tracer_checked = False
+
+tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """
+    Method Name :   get_tracer
+    Description :   This method returns the process wide span tracer, creating it from the tracing section of
+                    params.yaml on first use. None is returned when tracing is disabled
+
+    Output      :   A Span_Tracer object or None
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    global tracer, tracer_checked
+
+    with tracer_lock:
+        if tracer_checked is False:
+            tracing_config = read_params()["tracing"]
+
+            if tracing_config["enabled"] is True:
+                tracer = Span_Tracer(
+                    trace_dir=tracing_config["trace_dir"],
+                    trace_format=tracing_config["format"],
+                    max_spans=tracing_config["max_spans"],
+                    summary_rows=tracing_config["summary_rows"],
+                )
+
+            tracer_checked = True
+
+        return tracer